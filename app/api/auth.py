@@ -9,6 +9,11 @@ import logging
 import random
 from datetime import datetime, timedelta
 from app.core.email_service import email_service
+from app.core.skill_index import skill_index
+from app.core.skill_vocabulary import skill_vocabulary
+from app.core.match_table import match_table
+from app.core.match_cache import match_cache
+from app.core.skill_demand import skill_demand
 
 logger = logging.getLogger(__name__)
 
@@ -120,6 +125,7 @@ async def register(user_data: UserCreate, background_tasks: BackgroundTasks, eng
         # logger.info(f"Generated OTP for {user_data.email}: {otp}")
         # background_tasks.add_task(email_service.send_otp_email, user_data.email, otp)
         await engine.save(new_user)
+        await skill_demand.user_created(engine, new_user)
     except Exception as e:
         logger.error(f"Registration failure for {user_data.email}: {str(e)}")
         if isinstance(e, HTTPException):
@@ -261,7 +267,7 @@ async def get_profile_status(user_id: str, engine: AIOEngine = Depends(get_engin
     }
 
 @router.put("/update-profile")
-async def update_profile(data: ProfileUpdate, user_id: str, engine: AIOEngine = Depends(get_engine)):
+async def update_profile(data: ProfileUpdate, user_id: str, background_tasks: BackgroundTasks, engine: AIOEngine = Depends(get_engine)):
     from odmantic import ObjectId
     user = await engine.find_one(User, User.id == ObjectId(user_id))
     if not user:
@@ -275,6 +281,7 @@ async def update_profile(data: ProfileUpdate, user_id: str, engine: AIOEngine =
     if data.gpa is not None: user.gpa = data.gpa
     if data.graduation_year is not None: user.graduation_year = data.graduation_year
     
+    old_skills = list(user.skills)
     if data.skills is not None:
         from app.models.user import Skill
         user.skills = [
@@ -286,12 +293,22 @@ async def update_profile(data: ProfileUpdate, user_id: str, engine: AIOEngine =
                 certification_name=s.certification_name
             ) for s in data.skills
         ]
+        await skill_vocabulary.assign_user_skills(engine, user)
         
     if data.company_name is not None: user.company_name = data.company_name
     if data.company_url is not None: user.company_url = data.company_url
     if data.industry_type is not None: user.industry_type = data.industry_type
     
     await engine.save(user)
+
+    if data.skills is not None and user.role == UserRole.STUDENT:
+        await skill_demand.student_changed(engine, old_skills, user.skills)
+        await skill_index.update_student(engine, str(user.id), [s.skill_id for s in user.skills])
+        background_tasks.add_task(match_table.refresh_student, engine, str(user.id))
+    elif user.role == UserRole.STUDENT:
+        # Cached matches show profile fields such as the university, so any save invalidates them
+        await match_cache.students_changed(engine)
+
     return {"message": "Profile updated successfully"}
 
 # @router.post("/verify-email")
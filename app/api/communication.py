@@ -1,11 +1,18 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
 from app.db import get_engine
 from odmantic import AIOEngine
 from app.models.application import Application, ApplicationStatus
+from app.models.match import Match
 from app.core.email_service import email_service
-from typing import List
+from app.core.application_rollups import application_rollups
+from app.core.loader import Loaders, get_loaders
+from app.core.match_engine import match_skills
+from app.api.industry import ApplicationSummary
+from app.api.pagination import Page, keyset_page, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from typing import Optional
 
 router = APIRouter()
 
@@ -66,25 +73,47 @@ async def schedule_interview(req: InterviewRequest):
         "message": f"Interview scheduled for {req.date} at {req.time}. Invite sent to {req.student_email}."
     }
 
+DEFAULT_MATCH_SCORE = 85 # When the student or role cannot be resolved
+
+async def _match_score(engine: AIOEngine, loaders: Loaders, student_id: str, role_id: str) -> int:
+    # The materialized match is the score the student saw; score the pair directly if it has none yet
+    match = await engine.find_one(Match, (Match.student_id == student_id) & (Match.role_id == role_id))
+    if match:
+        return match.score
+    student, role = await asyncio.gather(loaders.users.load(student_id), loaders.roles.load(role_id))
+    if not student or not role:
+        return DEFAULT_MATCH_SCORE
+    score, _, _ = match_skills((s.skill_id for s in student.skills), role.required_skills, role.required_skill_ids)
+    return score
+
 @router.post("/apply")
-async def apply_for_role(req: ApplyRequest, engine: AIOEngine = Depends(get_engine)):
+async def apply_for_role(
+    req: ApplyRequest,
+    engine: AIOEngine = Depends(get_engine),
+    loaders: Loaders = Depends(get_loaders)
+):
     """
-    Saves a job application to the database.
+    Saves a job application to the database and counts it in the application rollups.
     """
     application = Application(
         student_id=req.student_id,
         role_id=req.role_id,
         cover_letter=req.message,
-        match_score=85, # Default/Calculated score
+        match_score=await _match_score(engine, loaders, req.student_id, req.role_id),
         status=ApplicationStatus.PENDING
     )
     await engine.save(application)
+    await application_rollups.applied(engine, application)
     return {"status": "success", "message": "Application submitted successfully"}
 
-@router.get("/applications/student/{student_id}", response_model=List[Application])
-async def get_student_applications(student_id: str, engine: AIOEngine = Depends(get_engine)):
+@router.get("/applications/student/{student_id}", response_model=Page[ApplicationSummary])
+async def get_student_applications(
+    student_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    engine: AIOEngine = Depends(get_engine)
+):
     """
-    Fetches all applications for a specific student.
+    Fetches one page of a student's applications, newest first.
     """
-    applications = await engine.find(Application, Application.student_id == student_id)
-    return applications
+    return await keyset_page(engine, Application, {"student_id": student_id}, ApplicationSummary, limit, cursor, descending=True)
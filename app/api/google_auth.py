@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from pydantic import BaseModel
 from google.oauth2 import id_token
 from google.auth.transport import requests as google_requests
@@ -7,6 +7,9 @@ from app.models.user import User, UserRole
 from app.api.auth import create_access_token
 from odmantic import AIOEngine
 from app.db import get_engine
+from app.core.skill_demand import skill_demand
+from app.core.skill_index import skill_index
+from app.core.match_table import match_table
 import logging
 
 router = APIRouter()
@@ -21,6 +24,7 @@ class GoogleAuthRequest(BaseModel):
 @router.post("/google")
 async def google_auth(
     auth_data: GoogleAuthRequest,
+    background_tasks: BackgroundTasks,
     engine: AIOEngine = Depends(get_engine)
 ):
     try:
@@ -60,15 +64,27 @@ async def google_auth(
                 hashed_password="" # No password for Google users
             )
             await engine.save(user)
+            await skill_demand.user_created(engine, user)
             logger.info(f"Created new Google user: {email}")
         else:
             # Update role only if provided and different? 
             # Or just ignore role if they already exist
+            old_role = user.role
             if auth_data.role and user.role != auth_data.role:
                 user.role = auth_data.role
             
             user.avatar = picture
             await engine.save(user)
+            if user.role != old_role:
+                await skill_demand.student_changed(
+                    engine,
+                    user.skills if old_role == UserRole.STUDENT else None,
+                    user.skills if user.role == UserRole.STUDENT else None,
+                )
+                # Like a profile update: index the skills of a new student, drop a former one's
+                student_skill_ids = [s.skill_id for s in user.skills] if user.role == UserRole.STUDENT else []
+                await skill_index.update_student(engine, str(user.id), student_skill_ids)
+                background_tasks.add_task(match_table.refresh_student, engine, str(user.id))
             logger.info(f"Google login for existing user: {email}")
 
         # Create access token
@@ -1,39 +1,155 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Query, Request, Response
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from pymongo import UpdateOne
+from bson.errors import InvalidId
 from app.db import get_engine
 from odmantic import AIOEngine, ObjectId
-from app.models.role import Role
+from app.models.role import Role, RoleType
 from app.models.application import Application, ApplicationStatus
 from app.models.user import User, UserRole
+from app.core.match_table import match_table
+from app.core.match_cache import match_cache
+from app.core.skill_vocabulary import skill_vocabulary
+from app.core.skill_demand import skill_demand
+from app.core.application_rollups import application_rollups
+from app.core.loader import Loaders, get_loaders
+from app.api.streaming import wants_ndjson, ndjson_response, document_record
+from app.api.timing import ServerTiming
+from app.api.response_cache import cached_response, response_cache
+from app.api.pagination import Page, keyset_page, id_cursor_query, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from datetime import datetime
+from uuid import uuid4
+import asyncio
 
 router = APIRouter()
 
-@router.get("/dashboard-metrics")
-async def get_dashboard_metrics(engine: AIOEngine = Depends(get_engine)):
-    total_students = await engine.count(User, User.role == UserRole.STUDENT)
-    active_roles = await engine.count(Role, Role.is_active == True)
-    
-    applied_count = await engine.count(Application, Application.status == ApplicationStatus.PENDING)
-    message_count = await engine.count(Application, Application.status == ApplicationStatus.REVIEWING)
-    interviewing_count = await engine.count(Application, Application.status == ApplicationStatus.INTERVIEW)
-    offers_count = await engine.count(Application, Application.status == ApplicationStatus.OFFERED)
+class RoleUpdate(BaseModel):
+    title: Optional[str] = None
+    description: Optional[str] = None
+    requirements: Optional[List[str]] = None
+    location: Optional[str] = None
+    salary_range: Optional[str] = None
+    is_active: Optional[bool] = None
+    required_skills: Optional[List[str]] = None
+    preferred_skills: Optional[List[str]] = None
+    min_experience_years: Optional[int] = None
+    seniority: Optional[str] = None
+    industry: Optional[str] = None
+    experience: Optional[str] = None
+
+class RoleSummary(BaseModel):
+    # Listing view of a role; the description and interned skill IDs are left to GET /roles/{id} consumers
+    id: str
+    title: str
+    company_name: str
+    role_type: RoleType
+    location: str
+    salary_range: Optional[str] = None
+    is_active: bool = True
+    created_at: datetime
+    required_skills: List[str] = []
+    seniority: str = "Mid-Level"
+    industry: str = "Technology"
+    experience: str = "0-2 years"
+
+class ApplicationSummary(BaseModel):
+    # Listing view of an application, without the cover letter
+    id: str
+    student_id: str
+    role_id: str
+    status: ApplicationStatus
+    applied_at: datetime
+    match_score: int
+
+MAX_BULK_STATUS_UPDATES = 500
+
+class StatusUpdate(BaseModel):
+    app_id: str
+    status: ApplicationStatus
+
+class BulkStatusRequest(BaseModel):
+    updates: List[StatusUpdate] = Field(..., max_length=MAX_BULK_STATUS_UPDATES)
+
+class StatusUpdateResult(BaseModel):
+    app_id: str
+    status: ApplicationStatus
+    result: str  # "updated", "unchanged", "conflict", "superseded", "not_found" or "invalid_id"
+
+class BulkStatusResponse(BaseModel):
+    updated: int
+    results: List[StatusUpdateResult]
 
-    # Fetch some recent applications for activity
-    recent_apps = await engine.find(Application, sort=Application.applied_at.desc(), limit=3)
+RECENT_ACTIVITY_LIMIT = 3
+DASHBOARD_CACHE_SECONDS = 15
+DASHBOARD_STALE_SECONDS = 60
+ROLES_CACHE_SECONDS = 10
+ROLES_STALE_SECONDS = 30
+MATCH_TREND_DAYS = 7
+MATCH_SCORE_WINDOW_DAYS = 30
+
+async def _status_counts(engine: AIOEngine):
+    """Applications per status, in one aggregation."""
+    pipeline = [{"$group": {"_id": "$status", "count": {"$sum": 1}}}]
+    rows = await engine.get_collection(Application).aggregate(pipeline).to_list(length=None)
+    return {row["_id"]: row["count"] for row in rows}
+
+async def _recent_activity(loaders: Loaders, recent_apps: List[Application]):
+    # References are stored as str; the loaders turn them into one $in query per collection
+    students, roles = await asyncio.gather(
+        loaders.users.load_many([app.student_id for app in recent_apps]),
+        loaders.roles.load_many([app.role_id for app in recent_apps]),
+    )
     recent_activity = []
-    for app in recent_apps:
-        student = await engine.find_one(User, User.id == app.student_id)
-        role = await engine.find_one(Role, Role.id == app.role_id)
+    for app, student, role in zip(recent_apps, students, roles):
         if student and role:
+            # User has no `name` field; Google sign-ups can have an empty full_name
+            display_name = student.full_name or student.email
             recent_activity.append({
                 "id": str(app.id),
-                "user": student.full_name or student.name,
+                "user": display_name,
                 "action": "applied for",
                 "target": role.title,
                 "time": "Just now", # Could calculate actual relative time
-                "initials": "".join([n[0] for n in (student.full_name or student.name).split()]),
+                "initials": "".join([n[0] for n in display_name.split()]),
                 "color": "blue"
             })
+    return recent_activity
+
+@router.get("/dashboard-metrics")
+@cached_response(ttl=DASHBOARD_CACHE_SECONDS, stale_while_revalidate=DASHBOARD_STALE_SECONDS)
+async def get_dashboard_metrics(
+    response: Response,
+    engine: AIOEngine = Depends(get_engine),
+    loaders: Loaders = Depends(get_loaders)
+):
+    """
+    Independent queries run concurrently; each one's duration is reported in the
+    `Server-Timing` response header. The payload is the same for every recruiter,
+    so it is cached and refreshed in the background once stale.
+    """
+    timing = ServerTiming()
+    total_students, active_roles, status_counts, recent_apps, (counted_students, top_skills, categories), days = await asyncio.gather(
+        timing.measure("students", engine.count(User, User.role == UserRole.STUDENT)),
+        timing.measure("roles", engine.count(Role, Role.is_active == True)),
+        timing.measure("statuses", _status_counts(engine)),
+        timing.measure("recent", engine.find(Application, sort=Application.applied_at.desc(), limit=RECENT_ACTIVITY_LIMIT)),
+        # Skill aggregations come from counters maintained on every profile write
+        timing.measure("skills", skill_demand.read(engine)),
+        # Trend and average score come from per-day rollups maintained on every application write
+        timing.measure("trend", application_rollups.daily(engine, MATCH_SCORE_WINDOW_DAYS)),
+    )
+
+    applied_count = status_counts.get(ApplicationStatus.PENDING.value, 0)
+    message_count = status_counts.get(ApplicationStatus.REVIEWING.value, 0)
+    interviewing_count = status_counts.get(ApplicationStatus.INTERVIEW.value, 0)
+    offers_count = status_counts.get(ApplicationStatus.OFFERED.value, 0)
+
+    # Second round: depends on the recent applications and top skills above
+    recent_activity, skill_names = await asyncio.gather(
+        timing.measure("activity", _recent_activity(loaders, recent_apps)),
+        timing.measure("skill_names", skill_vocabulary.names(engine, [s.skill_id for s in top_skills if s.skill_id is not None])),
+    )
 
     if not recent_activity:
         recent_activity = [
@@ -42,35 +158,30 @@ async def get_dashboard_metrics(engine: AIOEngine = Depends(get_engine)):
             {"id": 3, "user": "Mike Kim", "action": "accepted interview invite", "target": "", "time": "Yesterday", "initials": "MK", "color": "purple"}
         ]
 
-    # Calculate Skill Aggregations from DB
-    students = await engine.find(User, User.role == UserRole.STUDENT)
-    skill_counts = {}
-    category_counts = {}
-    
-    for student in students:
-        for skill in student.skills:
-            skill_counts[skill.name] = skill_counts.get(skill.name, 0) + 1
-            cat = skill.category or "General"
-            category_counts[cat] = category_counts.get(cat, 0) + 1
-            
-    # Format Top Skills
-    sorted_skills = sorted(skill_counts.items(), key=lambda x: x[1], reverse=True)[:5]
     top_skills_formatted = [
-        {"skill": name, "demand": int((count / max(1, len(students))) * 100)} 
-        for name, count in sorted_skills
+        {"skill": skill_names.get(s.skill_id, s.label), "demand": int((s.count / max(1, counted_students)) * 100)}
+        for s in top_skills
     ]
     
     # Format Skill Distribution
     skill_dist_formatted = [
-        {"category": cat, "count": count}
-        for cat, count in category_counts.items()
+        {"category": c.label, "count": c.count}
+        for c in categories
     ]
 
+    scored = sum(day.match_score_count for day in days)
+    avg_match_score = round(sum(day.match_score_sum for day in days) / scored) if scored else 0
+    match_trend = [
+        {"date": day.bucket_start.strftime("%a"), "matches": day.total}
+        for day in days[-MATCH_TREND_DAYS:]
+    ]
+
+    timing.apply(response)
     return {
         "totalStudents": total_students,
         "activeRoles": active_roles,
         "matchesThisWeek": applied_count, 
-        "avgMatchScore": 84, # Calculated periodically in real scenario
+        "avgMatchScore": avg_match_score,
         "topSkills": top_skills_formatted if top_skills_formatted else [
             {"skill": "React", "demand": 0},
             {"skill": "Python", "demand": 0}
@@ -78,13 +189,7 @@ async def get_dashboard_metrics(engine: AIOEngine = Depends(get_engine)):
         "recentMatches": [
             # In production: Fetch recent successful matches
         ],
-        "matchTrend": [
-            {"date": "Mon", "matches": 0},
-            {"date": "Tue", "matches": 0},
-            {"date": "Wed", "matches": 0},
-            {"date": "Thu", "matches": 0},
-            {"date": "Fri", "matches": applied_count}
-        ],
+        "matchTrend": match_trend,
         "skillDistribution": skill_dist_formatted,
         "hiringPipeline": {
             "applied": applied_count,
@@ -96,18 +201,66 @@ async def get_dashboard_metrics(engine: AIOEngine = Depends(get_engine)):
     }
 
 @router.post("/roles", response_model=Role)
-async def create_role(role: Role, engine: AIOEngine = Depends(get_engine)):
+async def create_role(role: Role, background_tasks: BackgroundTasks, engine: AIOEngine = Depends(get_engine)):
+    await skill_vocabulary.assign_role_skills(engine, role)
     await engine.save(role)
+    response_cache.invalidate("/api/industry/roles")
+    background_tasks.add_task(match_table.refresh_role, engine, str(role.id))
     return role
 
-@router.get("/roles", response_model=List[Role])
-async def get_roles(engine: AIOEngine = Depends(get_engine)):
-    return await engine.find(Role)
+@router.put("/roles/{role_id}", response_model=Role)
+async def update_role(role_id: str, data: RoleUpdate, background_tasks: BackgroundTasks, engine: AIOEngine = Depends(get_engine)):
+    role = await engine.find_one(Role, Role.id == ObjectId(role_id))
+    if not role:
+        raise HTTPException(status_code=404, detail="Role not found")
+
+    changes = data.model_dump(exclude_unset=True)
+    rematch = (
+        ("required_skills" in changes and changes["required_skills"] != role.required_skills)
+        or ("is_active" in changes and changes["is_active"] != role.is_active)
+    )
+    role.model_update(changes)
+    if "required_skills" in changes or "preferred_skills" in changes:
+        await skill_vocabulary.assign_role_skills(engine, role)
+    await engine.save(role)
+    response_cache.invalidate("/api/industry/roles")
+
+    # Only skill or visibility changes affect the materialized matches
+    if rematch:
+        background_tasks.add_task(match_table.refresh_role, engine, role_id)
+    else:
+        # Cached matches still show the role's other fields, such as its title
+        await match_cache.role_changed(engine, role_id)
+    return role
+
+@router.get("/roles", response_model=Page[RoleSummary])
+@cached_response(ttl=ROLES_CACHE_SECONDS, stale_while_revalidate=ROLES_STALE_SECONDS, skip=wants_ndjson)
+async def get_roles(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    engine: AIOEngine = Depends(get_engine)
+):
+    """
+    One page of roles in creation order; pass `nextCursor` back as `cursor` for the next.
+    An NDJSON export streams every role after `cursor`, or all of them without one.
+    """
+    if wants_ndjson(request):
+        rows = engine.get_collection(Role).find(id_cursor_query(cursor)).sort("_id", 1)
+        return ndjson_response(document_record(doc) async for doc in rows)
 
-@router.get("/roles/{role_id}/applications", response_model=List[Application])
-async def get_role_applications(role_id: str, engine: AIOEngine = Depends(get_engine)):
+    return await keyset_page(engine, Role, {}, RoleSummary, limit, cursor)
+
+@router.get("/roles/{role_id}/applications", response_model=Page[ApplicationSummary])
+async def get_role_applications(
+    role_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    engine: AIOEngine = Depends(get_engine)
+):
+    """One page of a role's applications, newest first."""
     # Verify role belongs to current user
-    return await engine.find(Application, Application.role_id == role_id)
+    return await keyset_page(engine, Application, {"role_id": role_id}, ApplicationSummary, limit, cursor, descending=True)
 
 @router.put("/applications/{app_id}/status")
 async def update_application_status(
@@ -119,6 +272,77 @@ async def update_application_status(
     if not app:
         raise HTTPException(status_code=404, detail="Application not found")
     
+    old_status = app.status
+    if status == old_status:
+        return app
+    # Only move from the status read above, so a concurrent change cannot count twice in the rollups
+    written = await engine.get_collection(Application).update_one(
+        {"_id": app.id, "status": old_status.value}, {"$set": {"status": status.value}}
+    )
+    if not written.matched_count:
+        raise HTTPException(status_code=409, detail="Application status changed concurrently; reload and retry")
     app.status = status
-    await engine.save(app)
+    await application_rollups.status_changed(engine, app, old_status)
     return app
+
+@router.put("/applications/status", response_model=BulkStatusResponse)
+async def update_application_statuses(req: BulkStatusRequest, engine: AIOEngine = Depends(get_engine)):
+    """
+    Move many applications at once. Current statuses are read with one `$in` query and
+    the changes go out as one unordered bulk_write, each conditional on the status read.
+    Every write also stamps a token unique to this request, so one more `$in` query
+    tells which writes applied; the rollups only move for those, and the others are
+    reported as conflicts. Results come back per item, in request order. When an
+    application is listed twice the last entry wins and the earlier ones are reported
+    as superseded.
+    """
+    object_ids = []
+    last_entry = {}
+    for position, update in enumerate(req.updates):
+        try:
+            object_ids.append(ObjectId(update.app_id))
+            last_entry[object_ids[-1]] = position
+        except (InvalidId, TypeError):
+            object_ids.append(None)
+
+    current = {}
+    if last_entry:
+        rows = engine.get_collection(Application).find({"_id": {"$in": list(last_entry)}}, {"status": 1, "applied_at": 1})
+        current = {doc["_id"]: doc async for doc in rows}
+
+    writes, results = [], []
+    for position, (update, app_id) in enumerate(zip(req.updates, object_ids)):
+        doc = current.get(app_id)
+        if app_id is None:
+            result = "invalid_id"
+        elif last_entry[app_id] != position:
+            result = "superseded"
+        elif doc is None:
+            result = "not_found"
+        elif doc["status"] == update.status.value:
+            result = "unchanged"
+        else:
+            result = "updated"
+            writes.append((len(results), doc, update.status))
+        results.append(StatusUpdateResult(app_id=update.app_id, status=update.status, result=result))
+
+    applied = set()
+    if writes:
+        collection = engine.get_collection(Application)
+        token = uuid4().hex
+        await collection.bulk_write([
+            UpdateOne({"_id": doc["_id"], "status": doc["status"]}, {"$set": {"status": status.value, "status_token": token}})
+            for _, doc, status in writes
+        ], ordered=False)
+        rows = collection.find({"_id": {"$in": [doc["_id"] for _, doc, _ in writes]}, "status_token": token}, {"_id": 1})
+        applied = {doc["_id"] async for doc in rows}
+
+    changes = []
+    for position, doc, status in writes:
+        if doc["_id"] in applied:
+            changes.append((doc["applied_at"], doc["status"], status))
+        else:
+            results[position].result = "conflict"
+    if changes:
+        await application_rollups.status_changes(engine, changes)
+    return BulkStatusResponse(updated=len(changes), results=results)
@@ -1,15 +1,29 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
 from typing import List, Dict, Any, Optional
 from app.db import get_engine
 from odmantic import AIOEngine, ObjectId
-from app.models.user import User, UserRole
+from odmantic.query import desc
+from app.models.user import User
 from app.models.role import Role
-import math
+from app.models.match import Match
+from app.core.match_cache import match_cache
+from app.core.match_engine import match_engine, match_skills, top_k
+from app.core.match_pipeline import aggregate_role_matches
+from app.core.semantic_index import semantic_index
+from app.core.loader import Loaders, get_loaders
+from app.api.pagination import Page, encode_score_cursor, decode_score_cursor, score_cursor_query, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.api.streaming import wants_ndjson, ndjson_response
+from enum import Enum
+import asyncio
+import numpy as np
 
 router = APIRouter()
 
 # Helper Models for response
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+MAX_BATCH_ROLES = 100
+STREAM_CHUNK_SIZE = 500
 
 class MatchResult(BaseModel):
     id: str  # Composite ID or just some unique string
@@ -25,65 +39,285 @@ class MatchResult(BaseModel):
     skillsMissing: List[str]
     experienceAlignment: str
 
-@router.get("/roles/{role_id}", response_model=List[MatchResult])
-async def get_matches_for_role(role_id: str, engine: AIOEngine = Depends(get_engine)):
-    role = await engine.find_one(Role, Role.id == ObjectId(role_id))
+class MatchMode(str, Enum):
+    TABLE = "table"  # Read the materialized match table
+    PIPELINE = "pipeline"  # Score live inside a Mongo aggregation
+    SEMANTIC = "semantic"  # Score live with partial credit for similar skills
+
+class BatchMatchRequest(BaseModel):
+    role_ids: List[str] = Field(..., max_length=MAX_BATCH_ROLES)
+    limit: int = Field(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+
+async def _read_matches(engine: AIOEngine, owner_field: str, owner_id: str, id_field: str, limit: int, cursor: Optional[str]):
+    """Indexed range read of one page of the materialized match table, best score first."""
+    query = {owner_field: owner_id, **score_cursor_query(cursor, id_field)}
+    rows, total = await asyncio.gather(
+        engine.find(Match, query, sort=(desc(Match.score), getattr(Match, id_field)), limit=limit + 1),
+        engine.count(Match, {owner_field: owner_id})
+    )
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_score_cursor(page[-1].score, getattr(page[-1], id_field))
+    return page, total, next_cursor
+
+async def _find_by_ids(engine: AIOEngine, model, ids: List[str]) -> Dict[str, Any]:
+    if not ids:
+        return {}
+    docs = await engine.find(model, model.id.in_([ObjectId(i) for i in set(ids)]))
+    return {str(doc.id): doc for doc in docs}
+
+async def _stream_matches(engine: AIOEngine, role: Role, cursor: Optional[str]):
+    """Every match of a role after the cursor, best first, enriched a chunk at a time."""
+    query = {"role_id": str(role.id), **score_cursor_query(cursor, "student_id")}
+    rows = engine.get_collection(Match).find(query).sort([("score", -1), ("student_id", 1)])
+
+    chunk: List[Match] = []
+    async for doc in rows:
+        chunk.append(Match.model_validate_doc(doc))
+        if len(chunk) >= STREAM_CHUNK_SIZE:
+            for item in await _enrich_chunk(engine, chunk, role):
+                yield item
+            chunk = []
+    for item in await _enrich_chunk(engine, chunk, role):
+        yield item
+
+async def _enrich_chunk(engine: AIOEngine, chunk: List[Match], role: Role) -> List[Dict[str, Any]]:
+    students = await _find_by_ids(engine, User, [m.student_id for m in chunk])
+    return [match_result(m, students[m.student_id], role) for m in chunk if m.student_id in students]
+
+@router.get("/roles/{role_id}", response_model=Page[MatchResult])
+async def get_matches_for_role(
+    role_id: str,
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    mode: MatchMode = MatchMode.TABLE,
+    engine: AIOEngine = Depends(get_engine),
+    loaders: Loaders = Depends(get_loaders)
+):
+    """
+    One page of a role's matches. With `Accept: application/x-ndjson` the table
+    mode instead streams every match after `cursor`, one MatchResult per line.
+    Pages are cached until the role or any student profile changes.
+    """
+    if mode == MatchMode.TABLE and wants_ndjson(request):
+        return ndjson_response(_stream_matches(engine, await _get_role(loaders, role_id), cursor))
+
+    key = await match_cache.role_key(engine, role_id, mode.value, limit, cursor)
+    cached = match_cache.get(key)
+    if cached is not None:
+        return cached
+
+    role = await _get_role(loaders, role_id)
+    if mode == MatchMode.PIPELINE:
+        result = await _pipeline_matches(engine, role, limit, cursor)
+    elif mode == MatchMode.SEMANTIC:
+        result = await _semantic_role_matches(engine, loaders, role, limit, cursor)
+    else:
+        result = await _table_role_matches(engine, loaders, role, limit, cursor)
+
+    match_cache.set(key, result)
+    return result
+
+@router.get("/cache-stats")
+async def get_match_cache_stats():
+    """Hit and miss counters of this worker's match cache."""
+    return match_cache.stats()
+
+async def _get_role(loaders: Loaders, role_id: str) -> Role:
+    role = await loaders.roles.load(role_id)
     if not role:
         raise HTTPException(status_code=404, detail="Role not found")
-        
-    students = await engine.find(User, User.role == UserRole.STUDENT)
-    
-    matches = []
-    
-    for student in students:
-        match_data = calculate_match(student, role)
-        if match_data['matchPercentage'] > 0: # Filter out 0 matches if desired
-            matches.append(match_data)
-            
-    # Sort by match percentage desc
-    matches.sort(key=lambda x: x['matchPercentage'], reverse=True)
-    return matches
-
-@router.get("/students/{student_id}", response_model=List[MatchResult])
-async def get_matches_for_student(student_id: str, engine: AIOEngine = Depends(get_engine)):
-    student = await engine.find_one(User, User.id == ObjectId(student_id))
+    return role
+
+async def _table_role_matches(engine: AIOEngine, loaders: Loaders, role: Role, limit: int, cursor: Optional[str]):
+    role_id = str(role.id)
+    page, total, next_cursor = await _read_matches(engine, "role_id", role_id, "student_id", limit, cursor)
+
+    # Only the returned rows need the full student document
+    students = await loaders.users.load_map(m.student_id for m in page)
+    return {
+        "items": [match_result(m, students[m.student_id], role) for m in page if m.student_id in students],
+        "total": total,
+        "nextCursor": next_cursor
+    }
+
+async def _pipeline_matches(engine: AIOEngine, role: Role, limit: int, cursor: Optional[str]):
+    after = score_cursor_query(cursor, "studentId", "matchPercentage")
+    rows, total = await aggregate_role_matches(engine, role, limit, after)
+    page = rows[:limit]
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_score_cursor(page[-1]["matchPercentage"], page[-1]["studentId"])
+
+    student_exp, exp_alignment = _experience(role)
+    items = [
+        {
+            **row,
+            "id": f"{row['studentId']}-{role.id}",
+            "roleId": str(role.id),
+            "experienceYears": student_exp,
+            "experienceAlignment": exp_alignment
+        }
+        for row in page
+    ]
+    return {"items": items, "total": total, "nextCursor": next_cursor}
+
+async def _semantic_role_matches(engine: AIOEngine, loaders: Loaders, role: Role, limit: int, cursor: Optional[str]):
+    await asyncio.gather(match_engine.ensure_loaded(engine), semantic_index.ensure_loaded(engine))
+    neighbors = [semantic_index.neighbors(skill_id) for skill_id in role.required_skill_ids]
+    scores = match_engine.score_role_soft(neighbors)
+    student_ids = match_engine.student_ids()
+
+    rows = top_k(scores, student_ids, limit + 1, decode_score_cursor(cursor) if cursor else None)
+    page = rows[:limit]
+    hits = match_engine.soft_hits(neighbors, page)
+    students = await loaders.users.load_map(str(student_ids[row]) for row in page)
+
+    items = []
+    for i, row in enumerate(page):
+        student = students.get(str(student_ids[row]))
+        if student:
+            matched = [s for j, s in enumerate(role.required_skills) if hits[i, j] > 0]
+            missing = [s for j, s in enumerate(role.required_skills) if hits[i, j] == 0]
+            items.append(_build_match(student, role, int(scores[row]), matched, missing))
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_score_cursor(int(scores[page[-1]]), str(student_ids[page[-1]]))
+    return {"items": items, "total": int(np.count_nonzero(scores)), "nextCursor": next_cursor}
+
+@router.post("/roles/batch", response_model=Dict[str, Page[MatchResult]])
+async def get_matches_for_roles(
+    req: BatchMatchRequest,
+    engine: AIOEngine = Depends(get_engine),
+    loaders: Loaders = Depends(get_loaders)
+):
+    """
+    Fetches the first page of matches for several roles in one call, e.g. for a
+    recruiter dashboard. Results are keyed by role ID.
+    """
+    roles = await loaders.roles.load_map(req.role_ids)
+    role_ids = list(roles)
+    pages = await asyncio.gather(*[
+        _read_matches(engine, "role_id", role_id, "student_id", req.limit, None) for role_id in role_ids
+    ])
+
+    students = await loaders.users.load_map(m.student_id for page, _, _ in pages for m in page)
+    return {
+        role_id: {
+            "items": [match_result(m, students[m.student_id], roles[role_id]) for m in page if m.student_id in students],
+            "total": total,
+            "nextCursor": next_cursor
+        }
+        for role_id, (page, total, next_cursor) in zip(role_ids, pages)
+    }
+
+@router.get("/students/{student_id}", response_model=Page[MatchResult])
+async def get_matches_for_student(
+    student_id: str,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    mode: MatchMode = MatchMode.TABLE,
+    engine: AIOEngine = Depends(get_engine),
+    loaders: Loaders = Depends(get_loaders)
+):
+    if mode == MatchMode.PIPELINE:
+        raise HTTPException(status_code=400, detail="Pipeline mode is only available for role matches")
+
+    key = await match_cache.student_key(engine, student_id, mode.value, limit, cursor)
+    cached = match_cache.get(key)
+    if cached is not None:
+        return cached
+
+    student = await loaders.users.load(student_id)
     if not student:
         raise HTTPException(status_code=404, detail="Student not found")
-        
-    roles = await engine.find(Role, Role.is_active == True)
-    
-    matches = []
-    for role in roles:
-        match_data = calculate_match(student, role)
-        if match_data['matchPercentage'] > 0:
-            matches.append(match_data)
-            
-    matches.sort(key=lambda x: x['matchPercentage'], reverse=True)
-    return matches
+
+    if mode == MatchMode.SEMANTIC:
+        result = await _semantic_student_matches(engine, loaders, student, limit, cursor)
+    else:
+        result = await _table_student_matches(engine, loaders, student, limit, cursor)
+
+    match_cache.set(key, result)
+    return result
+
+async def _table_student_matches(engine: AIOEngine, loaders: Loaders, student: User, limit: int, cursor: Optional[str]):
+    page, total, next_cursor = await _read_matches(engine, "student_id", str(student.id), "role_id", limit, cursor)
+
+    roles = await loaders.roles.load_map(m.role_id for m in page)
+    return {
+        "items": [match_result(m, student, roles[m.role_id]) for m in page if m.role_id in roles],
+        "total": total,
+        "nextCursor": next_cursor
+    }
+
+async def _semantic_student_matches(engine: AIOEngine, loaders: Loaders, student: User, limit: int, cursor: Optional[str]):
+    await asyncio.gather(match_engine.ensure_loaded(engine), semantic_index.ensure_loaded(engine))
+    # Scored from the stored profile, so this works even before the engine sees a profile update
+    similarities = semantic_index.best_similarities(s.skill_id for s in student.skills)
+    role_ids, scores = match_engine.score_student_soft(similarities)
+
+    rows = top_k(scores, role_ids, limit + 1, decode_score_cursor(cursor) if cursor else None)
+    page = rows[:limit]
+    roles = await loaders.roles.load_map(str(role_ids[row]) for row in page)
+
+    items = []
+    for row in page:
+        role = roles.get(str(role_ids[row]))
+        if role:
+            matched = [s for s, skill_id in zip(role.required_skills, role.required_skill_ids) if skill_id in similarities]
+            missing = [s for s, skill_id in zip(role.required_skills, role.required_skill_ids) if skill_id not in similarities]
+            items.append(_build_match(student, role, int(scores[row]), matched, missing))
+
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_score_cursor(int(scores[page[-1]]), str(role_ids[page[-1]]))
+    return {"items": items, "total": int(np.count_nonzero(scores)), "nextCursor": next_cursor}
 
 def calculate_match(student: User, role: Role) -> Dict[str, Any]:
-    student_skills_names = {s.name.lower() for s in student.skills}
-    role_skills_names = {s.lower() for s in role.required_skills}
-    
-    matched_skills = [s for s in role.required_skills if s.lower() in student_skills_names]
-    missing_skills = [s for s in role.required_skills if s.lower() not in student_skills_names]
-    
-    match_percentage = 0
-    if role.required_skills:
-        match_percentage = int((len(matched_skills) / len(role.required_skills)) * 100)
-    
+    """Score a student/role pair on the fly, without the match table."""
+    score, matched_skills, missing_skills = match_skills(
+        [s.skill_id for s in student.skills], role.required_skills, role.required_skill_ids
+    )
+    return _build_match(student, role, score, matched_skills, missing_skills)
+
+def match_result(match: Match, student: User, role: Role) -> Dict[str, Any]:
+    """Build the response for a row of the materialized match table."""
+    return _build_match(student, role, match.score, match.skills_matched, match.skills_missing)
+
+def _build_match(student: User, role: Role, match_percentage: int, matched_skills: List[str], missing_skills: List[str]) -> Dict[str, Any]:
+    student_exp, exp_alignment = _experience(role)
+    return {
+        "id": f"{student.id}-{role.id}",
+        "studentId": str(student.id),
+        "roleId": str(role.id),
+        "studentName": student.full_name,
+        "email": student.email,
+        "matchPercentage": match_percentage,
+        "topSkills": [s.name for s in student.skills[:3]], # Top 3 skills
+        "experienceYears": student_exp,
+        "location": student.university, # Using university as location proxy for now
+        "skillsMatched": matched_skills,
+        "skillsMissing": missing_skills,
+        "experienceAlignment": exp_alignment
+    }
+
+def _experience(role: Role):
     # Simple experience parsing (assuming format "X years")
     # In real app, store as integer in DB
     student_exp = 0 # Default
     # Attempt to parse student experience field if it exists specifically or assume 0
     # User model currently doesn't have explicit 'experience_years', let's assume 0 or check if 'experience' string exists
-    # Checking User model: it has 'graduation_year' but not 'experience'. 
+    # Checking User model: it has 'graduation_year' but not 'experience'.
     # For now, we will mock experience based on grad year or random, or better, add it to model later.
     # We will assume 2 years for now to avoid breaking.
-    
+
     # Parse role requirement
     role_min_exp = role.min_experience_years
-    
+
     exp_alignment = "N/A"
     diff = student_exp - role_min_exp
     if diff >= 0:
@@ -91,17 +325,4 @@ def calculate_match(student: User, role: Role) -> Dict[str, Any]:
     else:
         exp_alignment = f"{abs(diff)} year(s) below requirement"
 
-    return {
-        "id": f"{student.id}-{role.id}",
-        "studentId": str(student.id),
-        "roleId": str(role.id),
-        "studentName": student.full_name,
-        "email": student.email,
-        "matchPercentage": match_percentage,
-        "topSkills": [s.name for s in student.skills[:3]], # Top 3 skills
-        "experienceYears": student_exp,
-        "location": student.university, # Using university as location proxy for now
-        "skillsMatched": matched_skills,
-        "skillsMissing": missing_skills,
-        "experienceAlignment": exp_alignment
-    }
+    return student_exp, exp_alignment
@@ -0,0 +1,85 @@
+import asyncio
+from typing import Any, Dict, Generic, List, Optional, Tuple, Type, TypeVar
+from bson.errors import InvalidId
+from fastapi import HTTPException
+from odmantic import AIOEngine, Model, ObjectId
+from pydantic import BaseModel
+
+from app.api.streaming import document_record
+
+T = TypeVar("T")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    # Number of rows the full result would contain; keyset listings only count it on the first page
+    total: Optional[int] = None
+    nextCursor: Optional[str] = None
+
+def encode_score_cursor(score: int, item_id: str) -> str:
+    return f"{score}:{item_id}"
+
+def decode_score_cursor(cursor: str) -> Tuple[int, str]:
+    try:
+        score, item_id = cursor.split(":", 1)
+        return int(score), item_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+def score_cursor_query(cursor: Optional[str], id_field: str, score_field: str = "score") -> Dict[str, Any]:
+    """Mongo filter for the rows after a cursor, in (score desc, id asc) order."""
+    if not cursor:
+        return {}
+    score, item_id = decode_score_cursor(cursor)
+    return {"$or": [
+        {score_field: {"$lt": score}},
+        {score_field: score, id_field: {"$gt": item_id}},
+    ]}
+
+def id_cursor_query(cursor: Optional[str], descending: bool = False) -> Dict[str, Any]:
+    """Mongo filter for the documents after a cursor holding the last `_id` of the previous page."""
+    if not cursor:
+        return {}
+    try:
+        last_id = ObjectId(cursor)
+    except (InvalidId, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return {"_id": {"$lt" if descending else "$gt": last_id}}
+
+def projection(schema: Type[BaseModel]) -> Dict[str, int]:
+    """Mongo projection of the fields a lean response schema declares; `id` maps to the always-returned `_id`."""
+    return {name: 1 for name in schema.model_fields if name != "id"}
+
+async def keyset_page(
+    engine: AIOEngine,
+    model: Type[Model],
+    query: Dict[str, Any],
+    schema: Type[BaseModel],
+    limit: int,
+    cursor: Optional[str],
+    descending: bool = False,
+) -> Dict[str, Any]:
+    """
+    One page of `model` documents matching `query`, in `_id` order, decoded straight
+    into `schema` from a projected read. Walking `_id` keeps every page an index
+    range scan however deep the cursor is, where skip/offset would rescan the prefix.
+    The filtered count does not have that property, so `total` is only computed for
+    the first page, the one without a cursor, and is None after it.
+    """
+    collection = engine.get_collection(model)
+    rows = collection.find({**query, **id_cursor_query(cursor, descending)}, projection(schema))
+    rows = rows.sort("_id", -1 if descending else 1).limit(limit + 1)
+    if cursor:
+        docs, total = await rows.to_list(length=limit + 1), None
+    else:
+        docs, total = await asyncio.gather(rows.to_list(length=limit + 1), collection.count_documents(query))
+
+    items = []
+    for doc in docs[:limit]:
+        record = document_record(doc)
+        record["id"] = str(record["id"])
+        items.append(schema.model_validate(record))
+    next_cursor = items[-1].id if len(docs) > limit else None
+    return {"items": items, "total": total, "nextCursor": next_cursor}
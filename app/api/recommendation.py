@@ -1,7 +1,13 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
 from pydantic import BaseModel
 from typing import List
+from app.db import get_engine
+from odmantic import AIOEngine
 from app.core.recommendation_service import recommendation_service
+from app.core.llm_cache import llm_cache
+from app.core.ai_demand import ai_demand, LEARNING_PATH
+from app.core.llm_warmer import llm_warmer
+from app.api.streaming import sse_response
 
 router = APIRouter()
 
@@ -10,8 +16,38 @@ class LearningPathRequest(BaseModel):
     goal: str
 
 @router.post("/learning-path")
-async def get_learning_path(request: LearningPathRequest):
-    result = await recommendation_service.generate_learning_path(request.skills, request.goal)
+async def get_learning_path(request: LearningPathRequest, background_tasks: BackgroundTasks, engine: AIOEngine = Depends(get_engine)):
+    background_tasks.add_task(ai_demand.record, engine, LEARNING_PATH, [(request.skills, request.goal, None)])
+    result = await recommendation_service.generate_learning_path(request.skills, request.goal, engine)
     if "error" in result:
         raise HTTPException(status_code=500, detail=result["error"])
     return result
+
+@router.post("/learning-path/stream")
+async def stream_learning_path(request: LearningPathRequest, background_tasks: BackgroundTasks, engine: AIOEngine = Depends(get_engine)):
+    """
+    Same learning path as a `text/event-stream`: a `roadmap` event first, one `milestone`
+    event per phase as it is generated, then `done` with the full document, or `error`.
+    """
+    background_tasks.add_task(ai_demand.record, engine, LEARNING_PATH, [(request.skills, request.goal, None)])
+    return sse_response(recommendation_service.stream_learning_path(request.skills, request.goal, engine))
+
+@router.get("/cache-stats")
+async def get_llm_cache_stats():
+    """Hit and miss counters of this worker's LLM result cache."""
+    return llm_cache.stats()
+
+@router.get("/coalescing-stats")
+async def get_coalescing_stats():
+    """Gemini calls requested per operation, and how many of them joined an identical call already in flight."""
+    return recommendation_service.flights.stats()
+
+@router.get("/key-stats")
+async def get_key_stats():
+    """Health and remaining per-minute budget of each Gemini key in this worker."""
+    return recommendation_service.keys.stats()
+
+@router.get("/warmer-stats")
+async def get_warmer_stats():
+    """Off-peak window and last run of this worker's LLM cache warmer."""
+    return llm_warmer.stats()
@@ -0,0 +1,151 @@
+import asyncio
+import functools
+import inspect
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app.core.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+HIT = "HIT"  # Fresh entry
+STALE = "STALE"  # Served from cache while a background refresh runs
+MISS = "MISS"  # Computed by this request
+COALESCED = "COALESCED"  # Waited for another request's computation
+
+class ResponseCache:
+    """
+    In-process cache of JSON payloads with stale-while-revalidate semantics.
+
+    Within `ttl` an entry is served as is. For `stale_while_revalidate` seconds
+    after that it is still served, and the first caller starts a single background
+    refresh. Past that, or on a cold cache, callers wait for one shared computation
+    instead of each recomputing the payload.
+    """
+
+    def __init__(self, max_entries: int = 256):
+        self._entries = LRUCache(max_entries)
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+
+    async def get(
+        self,
+        key: Hashable,
+        compute: Callable[[], Awaitable[Any]],
+        ttl: float,
+        stale_while_revalidate: float = 0,
+    ) -> Tuple[Any, float, str]:
+        """Returns (payload, age in seconds, one of HIT/STALE/MISS/COALESCED)."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            created_at, payload = entry
+            age = time.monotonic() - created_at
+            if age < ttl:
+                return payload, age, HIT
+            if age < ttl + stale_while_revalidate:
+                if key not in self._inflight:
+                    self._start(key, compute)
+                return payload, age, STALE
+
+        task = self._inflight.get(key)
+        state = COALESCED
+        if task is None:
+            task = self._start(key, compute)
+            state = MISS
+        # Shielded so a disconnecting client does not cancel the computation others wait on
+        payload = await asyncio.shield(task)
+        return payload, 0.0, state
+
+    def invalidate(self, prefix: str = ""):
+        """Drop every entry whose key starts with `prefix`, e.g. after a write to the underlying data."""
+        for key in [k for k in self._entries.keys() if str(k[0]).startswith(prefix)]:
+            self._entries.pop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {**self._entries.stats(), "inflight": len(self._inflight)}
+
+    def _start(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> asyncio.Task:
+        task = asyncio.ensure_future(self._refresh(key, compute))
+        # Background refreshes have nobody awaiting them; their server errors are already logged
+        task.add_done_callback(lambda t: t.cancelled() or t.exception())
+        self._inflight[key] = task
+        return task
+
+    async def _refresh(self, key: Hashable, compute: Callable[[], Awaitable[Any]]) -> Any:
+        try:
+            payload = jsonable_encoder(await compute())
+            self._entries.set(key, (time.monotonic(), payload))
+            return payload
+        except HTTPException:
+            # A client error such as a bad cursor, not a cache failure; the caller answers it as usual
+            raise
+        except Exception as e:
+            logger.error(f"Response cache refresh failed for {key}: {str(e)}")
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+# Shared by every cached route; keys start with the request path
+response_cache = ResponseCache()
+
+def _default_key(request: Request) -> Hashable:
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())))
+
+def _parameter_of_type(parameters, annotation) -> Optional[str]:
+    return next((p.name for p in parameters if p.annotation is annotation), None)
+
+def cached_response(
+    ttl: float,
+    stale_while_revalidate: float = 0,
+    key: Callable[[Request], Hashable] = _default_key,
+    skip: Optional[Callable[[Request], bool]] = None,
+    cache: ResponseCache = response_cache,
+):
+    """
+    Route decorator, placed below `@router.get(...)`. Caches the JSON payload per
+    path and query string and adds `Cache-Control` and `Age` headers. Requests
+    for which `skip(request)` is true, e.g. streaming ones, bypass the cache.
+    Keys must start with the path so that `invalidate` can find them.
+    """
+    def decorator(endpoint):
+        signature = inspect.signature(endpoint)
+        parameters = list(signature.parameters.values())
+        # FastAPI injects a single Request and Response per endpoint, so share the endpoint's own if it has them
+        request_name = _parameter_of_type(parameters, Request)
+        response_name = _parameter_of_type(parameters, Response)
+        if request_name is None:
+            request_name = "_cache_request"
+            parameters.append(inspect.Parameter(request_name, inspect.Parameter.KEYWORD_ONLY, annotation=Request))
+        if response_name is None:
+            response_name = "_cache_response"
+            parameters.append(inspect.Parameter(response_name, inspect.Parameter.KEYWORD_ONLY, annotation=Response))
+        own = set(signature.parameters)
+
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            request: Request = kwargs[request_name]
+            response: Response = kwargs[response_name]
+            endpoint_kwargs = {k: v for k, v in kwargs.items() if k in own}
+            if skip is not None and skip(request):
+                return await endpoint(**endpoint_kwargs)
+
+            payload, age, state = await cache.get(
+                key(request), lambda: endpoint(**endpoint_kwargs), ttl, stale_while_revalidate
+            )
+            headers = {
+                "Cache-Control": f"public, max-age={int(ttl)}, stale-while-revalidate={int(stale_while_revalidate)}",
+                "Age": str(int(age)),
+                "X-Cache": state,
+            }
+            if state == MISS:
+                # Headers the endpoint set while computing, e.g. Server-Timing, only describe this request's run
+                headers.update({k: v for k, v in response.headers.items() if k.lower() != "content-length"})
+            return JSONResponse(content=payload, headers=headers)
+
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+    return decorator
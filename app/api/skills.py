@@ -1,5 +1,5 @@
-from fastapi import APIRouter, HTTPException, Depends
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from pydantic import BaseModel, Field
 from typing import List, Optional
 
 router = APIRouter()
@@ -15,18 +15,51 @@ class SkillGapResponse(BaseModel):
     # recommendations: List[str]
 
 from app.core.recommendation_service import recommendation_service
+from app.core.ai_demand import ai_demand, SKILL_GAP
+from app.db import get_engine
+from app.api.streaming import ndjson_response
+from odmantic import AIOEngine
 
 @router.post("/gap-analysis", response_model=SkillGapResponse)
-async def analyze_skill_gap(req: SkillAnalysisRequest):
+async def analyze_skill_gap(req: SkillAnalysisRequest, background_tasks: BackgroundTasks, fast: bool = False, engine: AIOEngine = Depends(get_engine)):
+    """
+    Missing skills come from live role data when enough similar roles exist. With
+    `fast=true` the action plan is templated too, so no Gemini call is made.
+    """
+    background_tasks.add_task(ai_demand.record, engine, SKILL_GAP, [(req.current_skills, req.target_role, req.major)])
     result = await recommendation_service.analyze_skill_gap(
         req.current_skills, 
         req.target_role, 
-        req.major
+        req.major,
+        engine,
+        fast
     )
     if "error" in result and not result.get("missing_skills"):
         raise HTTPException(status_code=500, detail=result["error"])
     return result
 
+MAX_BATCH_ANALYSES = 500
+
+class BatchSkillAnalysisRequest(BaseModel):
+    items: List[SkillAnalysisRequest] = Field(..., max_length=MAX_BATCH_ANALYSES)
+
+@router.post("/gap-analysis/batch")
+async def analyze_skill_gaps(req: BatchSkillAnalysisRequest, background_tasks: BackgroundTasks, fast: bool = False, engine: AIOEngine = Depends(get_engine)):
+    """
+    Gap analyses for a cohort, streamed as NDJSON in completion order: one line per
+    item, `{"index", "missing_skills", "action_plan"}`, plus `"error"` when it failed.
+    """
+    entries = [(item.current_skills, item.target_role, item.major) for item in req.items]
+    background_tasks.add_task(ai_demand.record, engine, SKILL_GAP, entries)
+
+    async def records():
+        analyses = recommendation_service.analyze_skill_gaps(entries, engine, fast)
+        async for positions, result in analyses:
+            for index in positions:
+                yield {"index": index, **result}
+
+    return ndjson_response(records())
+
 class VerifySkillRequest(BaseModel):
     skill_name: str
     evidence_url: Optional[str] = None
@@ -0,0 +1,44 @@
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Tuple
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+from odmantic import ObjectId
+
+NDJSON = "application/x-ndjson"
+EVENT_STREAM = "text/event-stream"
+
+def wants_ndjson(request: Request) -> bool:
+    """Streaming is opt-in through the Accept header."""
+    return NDJSON in request.headers.get("accept", "")
+
+def _json_default(value: Any):
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+def document_record(doc: Dict[str, Any]) -> Dict[str, Any]:
+    """Raw Mongo document -> API record, with `_id` exposed as `id` like the odmantic models."""
+    doc = dict(doc)
+    if "_id" in doc:
+        doc["id"] = doc.pop("_id")
+    return doc
+
+def ndjson_response(records: AsyncIterator[Dict[str, Any]]) -> StreamingResponse:
+    """Send one JSON record per line as soon as each is produced."""
+    async def body():
+        async for record in records:
+            yield json.dumps(record, default=_json_default) + "\n"
+
+    return StreamingResponse(body(), media_type=NDJSON)
+
+def sse_response(events: AsyncIterator[Tuple[str, Any]]) -> StreamingResponse:
+    """Send (event name, JSON data) pairs as Server-Sent Events as soon as each is produced."""
+    async def body():
+        async for name, data in events:
+            yield f"event: {name}\ndata: {json.dumps(data, default=_json_default)}\n\n"
+
+    # Proxies must not buffer the stream, or nothing arrives until it ends
+    return StreamingResponse(body(), media_type=EVENT_STREAM, headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
@@ -1,16 +1,46 @@
-from fastapi import APIRouter, HTTPException, Depends
-from typing import List
+from fastapi import APIRouter, HTTPException, Depends, Query, Request
+from typing import List, Optional
+from pydantic import BaseModel
 from app.db import get_engine
 from odmantic import AIOEngine, ObjectId
-from app.models.user import User, UserRole
+from app.models.user import User, UserRole, Skill
+from app.api.pagination import Page, keyset_page, id_cursor_query, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from app.api.streaming import wants_ndjson, ndjson_response, document_record
 
 router = APIRouter()
 
-@router.get("/", response_model=List[User])
-async def get_students(engine: AIOEngine = Depends(get_engine)):
-    # Fetch only students
-    students = await engine.find(User, User.role == UserRole.STUDENT)
-    return students
+# Never sent in streamed exports
+SECRET_FIELDS = {"hashed_password": 0, "otp": 0, "otp_expires_at": 0}
+
+class StudentSummary(BaseModel):
+    # Listing view of a student; credentials and OTP state are never read
+    id: str
+    email: str
+    full_name: str
+    university: Optional[str] = None
+    major: Optional[str] = None
+    graduation_year: Optional[int] = None
+    location: Optional[str] = None
+    avatar: Optional[str] = None
+    skills: List[Skill] = []
+
+@router.get("/", response_model=Page[StudentSummary])
+async def get_students(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    engine: AIOEngine = Depends(get_engine)
+):
+    """
+    One page of students in creation order; pass `nextCursor` back as `cursor` for the next.
+    An NDJSON export streams every student after `cursor`, or all of them without one.
+    """
+    if wants_ndjson(request):
+        query = {"role": UserRole.STUDENT.value, **id_cursor_query(cursor)}
+        rows = engine.get_collection(User).find(query, SECRET_FIELDS).sort("_id", 1)
+        return ndjson_response(document_record(doc) async for doc in rows)
+
+    return await keyset_page(engine, User, {"role": UserRole.STUDENT.value}, StudentSummary, limit, cursor)
 
 @router.get("/{id}", response_model=User)
 async def get_student(id: str, engine: AIOEngine = Depends(get_engine)):
@@ -0,0 +1,26 @@
+import time
+from typing import Awaitable, List, Tuple, TypeVar
+from fastapi import Response
+
+T = TypeVar("T")
+
+class ServerTiming:
+    """Collects how long each part of a request took and reports it in a `Server-Timing` header."""
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self._entries: List[Tuple[str, float]] = []
+
+    async def measure(self, name: str, awaitable: Awaitable[T]) -> T:
+        started = time.perf_counter()
+        try:
+            return await awaitable
+        finally:
+            self._entries.append((name, (time.perf_counter() - started) * 1000))
+
+    def header(self) -> str:
+        total = (time.perf_counter() - self._started) * 1000
+        return ", ".join(f"{name};dur={ms:.1f}" for name, ms in self._entries + [("total", total)])
+
+    def apply(self, response: Response):
+        response.headers["Server-Timing"] = self.header()
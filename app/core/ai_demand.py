@@ -0,0 +1,94 @@
+import hashlib
+import json
+from collections import Counter
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from odmantic import AIOEngine
+from pymongo import UpdateOne
+
+from app.core.llm_cache import canonical_skills, canonical_text
+from app.models.ai_demand import AIDemand
+
+LEARNING_PATH = "learning_path"
+SKILL_GAP = "skill_gap"
+
+# (skills, goal or target role, major) of one request; learning paths have no major
+DemandEntry = Tuple[List[str], str, Optional[str]]
+
+def demand_key(kind: str, skills: Iterable[str], goal: str, major: Optional[str] = None) -> str:
+    canonical = json.dumps({
+        "skills": canonical_skills(skills),
+        "goal": canonical_text(goal),
+        "major": canonical_text(major) if major is not None else None,
+    }, sort_keys=True)
+    return f"{kind}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+class AIDemandCounters:
+    """
+    How often each learning path and gap analysis is asked for, per canonical inputs,
+    recorded by the endpoints after they respond. The LLM cache warmer reads the most
+    requested inputs, goals and majors back to know what to generate ahead of time.
+    """
+
+    async def record(self, engine: AIOEngine, kind: str, entries: Iterable[DemandEntry], now: Optional[datetime] = None):
+        """Count one request per entry; repeats within `entries` add up in one write."""
+        now = now or datetime.utcnow()
+        counts: Counter = Counter()
+        fields: Dict[str, dict] = {}
+        for skills, goal, major in entries:
+            key = demand_key(kind, skills, goal, major)
+            counts[key] += 1
+            fields.setdefault(key, {
+                "kind": kind,
+                "skills": list(skills),
+                "goal": goal,
+                "goal_key": canonical_text(goal),
+                "major": major,
+                "major_key": canonical_text(major) if major is not None else None,
+            })
+
+        operations = [
+            UpdateOne(
+                {"_id": key},
+                {"$inc": {"count": count}, "$max": {"last_requested_at": now}, "$setOnInsert": fields[key]},
+                upsert=True,
+            )
+            for key, count in counts.items()
+        ]
+        if operations:
+            await engine.get_collection(AIDemand).bulk_write(operations, ordered=False)
+
+    async def popular(self, engine: AIOEngine, since: datetime, min_count: int, limit: int) -> List[AIDemand]:
+        """Inputs asked for at least `min_count` times and again since `since`, most requested first."""
+        return await engine.find(
+            AIDemand,
+            {"last_requested_at": {"$gte": since}, "count": {"$gte": min_count}},
+            sort=AIDemand.count.desc(),
+            limit=limit,
+        )
+
+    async def top_goals(self, engine: AIOEngine, kind: str, since: datetime, limit: int) -> List[Tuple[str, int]]:
+        """(goal as first asked, requests) of the most requested goals or target roles of one kind."""
+        pipeline = [
+            {"$match": {"kind": kind, "last_requested_at": {"$gte": since}}},
+            {"$group": {"_id": "$goal_key", "goal": {"$first": "$goal"}, "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        docs = await engine.get_collection(AIDemand).aggregate(pipeline).to_list(length=None)
+        return [(doc["goal"], doc["count"]) for doc in docs]
+
+    async def top_majors(self, engine: AIOEngine, since: datetime, limit: int) -> List[Tuple[str, int]]:
+        """(major as first asked, requests) of the majors gap analyses were most requested for."""
+        pipeline = [
+            {"$match": {"kind": SKILL_GAP, "last_requested_at": {"$gte": since}, "major_key": {"$ne": None}}},
+            {"$group": {"_id": "$major_key", "major": {"$first": "$major"}, "count": {"$sum": "$count"}}},
+            {"$sort": {"count": -1, "_id": 1}},
+            {"$limit": limit},
+        ]
+        docs = await engine.get_collection(AIDemand).aggregate(pipeline).to_list(length=None)
+        return [(doc["major"], doc["count"]) for doc in docs]
+
+# Singleton instance
+ai_demand = AIDemandCounters()
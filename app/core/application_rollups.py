@@ -0,0 +1,141 @@
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from odmantic import AIOEngine
+from pymongo import ReplaceOne, UpdateOne
+
+from app.models.application import Application, ApplicationStatus
+from app.models.application_rollup import ApplicationRollup
+
+DAY = "day"
+HOUR = "hour"
+
+def _bucket_starts(applied_at: datetime) -> Dict[str, datetime]:
+    return {
+        DAY: applied_at.replace(hour=0, minute=0, second=0, microsecond=0),
+        HOUR: applied_at.replace(minute=0, second=0, microsecond=0),
+    }
+
+def _key(granularity: str, start: datetime) -> str:
+    return f"{granularity}:{start.strftime('%Y-%m-%d') if granularity == DAY else start.strftime('%Y-%m-%dT%H')}"
+
+def _status(status) -> str:
+    return status.value if isinstance(status, ApplicationStatus) else str(status)
+
+class ApplicationRollups:
+    """
+    Per-day and per-hour application counters, bucketed by `applied_at`. Each bucket
+    holds the number of applications per current status and the sum and count of
+    their match scores, so trends over any window read one document per bucket
+    instead of scanning the applications.
+    """
+
+    async def applied(self, engine: AIOEngine, application: Application):
+        await self._inc(engine, application, {
+            "total": 1,
+            f"statuses.{_status(application.status)}": 1,
+            "match_score_sum": application.match_score,
+            "match_score_count": 1,
+        })
+
+    async def status_changed(self, engine: AIOEngine, application: Application, old_status: ApplicationStatus):
+        """Move one application between status counts, in the buckets it was counted in when it applied."""
+        if _status(old_status) == _status(application.status):
+            return
+        await self._inc(engine, application, {
+            f"statuses.{_status(old_status)}": -1,
+            f"statuses.{_status(application.status)}": 1,
+        })
+
+    async def status_changes(self, engine: AIOEngine, changes: List[Tuple[datetime, ApplicationStatus, ApplicationStatus]]):
+        """
+        Batch form of status_changed for (applied_at, old status, new status) triples. Increments
+        are merged per bucket first, so the whole batch is a single bulk write with
+        at most one update per touched bucket.
+        """
+        merged: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        starts: Dict[str, Tuple[str, datetime]] = {}
+        for applied_at, old_status, new_status in changes:
+            if _status(old_status) == _status(new_status):
+                continue
+            for granularity, start in _bucket_starts(applied_at).items():
+                key = _key(granularity, start)
+                starts[key] = (granularity, start)
+                merged[key][f"statuses.{_status(old_status)}"] -= 1
+                merged[key][f"statuses.{_status(new_status)}"] += 1
+
+        operations = []
+        for key, increments in merged.items():
+            increments = {field: delta for field, delta in increments.items() if delta}
+            if increments:
+                granularity, start = starts[key]
+                operations.append(UpdateOne(
+                    {"_id": key},
+                    {"$inc": increments, "$setOnInsert": {"granularity": granularity, "bucket_start": start}},
+                    upsert=True,
+                ))
+        if operations:
+            await engine.get_collection(ApplicationRollup).bulk_write(operations, ordered=False)
+
+    async def buckets(self, engine: AIOEngine, granularity: str, since: datetime) -> List[ApplicationRollup]:
+        """Buckets of one granularity starting at or after `since`, oldest first. Empty buckets are absent."""
+        return await engine.find(
+            ApplicationRollup,
+            (ApplicationRollup.granularity == granularity) & (ApplicationRollup.bucket_start >= since),
+            sort=ApplicationRollup.bucket_start,
+        )
+
+    async def daily(self, engine: AIOEngine, days: int, now: datetime = None) -> List[ApplicationRollup]:
+        """The last `days` day buckets up to today, oldest first, with zero buckets filled in."""
+        today = _bucket_starts(now or datetime.utcnow())[DAY]
+        first = today - timedelta(days=days - 1)
+        found = {b.bucket_start: b for b in await self.buckets(engine, DAY, first)}
+        return [
+            found.get(day) or ApplicationRollup(key=_key(DAY, day), granularity=DAY, bucket_start=day)
+            for day in (first + timedelta(days=i) for i in range(days))
+        ]
+
+    async def backfill(self, engine: AIOEngine) -> int:
+        """Recompute every bucket from the applications. Returns the number of applications counted."""
+        buckets: Dict[str, dict] = {}
+        counted = 0
+        cursor = engine.get_collection(Application).find({}, {"applied_at": 1, "status": 1, "match_score": 1})
+        async for doc in cursor:
+            for granularity, start in _bucket_starts(doc["applied_at"]).items():
+                key = _key(granularity, start)
+                bucket = buckets.setdefault(key, {
+                    "granularity": granularity, "bucket_start": start, "total": 0,
+                    "statuses": defaultdict(int), "match_score_sum": 0, "match_score_count": 0,
+                })
+                bucket["total"] += 1
+                bucket["statuses"][doc["status"]] += 1
+                bucket["match_score_sum"] += doc.get("match_score", 0)
+                bucket["match_score_count"] += 1
+            counted += 1
+
+        collection = engine.get_collection(ApplicationRollup)
+        operations = [
+            ReplaceOne({"_id": key}, {**bucket, "statuses": dict(bucket["statuses"])}, upsert=True)
+            for key, bucket in buckets.items()
+        ]
+        for start in range(0, len(operations), 1000):
+            await collection.bulk_write(operations[start:start + 1000], ordered=False)
+        await collection.delete_many({"_id": {"$nin": list(buckets)}})
+        return counted
+
+    async def _inc(self, engine: AIOEngine, application: Application, increments: Dict[str, int]):
+        await engine.get_collection(ApplicationRollup).bulk_write(self._operations(application, increments), ordered=False)
+
+    def _operations(self, application: Application, increments: Dict[str, int]) -> List[UpdateOne]:
+        return [
+            UpdateOne(
+                {"_id": _key(granularity, start)},
+                {"$inc": increments, "$setOnInsert": {"granularity": granularity, "bucket_start": start}},
+                upsert=True,
+            )
+            for granularity, start in _bucket_starts(application.applied_at).items()
+        ]
+
+# Singleton instance
+application_rollups = ApplicationRollups()
@@ -13,6 +13,26 @@ class Settings(BaseSettings):
     SENDGRID_API_KEY: str = ""
     SENDGRID_FROM_EMAIL: str = ""
     GOOGLE_CLIENT_ID: str = ""
+    MATCH_ENGINE_REFRESH_SECONDS: int = 300
+    SEMANTIC_MIN_SIMILARITY: float = 0.35
+    MATCH_CACHE_MAX_ENTRIES: int = 2048
+    MATCH_CACHE_TTL_SECONDS: int = 600
+    LLM_CACHE_MAX_ENTRIES: int = 1024
+    LLM_CACHE_TTL_SECONDS: int = 7 * 24 * 3600
+    # Per Gemini key; the defaults are the free-tier limits of gemini-2.5-flash
+    GEMINI_REQUESTS_PER_MINUTE: int = 10
+    GEMINI_TOKENS_PER_MINUTE: int = 250000
+    GEMINI_COOLDOWN_SECONDS: float = 60
+    GEMINI_MAX_WAIT_SECONDS: float = 10
+    # Pre-generates popular LLM results between these UTC hours. Off by default as it
+    # spends Gemini quota; workers that enable it take turns through a Mongo lease
+    LLM_WARMER_ENABLED: bool = False
+    LLM_WARMER_START_HOUR: int = 1
+    LLM_WARMER_END_HOUR: int = 6
+    LLM_WARMER_INTERVAL_SECONDS: int = 1800
+    LLM_WARMER_MAX_INPUTS: int = 200
+    # Share of the key pool's request budget the warmer leaves for live traffic
+    LLM_WARMER_RESERVE: float = 0.5
 
     class Config:
         env_file = ".env"
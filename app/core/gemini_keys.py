@@ -0,0 +1,197 @@
+import asyncio
+import logging
+import time
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from google import genai
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+OK = "ok"
+RATE_LIMITED = "rate_limited"  # 429: the key cools down, the call moves to another key
+INVALID_KEY = "invalid_key"  # The key is quarantined for the life of the process
+REJECTED = "rejected"  # Other 400s; worth one try on another key, as before the pool
+FAILED = "failed"  # Anything else; retrying would not help
+
+RETRYABLE = {RATE_LIMITED, INVALID_KEY, REJECTED}
+
+class KeyPoolError(Exception):
+    """No key could complete the call."""
+
+class NoKeyAvailable(KeyPoolError):
+    """Every key is quarantined, or none became ready within the wait limit."""
+
+def classify(error: Exception) -> str:
+    message = str(error)
+    if "API key not valid" in message or "API_KEY_INVALID" in message:
+        return INVALID_KEY
+    if "429" in message or "RESOURCE_EXHAUSTED" in message:
+        return RATE_LIMITED
+    if "400" in message:
+        return REJECTED
+    return FAILED
+
+class TokenBucket:
+    """Refills continuously up to `per_minute`. Takes may overdraw it, which delays the next ones."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.rate = per_minute / 60.0
+        self.tokens = per_minute
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` (at most a full bucket) is available."""
+        self._refill(now)
+        missing = min(amount, self.capacity) - self.tokens
+        return max(0.0, missing / self.rate) if self.rate else float("inf")
+
+    def available(self, now: float) -> float:
+        self._refill(now)
+        return max(0.0, self.tokens)
+
+    def take(self, amount: float, now: float):
+        """Remove `amount`; a negative amount gives back an over-estimate, up to capacity."""
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+class GeminiKey:
+    """One API key, its client and its health."""
+
+    def __init__(self, api_key: str, client: Any, requests_per_minute: int, tokens_per_minute: int):
+        self.label = f"...{api_key[-4:]}" if len(api_key) > 4 else "****"
+        self.client = client
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.cooldown_until = 0.0
+        self.quarantined = False
+        self.inflight = 0
+        self.counts: Dict[str, int] = {OK: 0, RATE_LIMITED: 0, INVALID_KEY: 0, REJECTED: 0, FAILED: 0}
+
+    def wait_time(self, estimated_tokens: int, now: float) -> float:
+        return max(
+            self.cooldown_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(estimated_tokens, now),
+        )
+
+class GeminiKeyPool:
+    """
+    Every configured Gemini key with its own client, created once.
+
+    Each key has token buckets for its requests and tokens per minute. A 429 puts a
+    key in cooldown, and an invalid key is quarantined. `acquire` hands out the
+    least-loaded key that is ready now, waiting up to `max_wait_seconds` for one to
+    become ready. Pool state only changes between awaits, so concurrent requests
+    need no lock and never see another request's key.
+    """
+
+    def __init__(
+        self,
+        api_keys: Iterable[str],
+        requests_per_minute: int = settings.GEMINI_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = settings.GEMINI_TOKENS_PER_MINUTE,
+        cooldown_seconds: float = settings.GEMINI_COOLDOWN_SECONDS,
+        max_wait_seconds: float = settings.GEMINI_MAX_WAIT_SECONDS,
+        client_factory: Callable[[str], Any] = lambda api_key: genai.Client(api_key=api_key),
+    ):
+        self.cooldown_seconds = cooldown_seconds
+        self.max_wait_seconds = max_wait_seconds
+        self.keys: List[GeminiKey] = [
+            GeminiKey(api_key, client_factory(api_key), requests_per_minute, tokens_per_minute)
+            for api_key in dict.fromkeys(k for k in api_keys if k)
+        ]
+        self.retries = 0
+
+    @property
+    def size(self) -> int:
+        return len(self.keys)
+
+    def healthy(self) -> int:
+        return sum(1 for key in self.keys if not key.quarantined)
+
+    def spare_share(self) -> float:
+        """
+        Share of the healthy keys' request budget that is available now, from 0 to 1.
+        Keys in cooldown count as empty, so background work can yield to live traffic.
+        """
+        now = time.monotonic()
+        keys = [k for k in self.keys if not k.quarantined]
+        capacity = sum(k.requests.capacity for k in keys)
+        if not capacity:
+            return 0.0
+        spare = sum(k.requests.available(now) for k in keys if k.cooldown_until <= now)
+        return spare / capacity
+
+    async def acquire(self, estimated_tokens: int, exclude: Iterable[GeminiKey] = ()) -> Optional[GeminiKey]:
+        """
+        A key with budget for one request of about `estimated_tokens`, skipping `exclude`.
+        None when no key qualifies within the wait limit. Pass the key back to `release`.
+        """
+        excluded = set(map(id, exclude))
+        deadline = time.monotonic() + self.max_wait_seconds
+        while True:
+            now = time.monotonic()
+            candidates = [k for k in self.keys if not k.quarantined and id(k) not in excluded]
+            if not candidates:
+                return None
+
+            waits = {id(k): k.wait_time(estimated_tokens, now) for k in candidates}
+            ready = [k for k in candidates if waits[id(k)] <= 0]
+            if ready:
+                # Fewest calls in flight, then the most request budget left
+                key = min(ready, key=lambda k: (k.inflight, -k.requests.tokens))
+                key.requests.take(1, now)
+                key.tokens.take(estimated_tokens, now)
+                key.inflight += 1
+                return key
+
+            wait = min(waits.values())
+            if now + wait > deadline:
+                return None
+            await asyncio.sleep(wait)
+
+    def release(self, key: GeminiKey, error: Optional[Exception] = None, estimated_tokens: int = 0, used_tokens: Optional[int] = None) -> str:
+        """Record how a call on `key` went. Returns its outcome, one of the module constants."""
+        key.inflight -= 1
+        outcome = OK if error is None else classify(error)
+        key.counts[outcome] += 1
+
+        if used_tokens is not None:
+            # Settle the estimate taken at acquire against what the call really used
+            key.tokens.take(used_tokens - estimated_tokens, time.monotonic())
+        if outcome == RATE_LIMITED:
+            key.cooldown_until = time.monotonic() + self.cooldown_seconds
+            logger.warning(f"Gemini key {key.label} rate limited; cooling down for {self.cooldown_seconds}s")
+        elif outcome == INVALID_KEY:
+            key.quarantined = True
+            logger.error(f"Gemini key {key.label} is not valid; quarantined")
+        if outcome in RETRYABLE:
+            self.retries += 1
+        return outcome
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            "size": self.size,
+            "healthy": self.healthy(),
+            "retries": self.retries,
+            "keys": [
+                {
+                    "key": key.label,
+                    "quarantined": key.quarantined,
+                    "coolingDownFor": round(max(0.0, key.cooldown_until - now), 1),
+                    "inflight": key.inflight,
+                    "requestBudget": round(max(0.0, key.requests.tokens), 1),
+                    "tokenBudget": int(max(0.0, key.tokens.tokens)),
+                    "outcomes": dict(key.counts),
+                }
+                for key in self.keys
+            ],
+        }
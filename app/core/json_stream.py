@@ -0,0 +1,124 @@
+import json
+from typing import Any, List, Optional, Tuple
+
+MEMBER = "member"  # (MEMBER, key, value): a top-level member whose value is complete
+ITEM = "item"  # (ITEM, key, index, value): one complete element of a top-level array member
+
+class JsonStreamParser:
+    """
+    Scans one JSON object as its text arrives in chunks.
+
+    `feed` returns each top-level member as soon as its value is complete and, for
+    members holding an array, each element as soon as that element is complete,
+    so a consumer can act on the first fields before the document ends. Text before
+    the opening brace, such as a ```json fence, is skipped. Every character is
+    scanned once, however the text is chunked.
+    """
+
+    def __init__(self):
+        self._text = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._done = False
+
+        self._phase = None  # "key", "colon", "value" or "after" at depth 1
+        self._token_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+        self._value_kind: Optional[str] = None  # First character of the member value
+        self._item_start: Optional[int] = None
+        self._item_index = 0
+
+    @property
+    def done(self) -> bool:
+        return self._done
+
+    def feed(self, chunk: str) -> List[Tuple[Any, ...]]:
+        self._text += chunk
+        events = []
+        text = self._text
+        while self._pos < len(text) and not self._done:
+            i, c = self._pos, text[self._pos]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    self._string_closed(i, events)
+                continue
+
+            if self._depth == 0:
+                if c == "{":
+                    self._depth = 1
+                    self._phase = "key"
+                continue
+
+            if c.isspace():
+                continue
+            if c == ":" and self._depth == 1:
+                self._phase = "value"
+            elif c == ",":
+                self._scalar_ended(i, events)
+                if self._depth == 1:
+                    self._phase = "key"
+            elif c in "}]":
+                self._scalar_ended(i, events)
+                self._depth -= 1
+                self._container_closed(i, events)
+            else:
+                self._token_started(i, c)
+                if c == '"':
+                    self._in_string = True
+                elif c in "{[":
+                    self._depth += 1
+        return events
+
+    def _token_started(self, i: int, c: str):
+        if self._depth == 1:
+            if self._phase == "key" and c == '"':
+                self._token_start = i
+            elif self._phase == "value" and self._value_start is None:
+                self._value_start, self._value_kind = i, c
+        elif self._depth == 2 and self._value_kind == "[" and self._item_start is None:
+            self._item_start = i
+
+    def _string_closed(self, i: int, events: list):
+        if self._depth == 1 and self._phase == "key":
+            self._key = json.loads(self._text[self._token_start:i + 1])
+            self._phase = "colon"
+        elif self._depth == 1 and self._phase == "value":
+            self._member(self._text[self._value_start:i + 1], events)
+        elif self._depth == 2 and self._value_kind == "[" and self._text[self._item_start] == '"':
+            self._item(self._text[self._item_start:i + 1], events)
+
+    def _scalar_ended(self, i: int, events: list):
+        """Numbers, booleans and null only end at the next comma or closing bracket."""
+        if self._depth == 1 and self._phase == "value" and self._value_start is not None:
+            self._member(self._text[self._value_start:i].strip(), events)
+        elif self._depth == 2 and self._value_kind == "[" and self._item_start is not None:
+            self._item(self._text[self._item_start:i].strip(), events)
+
+    def _container_closed(self, i: int, events: list):
+        if self._depth == 0:
+            self._done = True
+        elif self._depth == 1 and self._value_start is not None:
+            self._member(self._text[self._value_start:i + 1], events)
+        elif self._depth == 2 and self._value_kind == "[" and self._item_start is not None:
+            self._item(self._text[self._item_start:i + 1], events)
+
+    def _member(self, raw: str, events: list):
+        events.append((MEMBER, self._key, json.loads(raw)))
+        self._phase = "after"
+        self._value_start = self._value_kind = None
+        self._item_index = 0
+
+    def _item(self, raw: str, events: list):
+        events.append((ITEM, self._key, self._item_index, json.loads(raw)))
+        self._item_index += 1
+        self._item_start = None
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, Optional
+
+from odmantic import AIOEngine
+
+from app.core.config import settings
+from app.core.lru_cache import LRUCache
+from app.models.llm_cache import LLMCacheEntry
+
+logger = logging.getLogger(__name__)
+
+def canonical_skills(skills: Iterable[str]) -> list:
+    """Sorted, deduplicated, lowercased skill names, so reordered or re-cased lists share an entry."""
+    return sorted({" ".join(skill.lower().split()) for skill in skills if skill and skill.strip()})
+
+def canonical_text(text: Optional[str]) -> str:
+    """Lowercased with whitespace collapsed, for free-text inputs such as a goal, role or major."""
+    return " ".join((text or "").lower().split())
+
+class LLMCache:
+    """
+    Two-tier cache of generated LLM results.
+
+    Entries are keyed by a hash of the operation, its prompt template version and its
+    canonical inputs, so bumping a template version retires that operation's old
+    entries. Lookups try this worker's LRU first and then the shared Mongo collection,
+    where a TTL index expires entries; a persistent hit is copied into the LRU. Only
+    successful results should be stored. Mongo errors are logged and count as misses,
+    so the cache can never make a request fail.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.LLM_CACHE_TTL_SECONDS,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self._entries = LRUCache(max_entries, ttl_seconds)
+        self._persistent_hits = 0
+        self._misses = 0
+
+    def key(self, kind: str, version: int, **inputs: Any) -> str:
+        canonical = json.dumps({"kind": kind, "version": version, "inputs": inputs}, sort_keys=True)
+        return f"{kind}:{hashlib.sha256(canonical.encode()).hexdigest()}"
+
+    async def get(self, engine: Optional[AIOEngine], key: str) -> Optional[Dict[str, Any]]:
+        """Cached payload or None. Without an engine only this worker's tier is consulted."""
+        payload = self._entries.get(key)
+        if payload is not None:
+            return payload
+        if engine is None:
+            self._misses += 1
+            return None
+
+        try:
+            doc = await engine.get_collection(LLMCacheEntry).find_one(
+                # The TTL monitor only runs once a minute, so check expiry here too
+                {"_id": key, "expires_at": {"$gt": datetime.utcnow()}}, {"payload": 1}
+            )
+        except Exception as e:
+            logger.error(f"LLM cache read failed for {key}: {str(e)}")
+            doc = None
+
+        if doc is None:
+            self._misses += 1
+            return None
+        self._persistent_hits += 1
+        self._entries.set(key, doc["payload"])
+        return doc["payload"]
+
+    async def set(self, engine: Optional[AIOEngine], key: str, payload: Dict[str, Any]):
+        self._entries.set(key, payload)
+        if engine is None:
+            return
+        now = datetime.utcnow()
+        entry = LLMCacheEntry(
+            key=key, kind=key.split(":", 1)[0], payload=payload,
+            created_at=now, expires_at=now + timedelta(seconds=self.ttl_seconds),
+        )
+        try:
+            await engine.save(entry)
+        except Exception as e:
+            logger.error(f"LLM cache write failed for {key}: {str(e)}")
+
+    def clear(self):
+        """Drop this worker's tier only; the persistent entries expire on their own."""
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        memory = self._entries.stats()
+        hits = memory["hits"] + self._persistent_hits
+        lookups = hits + self._misses
+        return {
+            "hits": hits,
+            "misses": self._misses,
+            "hitRate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": memory,
+            "persistentHits": self._persistent_hits,
+        }
+
+# Singleton instance
+llm_cache = LLMCache()
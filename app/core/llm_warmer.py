@@ -0,0 +1,245 @@
+import asyncio
+import logging
+import os
+import socket
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from odmantic import AIOEngine
+from pymongo.errors import DuplicateKeyError
+
+from app.core.ai_demand import ai_demand, demand_key, LEARNING_PATH, SKILL_GAP
+from app.core.config import settings
+from app.core.llm_cache import canonical_skills, canonical_text
+from app.core.recommendation_service import RecommendationService, recommendation_service
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+# How often to look again when the key pool is below its reserve
+BUDGET_POLL_SECONDS = 5
+
+# Document in the shared "leases" collection naming the worker that runs scheduled passes
+LEASE_ID = "llm_warmer"
+
+# (expected requests, kind, skills, goal or target role, major)
+Candidate = Tuple[float, str, List[str], str, Optional[str]]
+
+class LLMWarmer:
+    """
+    Fills the LLM cache off-peak with what students ask for most, so that peak-time
+    requests for popular goals are cache hits instead of live generations.
+
+    Candidates are the exact inputs requested at least `min_count` times in the last
+    `window_days` (see app.core.ai_demand), plus skill-set clusters: identical skill
+    sets held by at least `min_count` students of a frequent major, paired with the
+    `goals_per_cluster` most requested goals and target roles. Frequent majors come
+    from both the requests and User.major. Candidates run one at a time, the highest
+    expected demand first, and only while the key pool has more than `reserve` of its
+    request budget left, so live traffic keeps priority. Inputs that are already
+    cached cost no Gemini call.
+
+    Scheduled passes hold a lease in Mongo, renewed before every candidate, so with
+    several workers only one of them warms at a time.
+    """
+
+    def __init__(
+        self,
+        service: RecommendationService = recommendation_service,
+        start_hour: int = settings.LLM_WARMER_START_HOUR,
+        end_hour: int = settings.LLM_WARMER_END_HOUR,
+        interval_seconds: int = settings.LLM_WARMER_INTERVAL_SECONDS,
+        max_inputs: int = settings.LLM_WARMER_MAX_INPUTS,
+        reserve: float = settings.LLM_WARMER_RESERVE,
+        min_count: int = 2,
+        window_days: int = 14,
+        top_goals: int = 20,
+        top_majors: int = 10,
+        max_clusters: int = 50,
+        goals_per_cluster: int = 3,
+    ):
+        self.service = service
+        self.start_hour = start_hour
+        self.end_hour = end_hour
+        self.interval_seconds = interval_seconds
+        self.max_inputs = max_inputs
+        self.reserve = reserve
+        self.min_count = min_count
+        self.window_days = window_days
+        self.top_goals = top_goals
+        self.top_majors = top_majors
+        self.max_clusters = max_clusters
+        self.goals_per_cluster = goals_per_cluster
+        self.running = False
+        self.last_run: Optional[Dict[str, Any]] = None
+        self.holder = f"{socket.gethostname()}:{os.getpid()}"
+
+    def off_peak(self, now: Optional[datetime] = None) -> bool:
+        hour = (now or datetime.utcnow()).hour
+        if self.start_hour <= self.end_hour:
+            return self.start_hour <= hour < self.end_hour
+        # A window across midnight, such as 22 to 5
+        return hour >= self.start_hour or hour < self.end_hour
+
+    async def run_forever(self, engine: AIOEngine):
+        """Warm once per interval while in the off-peak window. Runs until cancelled."""
+        while True:
+            if self.off_peak():
+                try:
+                    if await self._take_lease(engine):
+                        await self.run_once(engine, scheduled=True)
+                except Exception as e:
+                    logger.error(f"LLM cache warming failed: {str(e)}")
+            await asyncio.sleep(self.interval_seconds)
+
+    async def run_once(self, engine: AIOEngine, scheduled: bool = False) -> Dict[str, Any]:
+        """
+        Generate up to `max_inputs` candidates. A scheduled run stops when the off-peak
+        window ends or its lease is lost; any run stops when no key is healthy.
+        """
+        started = datetime.utcnow()
+        calls_before = self._gemini_calls()
+        plan = await self.plan(engine)
+        warmed = failed = 0
+        self.running = True
+        try:
+            for _, kind, skills, goal, major in plan[:self.max_inputs]:
+                if not await self._wait_for_budget(scheduled):
+                    break
+                if scheduled and not await self._take_lease(engine):
+                    break
+                # Only a generated result counts; a templated fallback is neither cached nor warm
+                if kind == LEARNING_PATH:
+                    ok = await self.service.warm_learning_path(skills, goal, engine)
+                else:
+                    ok = await self.service.warm_skill_gap(skills, goal, major, engine)
+                if ok:
+                    warmed += 1
+                else:
+                    failed += 1
+        finally:
+            self.running = False
+
+        self.last_run = {
+            "startedAt": started.isoformat() + "Z",
+            "seconds": round((datetime.utcnow() - started).total_seconds(), 1),
+            "candidates": len(plan),
+            "warmed": warmed,
+            "failed": failed,
+            # Includes live requests served while the run was going
+            "geminiCalls": self._gemini_calls() - calls_before,
+        }
+        logger.info(f"LLM cache warming: {self.last_run}")
+        return self.last_run
+
+    async def plan(self, engine: AIOEngine) -> List[Candidate]:
+        """Every candidate, the highest expected demand first, without duplicates."""
+        since = datetime.utcnow() - timedelta(days=self.window_days)
+        popular, goals, roles, majors = await asyncio.gather(
+            ai_demand.popular(engine, since, self.min_count, self.max_inputs),
+            ai_demand.top_goals(engine, LEARNING_PATH, since, self.top_goals),
+            ai_demand.top_goals(engine, SKILL_GAP, since, self.top_goals),
+            self._frequent_majors(engine, since),
+        )
+
+        candidates: Dict[str, Candidate] = {}
+
+        def add(score: float, kind: str, skills: List[str], goal: str, major: Optional[str]):
+            key = demand_key(kind, skills, goal, major)
+            if key not in candidates or candidates[key][0] < score:
+                candidates[key] = (score, kind, skills, goal, major)
+
+        for demand in popular:
+            add(demand.count, demand.kind, demand.skills, demand.goal, demand.major)
+
+        goal_total = sum(count for _, count in goals) or 1
+        role_total = sum(count for _, count in roles) or 1
+        for students, skills, major in await self._student_clusters(engine, majors):
+            # Expected requests if the cluster asks for goals like everyone else does
+            for goal, count in goals[:self.goals_per_cluster]:
+                add(students * count / goal_total, LEARNING_PATH, skills, goal, None)
+            for role, count in roles[:self.goals_per_cluster]:
+                add(students * count / role_total, SKILL_GAP, skills, role, major)
+
+        return sorted(candidates.values(), key=lambda c: -c[0])
+
+    async def _frequent_majors(self, engine: AIOEngine, since: datetime) -> Dict[str, str]:
+        """Canonical major -> major as written, for the most frequent majors in requests and student profiles."""
+        pipeline = [
+            {"$match": {"role": UserRole.STUDENT.value, "major": {"$nin": [None, ""]}}},
+            {"$group": {"_id": "$major", "count": {"$sum": 1}}},
+        ]
+        requested, profiles = await asyncio.gather(
+            ai_demand.top_majors(engine, since, self.top_majors),
+            engine.get_collection(User).aggregate(pipeline).to_list(length=None),
+        )
+        counts: Counter = Counter()
+        spellings: Dict[str, str] = {}
+        for major, count in requested + [(doc["_id"], doc["count"]) for doc in profiles]:
+            key = canonical_text(major)
+            counts[key] += count
+            spellings.setdefault(key, major)
+        return {key: spellings[key] for key, _ in counts.most_common(self.top_majors)}
+
+    async def _student_clusters(self, engine: AIOEngine, majors: Dict[str, str]) -> List[Tuple[int, List[str], str]]:
+        """(students, skills, major) of the skill sets shared by at least `min_count` students of a frequent major."""
+        if not majors:
+            return []
+        counts: Counter = Counter()
+        names: Dict[Tuple[str, tuple], List[str]] = {}
+        cursor = engine.get_collection(User).find(
+            {"role": UserRole.STUDENT.value, "skills.0": {"$exists": True}}, {"major": 1, "skills.name": 1}
+        )
+        async for doc in cursor:
+            major_key = canonical_text(doc.get("major"))
+            if major_key not in majors:
+                continue
+            skills = [s["name"] for s in doc.get("skills", [])]
+            cluster = (major_key, tuple(canonical_skills(skills)))
+            counts[cluster] += 1
+            names.setdefault(cluster, skills)
+        return [
+            (students, names[cluster], majors[cluster[0]])
+            for cluster, students in counts.most_common(self.max_clusters)
+            if students >= self.min_count
+        ]
+
+    async def _wait_for_budget(self, scheduled: bool) -> bool:
+        """Wait until the pool is above its reserve. False when the run should stop instead."""
+        pool = self.service.keys
+        while True:
+            if not pool.healthy() or scheduled and not self.off_peak():
+                return False
+            if pool.spare_share() > self.reserve:
+                return True
+            await asyncio.sleep(BUDGET_POLL_SECONDS)
+
+    async def _take_lease(self, engine: AIOEngine) -> bool:
+        """Take or renew the warming lease for one interval. False while another worker holds it."""
+        now = datetime.utcnow()
+        try:
+            await engine.database["leases"].update_one(
+                {"_id": LEASE_ID, "$or": [{"holder": self.holder}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": self.holder, "expires_at": now + timedelta(seconds=self.interval_seconds)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            # The filter missed a live lease of another worker, so the upsert collided with it
+            return False
+        return True
+
+    def _gemini_calls(self) -> int:
+        return sum(sum(key.counts.values()) for key in self.service.keys.keys)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "enabled": settings.LLM_WARMER_ENABLED,
+            "offPeakHoursUtc": [self.start_hour, self.end_hour],
+            "offPeakNow": self.off_peak(),
+            "running": self.running,
+            "lastRun": self.last_run,
+        }
+
+# Singleton instance
+llm_warmer = LLMWarmer()
@@ -0,0 +1,78 @@
+import asyncio
+from typing import Dict, Generic, Iterable, List, Optional, Type, TypeVar
+
+from bson.errors import InvalidId
+from fastapi import Depends
+from odmantic import AIOEngine, Model, ObjectId
+
+from app.db import get_engine
+from app.models.role import Role
+from app.models.user import User
+
+ModelType = TypeVar("ModelType", bound=Model)
+
+class ModelLoader(Generic[ModelType]):
+    """
+    DataLoader-style batching of lookups by ID. Every load() issued during the
+    same event-loop tick is answered by a single `$in` query, and each result is
+    cached for the loader's lifetime, so one request never fetches a document twice.
+    Create one per request; the cache is never invalidated.
+    """
+
+    def __init__(self, engine: AIOEngine, model: Type[ModelType]):
+        self.engine = engine
+        self.model = model
+        self._results: Dict[str, asyncio.Future] = {}
+        self._pending: List[str] = []
+
+    async def load(self, item_id: str) -> Optional[ModelType]:
+        """The document with this ID (a str, as stored in references), or None."""
+        item_id = str(item_id)
+        future = self._results.get(item_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._results[item_id] = future
+            self._pending.append(item_id)
+            if len(self._pending) == 1:
+                # Let the other coroutines of this tick queue their IDs first
+                asyncio.get_running_loop().call_soon(lambda: asyncio.ensure_future(self._dispatch()))
+        return await asyncio.shield(future)
+
+    async def load_many(self, item_ids: Iterable[str]) -> List[Optional[ModelType]]:
+        return list(await asyncio.gather(*[self.load(item_id) for item_id in item_ids]))
+
+    async def load_map(self, item_ids: Iterable[str]) -> Dict[str, ModelType]:
+        """Found documents keyed by ID; missing IDs are left out."""
+        ids = list(dict.fromkeys(str(i) for i in item_ids))
+        return {i: doc for i, doc in zip(ids, await self.load_many(ids)) if doc is not None}
+
+    async def _dispatch(self):
+        batch, self._pending = self._pending, []
+        object_ids = []
+        for item_id in batch:
+            try:
+                object_ids.append(ObjectId(item_id))
+            except (InvalidId, TypeError):
+                pass  # Malformed references resolve to None
+
+        try:
+            found = await self.engine.find(self.model, self.model.id.in_(object_ids)) if object_ids else []
+        except Exception as e:
+            for item_id in batch:
+                self._results.pop(item_id).set_exception(e)
+            return
+
+        by_id = {str(doc.id): doc for doc in found}
+        for item_id in batch:
+            self._results[item_id].set_result(by_id.get(item_id))
+
+class Loaders:
+    """The loaders of one request."""
+
+    def __init__(self, engine: AIOEngine):
+        self.users: ModelLoader[User] = ModelLoader(engine, User)
+        self.roles: ModelLoader[Role] = ModelLoader(engine, Role)
+
+async def get_loaders(engine: AIOEngine = Depends(get_engine)) -> Loaders:
+    """Request-scoped dependency: a fresh set of loaders per request."""
+    return Loaders(engine)
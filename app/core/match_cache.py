@@ -0,0 +1,77 @@
+import logging
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from odmantic import AIOEngine
+
+from app.core.config import settings
+from app.core.lru_cache import LRUCache
+
+logger = logging.getLogger(__name__)
+
+# Documents in the shared "counters" collection, so every worker sees the same versions
+STUDENTS_GENERATION = "match_students_generation"
+ROLES_GENERATION = "match_roles_generation"
+ROLE_VERSION_PREFIX = "match_role_version:"
+
+class MatchCache:
+    """
+    Caches match endpoint responses under the versions of their inputs.
+
+    A role's matches depend on that role and on the student population, so they are
+    keyed by the role's version plus the students generation. A student's matches
+    depend on that student and on every active role, so they are keyed by both
+    generations. The versions live in Mongo and are bumped when the match table
+    refresh triggered by a write starts and again when it completes, so a cached
+    response is never served once its inputs have changed, whichever worker made
+    the change. Entries still expire after the TTL as a safety net.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = settings.MATCH_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = settings.MATCH_CACHE_TTL_SECONDS,
+    ):
+        self._entries = LRUCache(max_entries, ttl_seconds)
+
+    async def role_key(self, engine: AIOEngine, role_id: str, *params: Hashable) -> Tuple:
+        versions = await self._versions(engine, STUDENTS_GENERATION, ROLE_VERSION_PREFIX + role_id)
+        return ("role", role_id, versions[ROLE_VERSION_PREFIX + role_id], versions[STUDENTS_GENERATION], *params)
+
+    async def student_key(self, engine: AIOEngine, student_id: str, *params: Hashable) -> Tuple:
+        versions = await self._versions(engine, STUDENTS_GENERATION, ROLES_GENERATION)
+        return ("student", student_id, versions[STUDENTS_GENERATION], versions[ROLES_GENERATION], *params)
+
+    def get(self, key: Tuple) -> Optional[Any]:
+        return self._entries.get(key)
+
+    def set(self, key: Tuple, value: Any):
+        self._entries.set(key, value)
+
+    def clear(self):
+        self._entries.clear()
+
+    async def role_changed(self, engine: AIOEngine, role_id: str):
+        await self._bump(engine, ROLE_VERSION_PREFIX + role_id)
+        await self._bump(engine, ROLES_GENERATION)
+
+    async def students_changed(self, engine: AIOEngine):
+        await self._bump(engine, STUDENTS_GENERATION)
+
+    def stats(self) -> Dict[str, Any]:
+        return self._entries.stats()
+
+    async def _versions(self, engine: AIOEngine, *names: str) -> Dict[str, int]:
+        versions = {name: 0 for name in names}
+        async for doc in engine.database["counters"].find({"_id": {"$in": list(names)}}):
+            versions[doc["_id"]] = doc["seq"]
+        return versions
+
+    async def _bump(self, engine: AIOEngine, name: str):
+        try:
+            await engine.database["counters"].update_one({"_id": name}, {"$inc": {"seq": 1}}, upsert=True)
+        except Exception as e:
+            # Entries keyed by the old version then live until the TTL at most
+            logger.error(f"Could not bump match cache version {name}: {str(e)}")
+
+# Singleton instance
+match_cache = MatchCache()
@@ -0,0 +1,243 @@
+import asyncio
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+from odmantic import AIOEngine
+
+from app.core.config import settings
+from app.models.role import Role
+from app.models.skill_index import SkillPosting
+
+class MatchEngine:
+    """
+    Vectorized match scoring over a sparse student x skill incidence matrix.
+
+    Columns are interned skill IDs. Each column keeps a compact int32 array of the
+    student rows that have the skill, so scoring a role is a single np.bincount
+    over the postings of its required skills, and scoring a student is a single
+    weighted gather over the concatenated required-skill columns of every active role.
+    """
+
+    _STATE = (
+        "_student_rows", "_student_ids", "_student_skills", "_column_rows",
+        "_column_arrays", "_student_id_array", "_role_columns", "_role_arrays",
+    )
+
+    def __init__(self, refresh_seconds: int = settings.MATCH_ENGINE_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+
+        self._student_rows: Dict[str, int] = {}
+        self._student_ids: List[str] = []
+        self._student_skills: List[Set[int]] = []
+        self._column_rows: Dict[int, Set[int]] = defaultdict(set)
+        self._column_arrays: Dict[int, np.ndarray] = {}
+        self._student_id_array: Optional[np.ndarray] = None
+
+        self._role_columns: Dict[str, List[int]] = {}
+        self._role_arrays: Optional[Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+
+    async def ensure_loaded(self, engine: AIOEngine):
+        """Load the matrices on first use and reload them when they get older than refresh_seconds."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            await self.load(engine)
+
+    async def load(self, engine: AIOEngine):
+        """Rebuild both matrices from the skill postings and the active roles."""
+        # Build into a separate instance so requests keep scoring against the old state meanwhile
+        fresh = MatchEngine(self.refresh_seconds)
+
+        postings = engine.get_collection(SkillPosting).find({}, {"skill_id": 1, "student_id": 1, "_id": 0})
+        async for doc in postings:
+            row = fresh._row(doc["student_id"])
+            fresh._student_skills[row].add(doc["skill_id"])
+            fresh._column_rows[doc["skill_id"]].add(row)
+
+        roles = engine.get_collection(Role).find({"is_active": True}, {"required_skill_ids": 1})
+        async for doc in roles:
+            fresh._role_columns[str(doc["_id"])] = doc.get("required_skill_ids", [])
+
+        for name in self._STATE:
+            setattr(self, name, getattr(fresh, name))
+        self._loaded_at = time.monotonic()
+
+    # --- Incremental updates ---
+
+    def update_student(self, student_id: str, skill_ids: Iterable[Optional[int]]):
+        """Replace one student's row after a profile update."""
+        row = self._row(student_id)
+        new_columns = {skill_id for skill_id in skill_ids if skill_id is not None}
+        old_columns = self._student_skills[row]
+
+        for column in old_columns - new_columns:
+            self._column_rows[column].discard(row)
+            self._column_arrays.pop(column, None)
+        for column in new_columns - old_columns:
+            self._column_rows[column].add(row)
+            self._column_arrays.pop(column, None)
+
+        self._student_skills[row] = new_columns
+
+    def update_role(self, role: Role):
+        """Add, replace or drop one role's row after it is created or edited."""
+        role_id = str(role.id)
+        if role.is_active:
+            self._role_columns[role_id] = list(role.required_skill_ids)
+        else:
+            self._role_columns.pop(role_id, None)
+        self._role_arrays = None
+
+    # --- Scoring ---
+
+    def score_role(self, required_skill_ids: List[int]) -> np.ndarray:
+        """Match percentage of every student row against one role's required skills."""
+        scores = np.zeros(len(self._student_ids), dtype=np.int32)
+        if not required_skill_ids:
+            return scores
+
+        # Duplicates count once per occurrence, like the denominator
+        postings = [self._column_array(c) for c in required_skill_ids if c in self._column_rows]
+        if postings:
+            matched = np.bincount(np.concatenate(postings), minlength=len(self._student_ids))
+            scores = (matched * 100 // len(required_skill_ids)).astype(np.int32)
+        return scores
+
+    def skill_hits(self, required_skill_ids: List[int], rows: np.ndarray) -> np.ndarray:
+        """Boolean matrix (rows x required skills) telling which of the role's skills each row has."""
+        hits = np.zeros((len(rows), len(required_skill_ids)), dtype=bool)
+        has_skill = np.zeros(len(self._student_ids), dtype=bool)
+        for j, column in enumerate(required_skill_ids):
+            if column not in self._column_rows:
+                continue
+            has_skill[:] = False
+            has_skill[self._column_array(column)] = True
+            hits[:, j] = has_skill[rows]
+        return hits
+
+    def score_role_soft(self, neighbors: List[List[Tuple[int, float]]]) -> np.ndarray:
+        """
+        Like score_role, but each required skill counts for the best similarity among
+        its semantic neighbours that the student has, instead of 0 or 1.
+        `neighbors` holds one (skill_id, similarity) list per required skill.
+        """
+        scores = np.zeros(len(self._student_ids), dtype=np.int32)
+        if not neighbors:
+            return scores
+
+        total = np.zeros(len(self._student_ids), dtype=np.float64)
+        for skill_neighbors in neighbors:
+            total += self._best_similarity(skill_neighbors)
+        return np.floor(total * 100 / len(neighbors) + 1e-9).astype(np.int32)
+
+    def soft_hits(self, neighbors: List[List[Tuple[int, float]]], rows: np.ndarray) -> np.ndarray:
+        """Similarity matrix (rows x required skills) behind score_role_soft, 0 where nothing is close."""
+        hits = np.zeros((len(rows), len(neighbors)), dtype=np.float32)
+        for j, skill_neighbors in enumerate(neighbors):
+            hits[:, j] = self._best_similarity(skill_neighbors)[rows]
+        return hits
+
+    def score_student_soft(self, similarities: Dict[int, float]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Soft match percentage of one student against every active role, given the best
+        similarity of each skill to any of the student's skills. Returns (role_ids, scores).
+        """
+        role_ids, flat_columns, flat_roles, lengths = self._roles()
+        scores = np.zeros(len(role_ids), dtype=np.int32)
+        if not similarities or not len(flat_columns):
+            return role_ids, scores
+
+        lookup = np.zeros(int(flat_columns.max()) + 1, dtype=np.float64)
+        for column, similarity in similarities.items():
+            if column < len(lookup):
+                lookup[column] = similarity
+
+        matched = np.bincount(flat_roles, weights=lookup[flat_columns], minlength=len(role_ids))
+        nonempty = lengths > 0
+        scores[nonempty] = np.floor(matched[nonempty] * 100 / lengths[nonempty] + 1e-9).astype(np.int32)
+        return role_ids, scores
+
+    def student_ids(self) -> np.ndarray:
+        if self._student_id_array is None or len(self._student_id_array) != len(self._student_ids):
+            self._student_id_array = np.array(self._student_ids, dtype=str)
+        return self._student_id_array
+
+    # --- Internals ---
+
+    def _row(self, student_id: str) -> int:
+        row = self._student_rows.get(student_id)
+        if row is None:
+            row = len(self._student_ids)
+            self._student_rows[student_id] = row
+            self._student_ids.append(student_id)
+            self._student_skills.append(set())
+        return row
+
+    def _column_array(self, column: int) -> np.ndarray:
+        array = self._column_arrays.get(column)
+        if array is None:
+            rows = self._column_rows[column]
+            array = np.fromiter(rows, dtype=np.int32, count=len(rows))
+            self._column_arrays[column] = array
+        return array
+
+    def _best_similarity(self, skill_neighbors: List[Tuple[int, float]]) -> np.ndarray:
+        best = np.zeros(len(self._student_ids), dtype=np.float64)
+        # Least similar first, so each row ends up with the best neighbour it has
+        for column, similarity in sorted(skill_neighbors, key=lambda pair: pair[1]):
+            if column in self._column_rows:
+                best[self._column_array(column)] = similarity
+        return best
+
+    def _roles(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if self._role_arrays is None:
+            role_ids = list(self._role_columns)
+            columns = [self._role_columns[r] for r in role_ids]
+            lengths = np.array([len(c) for c in columns], dtype=np.int64)
+            flat_columns = np.array([c for cols in columns for c in cols], dtype=np.int64)
+            flat_roles = np.repeat(np.arange(len(role_ids)), lengths)
+            self._role_arrays = (np.array(role_ids, dtype=str), flat_columns, flat_roles, lengths)
+        return self._role_arrays
+
+def top_k(scores: np.ndarray, ids: np.ndarray, k: int, after: Optional[Tuple[int, str]] = None) -> np.ndarray:
+    """
+    Indices of the k best non-zero scores in (score desc, id asc) order, starting
+    after the (score, id) of a cursor. Partitions before sorting, so only the
+    candidates that can make the page are sorted.
+    """
+    candidates = np.flatnonzero(scores > 0)
+    if after is not None:
+        score, item_id = after
+        s, i = scores[candidates], ids[candidates]
+        candidates = candidates[(s < score) | ((s == score) & (i > item_id))]
+
+    if len(candidates) > k:
+        threshold = np.partition(scores[candidates], len(candidates) - k)[len(candidates) - k]
+        candidates = candidates[scores[candidates] >= threshold]
+
+    order = np.lexsort((ids[candidates], -scores[candidates]))
+    return candidates[order][:k]
+
+def match_skills(
+    student_skill_ids: Iterable[Optional[int]],
+    required_skills: List[str],
+    required_skill_ids: List[int],
+) -> Tuple[int, List[str], List[str]]:
+    """Score one student/role pair. Returns (percentage, matched skills, missing skills)."""
+    student_ids = set(student_skill_ids)
+    pairs = list(zip(required_skills, required_skill_ids))
+    matched = [name for name, skill_id in pairs if skill_id in student_ids]
+    missing = [name for name, skill_id in pairs if skill_id not in student_ids]
+
+    # Integer arithmetic, same as the vectorized scores
+    score = len(matched) * 100 // len(pairs) if pairs else 0
+    return score, matched, missing
+
+# Singleton instance
+match_engine = MatchEngine()
@@ -0,0 +1,75 @@
+from typing import Any, Dict, List, Tuple
+
+from odmantic import AIOEngine
+
+from app.models.role import Role
+from app.models.user import User, UserRole
+
+def role_match_pipeline(role: Role, limit: int, after: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Aggregation that scores one role against students entirely in Mongo.
+
+    $match narrows to students holding at least one required skill through the
+    (role, skills.skill_id) multikey index, and the projections keep only what a
+    MatchResult needs, so hashed passwords, bios and full skill documents never
+    leave the server. `after` is an extra filter on the computed fields, used for
+    cursor pagination.
+    """
+    required = [{"name": name, "skill_id": skill_id} for name, skill_id in zip(role.required_skills, role.required_skill_ids)]
+    # Matched and missing lists keep duplicates, the same as the denominator
+    has_skill = {"$in": ["$$this.skill_id", "$skill_ids"]}
+    lacks_skill = {"$eq": [has_skill, False]}
+
+    return [
+        {"$match": {"role": UserRole.STUDENT.value, "skills.skill_id": {"$in": list(set(role.required_skill_ids))}}},
+        {"$project": {
+            "full_name": 1,
+            "email": 1,
+            "university": 1,
+            "top_skills": {"$slice": ["$skills.name", 3]},
+            "skill_ids": "$skills.skill_id",
+        }},
+        {"$project": {
+            "full_name": 1,
+            "email": 1,
+            "university": 1,
+            "top_skills": 1,
+            "matched": {"$filter": {"input": required, "cond": has_skill}},
+            "missing": {"$filter": {"input": required, "cond": lacks_skill}},
+        }},
+        {"$project": {
+            "_id": 0,
+            "studentId": {"$toString": "$_id"},
+            "studentName": "$full_name",
+            "email": 1,
+            "location": "$university",
+            "topSkills": "$top_skills",
+            "skillsMatched": "$matched.name",
+            "skillsMissing": "$missing.name",
+            "matchPercentage": {"$toInt": {"$floor": {
+                "$divide": [{"$multiply": [{"$size": "$matched"}, 100]}, max(1, len(required))]
+            }}},
+        }},
+        {"$match": {"matchPercentage": {"$gt": 0}}},
+        {"$facet": {
+            "items": [
+                {"$match": after},
+                {"$sort": {"matchPercentage": -1, "studentId": 1}},
+                {"$limit": limit + 1},
+            ],
+            "total": [{"$count": "count"}],
+        }},
+    ]
+
+async def aggregate_role_matches(engine: AIOEngine, role: Role, limit: int, after: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], int]:
+    """Run the role pipeline. Returns up to limit + 1 scored rows and the total number of matches."""
+    if not role.required_skill_ids:
+        return [], 0
+
+    cursor = engine.get_collection(User).aggregate(role_match_pipeline(role, limit, after))
+    result = await cursor.to_list(length=1)
+    if not result:
+        return [], 0
+    facet = result[0]
+    total = facet["total"][0]["count"] if facet["total"] else 0
+    return facet["items"], total
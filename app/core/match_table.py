@@ -0,0 +1,155 @@
+from collections import defaultdict
+from datetime import datetime
+from typing import List
+import logging
+
+import numpy as np
+from odmantic import AIOEngine, ObjectId
+from pymongo import UpdateOne
+
+from app.core.match_cache import match_cache
+from app.core.match_engine import match_engine, match_skills
+from app.models.match import Match
+from app.models.role import Role
+from app.models.skill_index import SkillPosting
+from app.models.user import User, UserRole
+
+logger = logging.getLogger(__name__)
+
+BULK_WRITE_BATCH = 1000
+
+class MatchTable:
+    """
+    Keeps the materialized `matches` collection in sync with students and active roles.
+    Refreshes run as background tasks after the write that triggered them and only
+    recompute the affected rows, so the match endpoints are plain indexed range reads.
+    They score from the current documents in Mongo, never from the worker-local match
+    engine, because their sweep deletes every row they did not rewrite.
+    """
+
+    async def refresh_role(self, engine: AIOEngine, role_id: str):
+        """Recompute every student's row for one role."""
+        # Invalidate cached matches now for the live modes, and again below once the table is current
+        await match_cache.role_changed(engine, role_id)
+        try:
+            role = await engine.find_one(Role, Role.id == ObjectId(role_id))
+            collection = engine.get_collection(Match)
+
+            await match_engine.ensure_loaded(engine)
+            if role:
+                match_engine.update_role(role)
+            if not role or not role.is_active:
+                await collection.delete_many({"role_id": role_id})
+                return
+
+            # Score from the postings in Mongo, not this worker's match engine snapshot,
+            # which can miss students written by other workers or scripts
+            refreshed_at = _now()
+            student_skills = defaultdict(set)
+            postings = engine.get_collection(SkillPosting).find(
+                {"skill_id": {"$in": list(set(role.required_skill_ids))}}, {"skill_id": 1, "student_id": 1, "_id": 0}
+            )
+            async for doc in postings:
+                student_skills[doc["student_id"]].add(doc["skill_id"])
+
+            operations = []
+            for student_id, skill_ids in student_skills.items():
+                score, matched, missing = match_skills(skill_ids, role.required_skills, role.required_skill_ids)
+                if score > 0:
+                    operations.append(_upsert(student_id, role_id, score, matched, missing, refreshed_at))
+            await _bulk_write(collection, operations)
+
+            # Anything not rewritten above no longer matches
+            await collection.delete_many({"role_id": role_id, "updated_at": {"$lt": refreshed_at}})
+        except Exception as e:
+            logger.error(f"Match table refresh failed for role {role_id}: {str(e)}")
+        finally:
+            await match_cache.role_changed(engine, role_id)
+
+    async def refresh_student(self, engine: AIOEngine, student_id: str):
+        """Recompute one student's rows against every active role."""
+        await match_cache.students_changed(engine)
+        try:
+            student = await engine.find_one(User, User.id == ObjectId(student_id))
+            collection = engine.get_collection(Match)
+            if not student or student.role != UserRole.STUDENT:
+                match_engine.update_student(student_id, [])
+                await collection.delete_many({"student_id": student_id})
+                return
+
+            refreshed_at = _now()
+            skill_ids = [s.skill_id for s in student.skills]
+
+            await match_engine.ensure_loaded(engine)
+            match_engine.update_student(student_id, skill_ids)
+
+            # Candidate roles come from Mongo too, so roles another worker changed are current
+            operations = []
+            known = [skill_id for skill_id in skill_ids if skill_id is not None]
+            if known:
+                roles = await engine.find(Role, {"is_active": True, "required_skill_ids": {"$in": known}})
+                for role in roles:
+                    score, matched, missing = match_skills(skill_ids, role.required_skills, role.required_skill_ids)
+                    if score > 0:
+                        operations.append(_upsert(student_id, str(role.id), score, matched, missing, refreshed_at))
+            await _bulk_write(collection, operations)
+
+            await collection.delete_many({"student_id": student_id, "updated_at": {"$lt": refreshed_at}})
+        except Exception as e:
+            logger.error(f"Match table refresh failed for student {student_id}: {str(e)}")
+        finally:
+            await match_cache.students_changed(engine)
+
+    async def rebuild(self, engine: AIOEngine) -> int:
+        """
+        Recompute the whole table, e.g. for a backfill. Returns the number of roles refreshed.
+        The match engine is reloaded from Mongo first, so unlike the incremental refreshes
+        this can score every role against its matrices with one vectorized pass per role.
+        """
+        await match_engine.load(engine)
+        collection = engine.get_collection(Match)
+        await collection.delete_many({})
+
+        student_ids = match_engine.student_ids()
+        refreshed_at = _now()
+        refreshed = 0
+        for role in await engine.find(Role, Role.is_active == True):
+            role_id = str(role.id)
+            scores = match_engine.score_role(role.required_skill_ids)
+            rows = np.flatnonzero(scores)
+            hits = match_engine.skill_hits(role.required_skill_ids, rows)
+
+            operations = []
+            for row, row_hits in zip(rows, hits):
+                matched = [name for name, hit in zip(role.required_skills, row_hits) if hit]
+                missing = [name for name, hit in zip(role.required_skills, row_hits) if not hit]
+                operations.append(_upsert(student_ids[row], role_id, int(scores[row]), matched, missing, refreshed_at))
+            await _bulk_write(collection, operations)
+            await match_cache.role_changed(engine, role_id)
+            refreshed += 1
+        await match_cache.students_changed(engine)
+        return refreshed
+
+def _now() -> datetime:
+    # Mongo stores milliseconds; truncate so the stale-row cutoff compares cleanly
+    now = datetime.utcnow()
+    return now.replace(microsecond=now.microsecond // 1000 * 1000)
+
+def _upsert(student_id: str, role_id: str, score: int, matched: List[str], missing: List[str], refreshed_at: datetime) -> UpdateOne:
+    return UpdateOne(
+        {"student_id": student_id, "role_id": role_id},
+        {"$set": {
+            "score": score,
+            "skills_matched": matched,
+            "skills_missing": missing,
+            "updated_at": refreshed_at,
+        }},
+        upsert=True,
+    )
+
+async def _bulk_write(collection, operations: List[UpdateOne]):
+    for start in range(0, len(operations), BULK_WRITE_BATCH):
+        await collection.bulk_write(operations[start:start + BULK_WRITE_BATCH], ordered=False)
+
+# Singleton instance
+match_table = MatchTable()
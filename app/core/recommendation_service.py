@@ -1,15 +1,66 @@
 import os
 import json
-from google import genai
 from google.genai import types
 
 from app.core.config import settings
+from app.core.llm_cache import llm_cache, canonical_skills, canonical_text
+from app.core.single_flight import SingleFlight
+from app.core.gemini_keys import GeminiKeyPool, KeyPoolError, NoKeyAvailable, RETRYABLE
+from app.core.json_stream import JsonStreamParser, MEMBER, ITEM
+from app.core.skill_gap_engine import skill_gap_engine, local_action_plan
+from odmantic import AIOEngine
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+import asyncio
 import random
 
+# Bump when a prompt changes, so results generated from the old wording stop being served
+OPPORTUNITIES_PROMPT_VERSION = 1
+LEARNING_PATH_PROMPT_VERSION = 1
+SKILL_GAP_PROMPT_VERSION = 1
+ACTION_PLAN_PROMPT_VERSION = 1
+
+# Output budget reserved per call when checking a key's tokens-per-minute bucket
+OPPORTUNITIES_OUTPUT_TOKENS = 2000
+LEARNING_PATH_OUTPUT_TOKENS = 2000
+SKILL_GAP_OUTPUT_TOKENS = 500
+
+# Batch gap analyses share prompts up to this many students or estimated tokens per call
+SKILL_GAP_PACK_ITEMS = 5
+SKILL_GAP_PACK_TOKENS = 4000
+
+def _strip_code_fence(text: str) -> str:
+    """The JSON inside a ```json (or bare ```) block, or the text itself."""
+    if "```json" in text:
+        return text.split("```json")[1].split("```")[0].strip()
+    if "```" in text:
+        return text.split("```")[1].split("```")[0].strip()
+    return text
+
+def _is_learning_path(document: Any) -> bool:
+    """Whether a generated learning path is complete enough to cache and serve."""
+    return (
+        isinstance(document, dict)
+        and isinstance(document.get("roadmap"), str)
+        and isinstance(document.get("milestones"), list)
+        and len(document["milestones"]) > 0
+    )
+
 class RecommendationService:
-    def __init__(self):
+    def __init__(self, api_keys: Optional[list[str]] = None, client_factory: Optional[Callable[[str], Any]] = None):
+        """
+        Keys come from settings unless `api_keys` is given. `client_factory` builds the
+        client for each key, a genai.Client by default; pass a fake to run offline.
+        """
+        if api_keys is None:
+            api_keys = self._settings_keys()
+        self.configure_keys(api_keys, client_factory)
+        self.model_name = "gemini-2.5-flash"
+        # Identical requests in flight at the same time share one Gemini call
+        self.flights = SingleFlight()
+
+    def _settings_keys(self) -> list[str]:
         # Collect available keys
-        self.api_keys = [
+        api_keys = [
             settings.GEMINI_API_KEY,
             settings.GEMINI_API_KEY_1,
             settings.GEMINI_API_KEY_2,
@@ -17,46 +68,144 @@ class RecommendationService:
             settings.GEMINI_API_KEY_4
         ]
         # Filter out empty keys
-        self.api_keys = [k for k in self.api_keys if k]
+        api_keys = [k for k in api_keys if k]
         
-        if not self.api_keys:
+        if not api_keys:
              # Fallback to os.getenv if settings fail or are empty
              env_key = os.getenv("GEMINI_API_KEY")
              if env_key:
-                 self.api_keys.append(env_key)
+                 api_keys.append(env_key)
 
-        if not self.api_keys:
+        if not api_keys:
             print("Warning: No GEMINI_API_KEYs found in settings or environment.")
             # We don't raise error immediately to allow app to start, but methods will fail
-            self.api_key = ""
-        else:
-            self.api_key = self.api_keys[0]
+        return api_keys
 
-        # Initialize client with the first key (rotation logic can be added in methods)
-        if self.api_key:
-            self.client = genai.Client(api_key=self.api_key)
-        else:
-            self.client = None
+    def configure_keys(self, api_keys: list[str], client_factory: Optional[Callable[[str], Any]] = None, **limits):
+        """
+        Replace the key pool. `limits` are passed on to GeminiKeyPool. Only call this while
+        no generation is running, for example before serving or in a load test.
+        """
+        self.api_keys = list(api_keys)
+        if client_factory is not None:
+            limits["client_factory"] = client_factory
+        # One client per key, handed out per call; nothing here changes while requests run
+        self.keys = GeminiKeyPool(self.api_keys, **limits)
 
-        self.model_name = "gemini-2.5-flash"
+    async def _generate(self, prompt: str, config: types.GenerateContentConfig, label: str, output_tokens: int) -> str:
+        """
+        Text of one generation. Calls that fail on a rate limit, an invalid key or a
+        rejected request are retried on another key, each key at most once; other
+        errors are raised as they are. Raises a KeyPoolError when no key is left.
+        """
+        estimated_tokens = len(prompt) // 4 + output_tokens
+        tried = []
+        last_error = None
+        for attempt in range(max(1, self.keys.size)):
+            key = await self.keys.acquire(estimated_tokens, exclude=tried)
+            if key is None:
+                break
+            tried.append(key)
+
+            try:
+                response = await key.client.aio.models.generate_content(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=config
+                )
+            except BaseException as e:
+                # Cancellation included, so the key's in-flight count stays right
+                outcome = self.keys.release(key, e, estimated_tokens)
+                print(f"\n❌ --- {label} FAILED (Attempt {attempt + 1}, key {key.label}) ---")
+                print(f"Error Message: {str(e)}")
+                if outcome not in RETRYABLE:
+                    raise
+                last_error = e
+                continue
+
+            usage = getattr(response, "usage_metadata", None)
+            self.keys.release(key, None, estimated_tokens, getattr(usage, "total_token_count", None))
+            return (response.text or "").strip()
+
+        raise self._no_key_error(last_error)
+
+    async def _generate_stream(self, prompt: str, config: types.GenerateContentConfig, label: str, output_tokens: int) -> AsyncIterator[str]:
+        """
+        Text chunks of one streamed generation. Failures are retried on another key
+        like in _generate, but only until the first chunk has been yielded.
+        """
+        estimated_tokens = len(prompt) // 4 + output_tokens
+        tried = []
+        last_error = None
+        for attempt in range(max(1, self.keys.size)):
+            key = await self.keys.acquire(estimated_tokens, exclude=tried)
+            if key is None:
+                break
+            tried.append(key)
+
+            started = False
+            used_tokens = None
+            try:
+                stream = await key.client.aio.models.generate_content_stream(
+                    model=self.model_name,
+                    contents=prompt,
+                    config=config
+                )
+                async for chunk in stream:
+                    usage = getattr(chunk, "usage_metadata", None)
+                    used_tokens = getattr(usage, "total_token_count", None) or used_tokens
+                    if chunk.text:
+                        started = True
+                        yield chunk.text
+            except BaseException as e:
+                # Also reached when the consumer stops early, which releases the key
+                outcome = self.keys.release(key, e, estimated_tokens)
+                print(f"\n❌ --- {label} FAILED (Attempt {attempt + 1}, key {key.label}) ---")
+                print(f"Error Message: {str(e)}")
+                if started or outcome not in RETRYABLE:
+                    raise
+                last_error = e
+                continue
 
-    def _rotate_client(self):
-        """Rotate to the next available API key"""
-        if not self.api_keys or len(self.api_keys) <= 1:
+            self.keys.release(key, None, estimated_tokens, used_tokens)
             return
-        
-        # Move current key to end
-        current = self.api_keys.pop(0)
-        self.api_keys.append(current)
-        self.api_key = self.api_keys[0]
-        print(f"🔄 Rotating API Key... New key ends with ...{self.api_key[-4:] if len(self.api_key) > 4 else '****'}")
-        self.client = genai.Client(api_key=self.api_key)
+
+        raise self._no_key_error(last_error)
+
+    def _no_key_error(self, last_error: Optional[BaseException]) -> KeyPoolError:
+        if last_error is not None:
+            return KeyPoolError(f"All API keys failed: {str(last_error)}")
+        if self.keys.healthy():
+            return NoKeyAvailable("All API keys are rate limited")
+        return NoKeyAvailable("No API keys available")
+
+    async def _cached(self, engine: Optional[AIOEngine], kind: str, key: str, generate: Callable[[], Awaitable[dict]]) -> dict:
+        """Serve from the LLM cache; on a miss, join or start the one upstream call for this key."""
+        cached = await llm_cache.get(engine, key)
+        if cached is not None:
+            return cached
+
+        async def call():
+            result = await generate()
+            if "error" not in result:
+                await llm_cache.set(engine, key, result)
+            return result
+
+        return await self.flights.do(key, call, kind)
 
     async def find_opportunities(self, course: str, skills: str) -> list[dict]:
         """
         Search for scholarships and internships using Gemini 2.5 Flash with Google Search grounding.
         Note: response_mime_type is not supported when using tools like Google Search.
+        Search results are meant to be current, so they are coalesced but not cached.
         """
+        key = llm_cache.key(
+            "opportunities", OPPORTUNITIES_PROMPT_VERSION,
+            course=canonical_text(course), skills=canonical_skills(skills.split(",")),
+        )
+        return await self.flights.do(key, lambda: self._find_opportunities(course, skills), "opportunities")
+
+    async def _find_opportunities(self, course: str, skills: str) -> list[dict]:
         print(f"Starting AI search for {course} with skills: {skills}... 🔍")
         
         prompt = f"""
@@ -77,65 +226,91 @@ class RecommendationService:
         ]
         """
 
-        # Retry logic with key rotation
-        max_retries = len(self.api_keys) if self.api_keys else 1
-        
-        for attempt in range(max_retries):
-            if not self.client:
-                 print("Error: No API keys available")
-                 return []
+        try:
+            result_text = await self._generate(
+                prompt,
+                types.GenerateContentConfig(
+                    tools=[types.Tool(google_search=types.GoogleSearch())]
+                    # response_mime_type="application/json" is NOT supported with tools
+                ),
+                "SEARCH",
+                OPPORTUNITIES_OUTPUT_TOKENS,
+            )
+        except Exception as e:
+            print(f"Error: {str(e)}")
+            return []
 
-            try:
-                response = await self.client.aio.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        tools=[types.Tool(google_search=types.GoogleSearch())]
-                        # response_mime_type="application/json" is NOT supported with tools
-                    )
-                )
-
-                result_text = response.text.strip()
-                
-                # Extract JSON from potential markdown blocks or text response
+        # Extract JSON from potential markdown blocks or text response
+        try:
+            data = json.loads(_strip_code_fence(result_text))
+            return data if isinstance(data, list) else []
+        except (json.JSONDecodeError, IndexError):
+            print(f"Failed to parse JSON directly. Attempting cleanup...")
+            # Fallback: find the first '[' and last ']'
+            start = result_text.find('[')
+            end = result_text.rfind(']') + 1
+            if start != -1 and end != 0:
                 try:
-                    if "```json" in result_text:
-                        result_text = result_text.split("```json")[1].split("```")[0].strip()
-                    elif "```" in result_text:
-                        result_text = result_text.split("```")[1].split("```")[0].strip()
-                    
-                    data = json.loads(result_text)
+                    data = json.loads(result_text[start:end])
                     return data if isinstance(data, list) else []
-                except (json.JSONDecodeError, IndexError):
-                    print(f"Failed to parse JSON directly. Attempting cleanup...")
-                    # Fallback: find the first '[' and last ']'
-                    start = result_text.find('[')
-                    end = result_text.rfind(']') + 1
-                    if start != -1 and end != 0:
-                        data = json.loads(result_text[start:end])
-                        return data if isinstance(data, list) else []
-                    return []
-
-            except Exception as e:
-                error_str = str(e)
-                print(f"\n❌ --- SEARCH FAILED (Attempt {attempt + 1}/{max_retries}) ---")
-                print(f"Error Message: {error_str}")
-                
-                if "400" in error_str or "429" in error_str or "API key not valid" in error_str:
-                    self._rotate_client()
-                    continue
-                else:
-                    return []
-        
-        return []
+                except json.JSONDecodeError:
+                    pass
+            return []
 
-    async def generate_learning_path(self, skills: list[str], goal: str) -> dict:
+    async def generate_learning_path(self, skills: list[str], goal: str, engine: Optional[AIOEngine] = None) -> dict:
         """
         Generate a personalized learning path based on current skills and a career goal.
+        Results are cached per canonical (skills, goal); pass an engine to share them across workers.
+        Concurrent identical requests share one generation.
         """
-        print(f"Generating learning path for goal: {goal} with current skills: {skills}... 🎓")
-        
-        prompt = f"""
+        key = llm_cache.key("learning_path", LEARNING_PATH_PROMPT_VERSION, skills=canonical_skills(skills), goal=canonical_text(goal))
+        return await self._cached(engine, "learning_path", key, lambda: self._generate_learning_path(skills, goal))
+
+    async def stream_learning_path(self, skills: list[str], goal: str, engine: Optional[AIOEngine] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Generate a learning path as (event, data) pairs: "roadmap" with the summary, one
+        "milestone" per phase as soon as its JSON is complete, then "done" with the whole
+        document, which is cached like generate_learning_path results. A failure ends
+        the stream with an "error" event. Cached paths replay the same events at once.
+        """
+        key = llm_cache.key("learning_path", LEARNING_PATH_PROMPT_VERSION, skills=canonical_skills(skills), goal=canonical_text(goal))
+        document = await llm_cache.get(engine, key)
+        if document is not None:
+            yield "roadmap", {"roadmap": document.get("roadmap", "")}
+            for index, milestone in enumerate(document.get("milestones", [])):
+                yield "milestone", {"index": index, "milestone": milestone}
+            yield "done", document
+            return
+
+        print(f"Streaming learning path for goal: {goal} with current skills: {skills}... 🎓")
+        parser = JsonStreamParser()
+        chunks = []
+        try:
+            async for text in self._generate_stream(
+                self._learning_path_prompt(skills, goal),
+                types.GenerateContentConfig(response_mime_type="application/json"),
+                "STREAM",
+                LEARNING_PATH_OUTPUT_TOKENS,
+            ):
+                chunks.append(text)
+                for event in parser.feed(text):
+                    if event[0] == MEMBER and event[1] == "roadmap":
+                        yield "roadmap", {"roadmap": event[2]}
+                    elif event[0] == ITEM and event[1] == "milestones":
+                        yield "milestone", {"index": event[2], "milestone": event[3]}
+            document = json.loads(_strip_code_fence("".join(chunks)))
+        except Exception as e:
+            yield "error", {"error": str(e)}
+            return
+        if not _is_learning_path(document):
+            yield "error", {"error": "Malformed learning path"}
+            return
+
+        await llm_cache.set(engine, key, document)
+        yield "done", document
+
+    def _learning_path_prompt(self, skills: list[str], goal: str) -> str:
+        return f"""
         Act as an elite career strategist and mentor. Generate a high-impact, personalized learning path for a candidate aiming to become a {goal}.
         Current Skills: {', '.join(skills)}.
         
@@ -161,54 +336,250 @@ class RecommendationService:
         }}
         """
 
-        # Retry logic with key rotation
-        max_retries = len(self.api_keys) if self.api_keys else 1
-        last_error = None
-        
-        for attempt in range(max_retries):
-            if not self.client:
-                 return {"error": "No API keys available", "roadmap": "Configuration Error", "milestones": []}
+    async def _generate_learning_path(self, skills: list[str], goal: str) -> dict:
+        print(f"Generating learning path for goal: {goal} with current skills: {skills}... 🎓")
+        prompt = self._learning_path_prompt(skills, goal)
 
-            try:
-                response = await self.client.aio.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        response_mime_type="application/json"
-                    )
-                )
+        try:
+            result_text = await self._generate(
+                prompt,
+                types.GenerateContentConfig(response_mime_type="application/json"),
+                "GENERATION",
+                LEARNING_PATH_OUTPUT_TOKENS,
+            )
+            data = json.loads(_strip_code_fence(result_text))
+            # Anything without an "error" gets cached, so a malformed document must get one
+            if not _is_learning_path(data):
+                return {"error": "Malformed learning path", "roadmap": "Failed to generate roadmap", "milestones": []}
+            return data
+        except KeyPoolError as e:
+            return {"error": str(e), "roadmap": "All API keys failed", "milestones": []}
+        except Exception as e:
+            # Non-auth/quota error, probably prompt related
+            return {"error": str(e), "roadmap": "Failed to generate roadmap", "milestones": []}
 
-                result_text = response.text.strip()
-                
-                # Robust JSON extraction
-                if "```json" in result_text:
-                    result_text = result_text.split("```json")[1].split("```")[0].strip()
-                elif "```" in result_text:
-                    result_text = result_text.split("```")[1].split("```")[0].strip()
-
-                data = json.loads(result_text)
-                return data
-
-            except Exception as e:
-                error_str = str(e)
-                print(f"\n❌ --- GENERATION FAILED (Attempt {attempt + 1}/{max_retries}) ---")
-                print(f"Error Message: {error_str}")
-                
-                # Check for 400 or 429 (Quota) errors specifically to trigger rotation
-                if "400" in error_str or "429" in error_str or "API key not valid" in error_str:
-                    self._rotate_client()
-                    last_error = e
-                    continue # Retry with new key
-                else:
-                    # Non-auth/quota error, probably prompt related
-                    return {"error": error_str, "roadmap": "Failed to generate roadmap", "milestones": []}
+    async def analyze_skill_gap(
+        self, current_skills: list[str], target_role: str, major: str,
+        engine: Optional[AIOEngine] = None, fast: bool = False,
+    ) -> dict:
+        """
+        Analyze the gap between current skills and target role requirements.
+
+        When the platform has enough roles with similar titles, the missing skills come
+        from their listed requirements (see app.core.skill_gap_engine) and Gemini only
+        writes the action plan; with `fast`, or when no key can, a templated plan is used.
+        Otherwise Gemini does the whole analysis. Gemini results are cached per canonical
+        inputs and concurrent identical requests share one call.
+        """
+        missing_skills = await self._local_missing_skills(current_skills, target_role, engine)
+        if missing_skills is None:
+            key = self._skill_gap_key(current_skills, target_role, major)
+            return await self._cached(engine, "skill_gap", key, lambda: self._analyze_skill_gap(current_skills, target_role, major))
+
+        if fast:
+            return {"missing_skills": missing_skills, "action_plan": local_action_plan(missing_skills, target_role)}
+
+        plan = await self._action_plan(current_skills, missing_skills, target_role, major, engine)
+        if "error" in plan:
+            # Keys exhausted or failing: the analysis is still useful with a templated plan
+            return {"missing_skills": missing_skills, "action_plan": local_action_plan(missing_skills, target_role)}
+        return {"missing_skills": missing_skills, "action_plan": plan["action_plan"]}
+
+    async def warm_learning_path(self, skills: list[str], goal: str, engine: Optional[AIOEngine] = None) -> bool:
+        """Make sure a generated learning path is cached. False when none could be generated."""
+        return "error" not in await self.generate_learning_path(skills, goal, engine)
+
+    async def warm_skill_gap(self, current_skills: list[str], target_role: str, major: str, engine: Optional[AIOEngine] = None) -> bool:
+        """
+        Make sure the Gemini part of a gap analysis is cached: the action plan when the
+        missing skills are local, otherwise the whole analysis. False when it could not be
+        generated, in which case analyze_skill_gap would fall back to a templated plan.
+        """
+        missing_skills = await self._local_missing_skills(current_skills, target_role, engine)
+        if missing_skills is None:
+            key = self._skill_gap_key(current_skills, target_role, major)
+            result = await self._cached(engine, "skill_gap", key, lambda: self._analyze_skill_gap(current_skills, target_role, major))
+        else:
+            result = await self._action_plan(current_skills, missing_skills, target_role, major, engine)
+        return "error" not in result
+
+    async def _action_plan(self, current_skills: list[str], missing_skills: list[str], target_role: str, major: str, engine: Optional[AIOEngine]) -> dict:
+        key = llm_cache.key(
+            "action_plan", ACTION_PLAN_PROMPT_VERSION,
+            skills=canonical_skills(current_skills), missing=canonical_skills(missing_skills),
+            role=canonical_text(target_role), major=canonical_text(major),
+        )
+        return await self._cached(engine, "action_plan", key, lambda: self._write_action_plan(current_skills, missing_skills, target_role, major))
+
+    async def _local_missing_skills(self, current_skills: list[str], target_role: str, engine: Optional[AIOEngine]) -> Optional[list[str]]:
+        if engine is None:
+            return None
+        try:
+            await skill_gap_engine.ensure_loaded(engine)
+        except Exception as e:
+            print(f"Error loading roles for local gap analysis: {str(e)}")
+            return None
+        return skill_gap_engine.missing_skills(current_skills, target_role)
+
+    async def _write_action_plan(self, current_skills: list[str], missing_skills: list[str], target_role: str, major: str) -> dict:
+        print(f"Writing action plan for {target_role} (Major: {major})... 📊")
+        prompt = f"""
+        Act as a technical recruiter and industry expert. A student majoring in {major} is targeting a {target_role} role.
+        Current Skills: {', '.join(current_skills)}.
+        Missing Skills, from live job postings: {', '.join(missing_skills) or 'none'}.
+        
+        Provide a numbered, step-by-step strategy to close these gaps and become job-ready. Each step should be one concise sentence.
         
-        return {"error": str(last_error), "roadmap": "All API keys failed", "milestones": []}
+        Formatting:
+        - Use clean, professional language.
+        - Ensure the output is ready for a high-end dashboard UI.
+        
+        Return a JSON object with this exact structure:
+        {{
+            "action_plan": ["Step 1 description", "Step 2 description"]
+        }}
+        """
+        try:
+            result_text = await self._generate(
+                prompt,
+                types.GenerateContentConfig(response_mime_type="application/json"),
+                "ACTION PLAN",
+                SKILL_GAP_OUTPUT_TOKENS,
+            )
+            data = json.loads(_strip_code_fence(result_text))
+            if not isinstance(data.get("action_plan"), list):
+                return {"error": "Malformed action plan"}
+            return {"action_plan": data["action_plan"]}
+        except Exception as e:
+            return {"error": str(e)}
+
+    def _skill_gap_key(self, current_skills: list[str], target_role: str, major: str) -> str:
+        return llm_cache.key(
+            "skill_gap", SKILL_GAP_PROMPT_VERSION,
+            skills=canonical_skills(current_skills), role=canonical_text(target_role), major=canonical_text(major),
+        )
 
-    async def analyze_skill_gap(self, current_skills: list[str], target_role: str, major: str) -> dict:
+    async def analyze_skill_gaps(
+        self, requests: list[Tuple[list[str], str, str]],
+        engine: Optional[AIOEngine] = None, fast: bool = False,
+    ) -> AsyncIterator[Tuple[list[int], dict]]:
         """
-        Analyze the gap between current skills and target role requirements.
+        Gap analyses for many (skills, target role, major) requests, yielded as
+        (positions in `requests`, result) as each finishes. Requests with the same
+        canonical inputs are analyzed once. Those the local engine can answer go
+        through analyze_skill_gap one by one; of the rest, cached ones are yielded
+        first and the others are packed several to a prompt. At most one Gemini call
+        per healthy key runs at a time.
         """
+        groups: Dict[str, list[int]] = {}
+        for position, (skills, role, major) in enumerate(requests):
+            groups.setdefault(self._skill_gap_key(skills, role, major), []).append(position)
+
+        local, remote = [], []
+        for key in groups:
+            skills, role, major = requests[groups[key][0]]
+            missing_skills = await self._local_missing_skills(skills, role, engine)
+            (remote if missing_skills is None else local).append(key)
+
+        if fast:
+            for key in local:
+                skills, role, major = requests[groups[key][0]]
+                yield groups[key], await self.analyze_skill_gap(skills, role, major, engine, fast=True)
+            local = []
+
+        pending = []
+        for key, result in zip(remote, await asyncio.gather(*[llm_cache.get(engine, k) for k in remote])):
+            if result is not None:
+                yield groups[key], result
+            else:
+                pending.append((key, requests[groups[key][0]]))
+
+        semaphore = asyncio.Semaphore(max(1, self.keys.healthy()))
+
+        async def run(pack):
+            async with semaphore:
+                return await self._analyze_pack(pack, engine)
+
+        packs = [[(key, requests[groups[key][0]])] for key in local] + self._skill_gap_packs(pending)
+        for finished in asyncio.as_completed([run(pack) for pack in packs]):
+            for key, result in await finished:
+                yield groups[key], result
+
+    def _skill_gap_packs(self, entries: list) -> list[list]:
+        """Greedy packing, in request order, within the item and token limits."""
+        packs, pack, tokens = [], [], 0
+        for entry in entries:
+            skills, role, major = entry[1]
+            estimated = len(", ".join(skills) + role + major) // 4 + SKILL_GAP_OUTPUT_TOKENS
+            if pack and (len(pack) == SKILL_GAP_PACK_ITEMS or tokens + estimated > SKILL_GAP_PACK_TOKENS):
+                packs.append(pack)
+                pack, tokens = [], 0
+            pack.append(entry)
+            tokens += estimated
+        if pack:
+            packs.append(pack)
+        return packs
+
+    async def _analyze_pack(self, pack: list, engine: Optional[AIOEngine]) -> list[Tuple[str, dict]]:
+        if len(pack) == 1:
+            key, (skills, role, major) = pack[0]
+            return [(key, await self.analyze_skill_gap(skills, role, major, engine))]
+
+        print(f"Analyzing {len(pack)} skill gaps in one prompt... 📊")
+        try:
+            result_text = await self._generate(
+                self._skill_gap_pack_prompt([request for _, request in pack]),
+                types.GenerateContentConfig(response_mime_type="application/json"),
+                "BATCH ANALYSIS",
+                SKILL_GAP_OUTPUT_TOKENS * len(pack),
+            )
+            data = json.loads(_strip_code_fence(result_text))
+            by_number = {int(r["id"]): r for r in data.get("results", []) if isinstance(r, dict) and "id" in r}
+        except Exception as e:
+            return [(key, {"error": str(e), "missing_skills": [], "action_plan": []}) for key, _ in pack]
+
+        results = []
+        for number, (key, (skills, role, major)) in enumerate(pack, 1):
+            item = by_number.get(number, {})
+            if isinstance(item.get("missing_skills"), list) and isinstance(item.get("action_plan"), list):
+                result = {"missing_skills": item["missing_skills"], "action_plan": item["action_plan"]}
+                await llm_cache.set(engine, key, result)
+            else:
+                # The model skipped or garbled this student; ask for it alone
+                result = await self.analyze_skill_gap(skills, role, major, engine)
+            results.append((key, result))
+        return results
+
+    def _skill_gap_pack_prompt(self, requests: list[Tuple[list[str], str, str]]) -> str:
+        students = "\n".join(
+            f"        {number}. Major: {major}. Target role: {role}. Current Skills: {', '.join(skills)}."
+            for number, (skills, role, major) in enumerate(requests, 1)
+        )
+        return f"""
+        Act as a technical recruiter and industry expert. Analyze the skill gap of each numbered student below for their target role.
+{students}
+        
+        Requirements, for every student:
+        1. **Missing Skills**: List 3-5 critical technical or soft skills currently lacking.
+        2. **Action Plan**: Provide a numbered, step-by-step strategy to become job-ready. Each step should be one concise sentence.
+        
+        Formatting:
+        - Use clean, professional language.
+        - Ensure the output is ready for a high-end dashboard UI.
+        
+        Return a JSON object with this exact structure, with one entry per student and the student's number as "id":
+        {{
+            "results": [
+                {{
+                    "id": 1,
+                    "missing_skills": ["Skill Name 1", "Skill Name 2"],
+                    "action_plan": ["Step 1 description", "Step 2 description"]
+                }}
+            ]
+        }}
+        """
+
+    async def _analyze_skill_gap(self, current_skills: list[str], target_role: str, major: str) -> dict:
         print(f"Analyzing skill gap for {target_role} (Major: {major})... 📊")
         
         prompt = f"""
@@ -230,44 +601,19 @@ class RecommendationService:
         }}
         """
 
-        # Retry logic with key rotation
-        max_retries = len(self.api_keys) if self.api_keys else 1
-        
-        for attempt in range(max_retries):
-            if not self.client:
-                 return {"error": "No API keys available", "missing_skills": [], "action_plan": []}
-
-            try:
-                response = await self.client.aio.models.generate_content(
-                    model=self.model_name,
-                    contents=prompt,
-                    config=types.GenerateContentConfig(
-                        response_mime_type="application/json"
-                    )
-                )
-
-                result_text = response.text.strip()
-                
-                if "```json" in result_text:
-                    result_text = result_text.split("```json")[1].split("```")[0].strip()
-                elif "```" in result_text:
-                    result_text = result_text.split("```")[1].split("```")[0].strip()
-
-                data = json.loads(result_text)
-                return data
-
-            except Exception as e:
-                error_str = str(e)
-                print(f"\n❌ --- ANALYSIS FAILED (Attempt {attempt + 1}/{max_retries}) ---")
-                print(f"Error Message: {error_str}")
-
-                if "400" in error_str or "429" in error_str or "API key not valid" in error_str:
-                    self._rotate_client()
-                    continue
-                else:
-                    return {"error": error_str, "missing_skills": [], "action_plan": []}
-
-        return {"error": "All API keys failed", "missing_skills": [], "action_plan": []}
+        try:
+            result_text = await self._generate(
+                prompt,
+                types.GenerateContentConfig(response_mime_type="application/json"),
+                "ANALYSIS",
+                SKILL_GAP_OUTPUT_TOKENS,
+            )
+            data = json.loads(_strip_code_fence(result_text))
+            if not isinstance(data, dict) or not isinstance(data.get("missing_skills"), list) or not isinstance(data.get("action_plan"), list):
+                return {"error": "Malformed skill gap analysis", "missing_skills": [], "action_plan": []}
+            return {"missing_skills": data["missing_skills"], "action_plan": data["action_plan"]}
+        except Exception as e:
+            return {"error": str(e), "missing_skills": [], "action_plan": []}
 
 # Singleton instance
 recommendation_service = RecommendationService()
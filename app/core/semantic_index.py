@@ -0,0 +1,146 @@
+import asyncio
+import re
+import time
+import zlib
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from odmantic import AIOEngine
+
+from app.core.config import settings
+from app.models.role import Role
+from app.models.skill_vocabulary import SkillTerm
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+_NGRAM_SIZES = (3, 4, 5)
+
+def _ngrams(key: str) -> List[str]:
+    padded = f" {key} "
+    return [padded[i:i + n] for n in _NGRAM_SIZES for i in range(len(padded) - n + 1)]
+
+def _hashed(features: Iterable[str], dims: int) -> np.ndarray:
+    """Bag of features folded into a fixed number of buckets. crc32 is stable across processes."""
+    vector = np.zeros(dims, dtype=np.float32)
+    for feature in features:
+        vector[zlib.crc32(feature.encode()) % dims] += 1.0
+    return vector
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+class SemanticSkillIndex:
+    """
+    Approximate similarity between interned skills, so "PostgreSQL" can partially
+    satisfy "SQL" and "Docker" can partially satisfy "Kubernetes".
+
+    Every skill gets two hashed vectors: TF-IDF weighted character n-grams of its
+    canonical key (spelling similarity) and the words of the roles that ask for it,
+    plus the other skills those roles list (context similarity). Both halves are
+    L2-normalized and concatenated, so cosine similarity is their average.
+    The skill vocabulary is small, so neighbours come from an exact cosine scan over
+    every skill, one matrix-vector product, and are cached per skill until the next
+    load. Random-hyperplane LSH lost pairs just above min_similarity, such as
+    PostgreSQL and SQL, which are the ones soft matching is for.
+    """
+
+    def __init__(
+        self,
+        dims: int = 1024,
+        min_similarity: float = settings.SEMANTIC_MIN_SIMILARITY,
+        refresh_seconds: int = settings.MATCH_ENGINE_REFRESH_SECONDS,
+    ):
+        self.dims = dims
+        self.min_similarity = min_similarity
+        self.refresh_seconds = refresh_seconds
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+
+        self._rows: Dict[int, int] = {}
+        self._vectors = np.zeros((0, 2 * dims), dtype=np.float32)
+        self._skill_ids = np.zeros(0, dtype=np.int64)
+        self._neighbors: Dict[int, List[Tuple[int, float]]] = {}
+
+    async def ensure_loaded(self, engine: AIOEngine):
+        """Build the index on first use and rebuild it when it gets older than refresh_seconds."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            await self.load(engine)
+
+    async def load(self, engine: AIOEngine):
+        """Rebuild the vectors from the skill vocabulary and the active roles."""
+        keys: Dict[int, str] = {}
+        async for doc in engine.get_collection(SkillTerm).find({}, {"skill_id": 1, "key": 1, "_id": 0}):
+            keys[doc["skill_id"]] = doc["key"]
+
+        contexts: Dict[int, List[str]] = defaultdict(list)
+        projection = {"title": 1, "description": 1, "required_skill_ids": 1, "preferred_skill_ids": 1}
+        async for doc in engine.get_collection(Role).find({"is_active": True}, projection):
+            skill_ids = doc.get("required_skill_ids", []) + doc.get("preferred_skill_ids", [])
+            words = _WORD.findall(f"{doc.get('title', '')} {doc.get('description', '')}".lower())
+            for skill_id in skill_ids:
+                others = [keys[s] for s in skill_ids if s != skill_id and s in keys]
+                contexts[skill_id].extend(w for w in words if w != keys.get(skill_id))
+                contexts[skill_id].extend(others)
+
+        self.build(keys, contexts)
+        self._loaded_at = time.monotonic()
+
+    def build(self, keys: Dict[int, str], contexts: Dict[int, List[str]]):
+        """Build the index from canonical keys and per-skill context words."""
+        skill_ids = list(keys)
+        spelling = np.array([_hashed(_ngrams(keys[s]), self.dims) for s in skill_ids], dtype=np.float32)
+        spelling = spelling.reshape(len(skill_ids), self.dims)
+        document_frequency = (spelling > 0).sum(axis=0)
+        spelling *= np.log((1 + len(skill_ids)) / (1 + document_frequency)) + 1
+        context = np.array([_hashed(contexts.get(s, []), self.dims) for s in skill_ids], dtype=np.float32)
+        context = context.reshape(len(skill_ids), self.dims)
+
+        vectors = _normalize_rows(np.hstack([_normalize_rows(spelling), _normalize_rows(context)]))
+
+        # Swap in one go so requests never see a half-built index
+        self._rows = {skill_id: row for row, skill_id in enumerate(skill_ids)}
+        self._skill_ids = np.array(skill_ids, dtype=np.int64)
+        self._vectors = vectors
+        self._neighbors = {}
+
+    def neighbors(self, skill_id: int) -> List[Tuple[int, float]]:
+        """Skills at least min_similarity close to skill_id, itself included at 1.0, most similar first."""
+        cached = self._neighbors.get(skill_id)
+        if cached is not None:
+            return cached
+
+        row = self._rows.get(skill_id)
+        if row is None:
+            # Interned after the last load, so only exact matches count until then
+            return [(skill_id, 1.0)]
+
+        similarity = self._vectors @ self._vectors[row]
+        candidates = np.flatnonzero(similarity >= self.min_similarity)
+        similarity = similarity[candidates]
+
+        result = [(skill_id, 1.0)] + [
+            (int(self._skill_ids[c]), float(s))
+            for s, c in sorted(zip(similarity, candidates), reverse=True) if c != row
+        ]
+        self._neighbors[skill_id] = result
+        return result
+
+    def best_similarities(self, skill_ids: Iterable[Optional[int]]) -> Dict[int, float]:
+        """For every skill near one of skill_ids, the highest similarity to any of them."""
+        best: Dict[int, float] = {}
+        for skill_id in skill_ids:
+            if skill_id is None:
+                continue
+            for other, similarity in self.neighbors(skill_id):
+                if similarity > best.get(other, 0.0):
+                    best[other] = similarity
+        return best
+
+# Singleton instance
+semantic_index = SemanticSkillIndex()
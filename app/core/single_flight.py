@@ -0,0 +1,41 @@
+import asyncio
+from collections import defaultdict
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+class SingleFlight:
+    """
+    Collapses concurrent calls that share a key into one upstream call.
+
+    The first caller for a key starts the call as a task; callers arriving while it
+    runs await the same task and receive its result, or its exception. The task is
+    shielded, so a caller that goes away does not cancel it for the others. Nothing
+    is remembered once the call finishes; caching results is the caller's job.
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._collapsed: Dict[str, int] = defaultdict(int)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]], kind: str = "default") -> Any:
+        self._calls[kind] += 1
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(call())
+            self._inflight[key] = task
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            self._collapsed[kind] += 1
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        # Every caller may have gone away; the error is theirs to see, not the loop's
+        task.cancelled() or task.exception()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "inflight": len(self._inflight),
+            "calls": dict(self._calls),
+            "collapsed": dict(self._collapsed),
+        }
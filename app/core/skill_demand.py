@@ -0,0 +1,109 @@
+import asyncio
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from odmantic import AIOEngine
+from pymongo import ReplaceOne, UpdateOne
+
+from app.models.skill_demand import SkillDemand
+from app.models.user import Skill, User, UserRole
+
+SKILL = "skill"
+CATEGORY = "category"
+TOTAL = "total"
+STUDENTS_KEY = "students"
+
+# (skill_id, name, category) of one embedded skill
+SkillEntry = Tuple[Optional[int], str, Optional[str]]
+
+def _entries(skills: Optional[List[Skill]]) -> Optional[List[SkillEntry]]:
+    if skills is None:
+        return None
+    return [(s.skill_id, s.name, s.category) for s in skills]
+
+def _counts(entries: Optional[Iterable[SkillEntry]]) -> Tuple[Counter, Dict[str, dict]]:
+    """Counter contributions of one student with these skills, plus the fields of each counter document."""
+    counts, fields = Counter(), {}
+    if entries is None:
+        return counts, fields
+
+    counts[STUDENTS_KEY] += 1
+    fields[STUDENTS_KEY] = {"kind": TOTAL, "label": "Students", "skill_id": None}
+    for skill_id, name, category in entries:
+        # By interned ID so spelling variants of a skill add up, by name for legacy rows
+        key = f"{SKILL}:{skill_id if skill_id is not None else name}"
+        counts[key] += 1
+        fields[key] = {"kind": SKILL, "label": name, "skill_id": skill_id}
+
+        category = category or "General"
+        key = f"{CATEGORY}:{category}"
+        counts[key] += 1
+        fields[key] = {"kind": CATEGORY, "label": category, "skill_id": None}
+    return counts, fields
+
+class SkillDemandCounters:
+    """
+    Pre-aggregated skill and category counts over all students, so the recruiter
+    dashboard reads a handful of small documents instead of every student profile.
+    Writers pass a student's skills before and after a change and the counters
+    move by the difference with $inc, which stays correct under concurrent writers.
+    """
+
+    async def student_changed(self, engine: AIOEngine, old_skills: Optional[List[Skill]], new_skills: Optional[List[Skill]]):
+        """
+        Apply one student's change. None stands for "not counted": old_skills=None
+        for a new student, new_skills=None for a user who is no longer a student.
+        """
+        old_counts, old_fields = _counts(_entries(old_skills))
+        new_counts, new_fields = _counts(_entries(new_skills))
+        fields = {**old_fields, **new_fields}
+        delta = Counter(new_counts)
+        delta.subtract(old_counts)
+
+        operations = [
+            UpdateOne({"_id": key}, {"$inc": {"count": change}, "$setOnInsert": fields[key]}, upsert=True)
+            for key, change in delta.items() if change
+        ]
+        if operations:
+            await engine.get_collection(SkillDemand).bulk_write(operations, ordered=False)
+
+    async def user_created(self, engine: AIOEngine, user: User):
+        if user.role == UserRole.STUDENT:
+            await self.student_changed(engine, None, user.skills)
+
+    async def read(self, engine: AIOEngine, top: int = 5) -> Tuple[int, List[SkillDemand], List[SkillDemand]]:
+        """Returns (total students, most common skills, every category)."""
+        total, skills, categories = await asyncio.gather(
+            engine.find_one(SkillDemand, SkillDemand.key == STUDENTS_KEY),
+            engine.find(SkillDemand, {"kind": SKILL, "count": {"$gt": 0}}, sort=SkillDemand.count.desc(), limit=top),
+            engine.find(SkillDemand, {"kind": CATEGORY, "count": {"$gt": 0}}),
+        )
+        return (total.count if total else 0), skills, categories
+
+    async def rebuild(self, engine: AIOEngine) -> int:
+        """Recount every counter from the student documents, e.g. to repair drift. Returns the students counted."""
+        counts, fields, students = Counter(), {}, 0
+        cursor = engine.get_collection(User).find(
+            {"role": UserRole.STUDENT.value}, {"skills.skill_id": 1, "skills.name": 1, "skills.category": 1}
+        )
+        async for doc in cursor:
+            student_counts, student_fields = _counts(
+                (s.get("skill_id"), s["name"], s.get("category")) for s in doc.get("skills", [])
+            )
+            counts.update(student_counts)
+            fields.update(student_fields)
+            students += 1
+        # An empty population still has a total, of zero
+        fields.setdefault(STUDENTS_KEY, {"kind": TOTAL, "label": "Students", "skill_id": None})
+
+        collection = engine.get_collection(SkillDemand)
+        operations = [
+            ReplaceOne({"_id": key}, {**fields[key], "count": counts[key]}, upsert=True) for key in fields
+        ]
+        for start in range(0, len(operations), 1000):
+            await collection.bulk_write(operations[start:start + 1000], ordered=False)
+        await collection.delete_many({"_id": {"$nin": list(fields)}})
+        return students
+
+# Singleton instance
+skill_demand = SkillDemandCounters()
@@ -0,0 +1,166 @@
+import asyncio
+import re
+import time
+from collections import Counter, defaultdict
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from odmantic import AIOEngine
+
+from app.core.config import settings
+from app.core.lru_cache import LRUCache
+from app.core.skill_vocabulary import canonical_skill_key
+from app.models.role import Role
+
+_WORD = re.compile(r"[a-z0-9+#]+")
+
+# Title words that say how senior a role is, not what it is
+_TITLE_NOISE = {
+    "senior", "sr", "junior", "jr", "lead", "principal", "staff", "head", "chief",
+    "intern", "internship", "trainee", "graduate", "entry", "level", "mid", "i", "ii", "iii",
+    "a", "an", "the", "of", "and", "for", "remote",
+}
+_TITLE_ALIASES = {
+    "dev": "developer",
+    "eng": "engineer",
+    "engineering": "engineer",
+    "swe": "software",
+    "ml": "machine",
+    "ai": "machine",
+}
+_COMPOUNDS = {"front end": "frontend", "back end": "backend", "full stack": "fullstack"}
+
+REQUIRED_WEIGHT = 1.0
+PREFERRED_WEIGHT = 0.5
+
+def title_tokens(title: str) -> Set[str]:
+    """What a role title asks for, as folded words without seniority markers."""
+    title = " ".join(title.lower().replace("-", " ").split())
+    for compound, word in _COMPOUNDS.items():
+        title = title.replace(compound, word)
+    words = _WORD.findall(title)
+    return {_TITLE_ALIASES.get(w, w) for w in words if w not in _TITLE_NOISE}
+
+class SkillGapEngine:
+    """
+    Local skill-gap analysis from what employers on the platform actually ask for.
+
+    For a target role title it gathers the active roles with similar titles (Jaccard
+    similarity of their title words) and weighs every skill they list, required
+    skills fully and preferred skills half, by title similarity. A skill's frequency
+    is its share of that weight. Missing skills are the most frequent ones the
+    student lacks, compared by canonical skill key. Profiles are cached per title
+    until the next reload, so an answer is a few set operations.
+    """
+
+    def __init__(
+        self,
+        min_title_similarity: float = 0.5,
+        min_roles: int = 2,
+        min_frequency: float = 0.25,
+        max_missing: int = 5,
+        refresh_seconds: int = settings.MATCH_ENGINE_REFRESH_SECONDS,
+    ):
+        self.min_title_similarity = min_title_similarity
+        self.min_roles = min_roles
+        self.min_frequency = min_frequency
+        self.max_missing = max_missing
+        self.refresh_seconds = refresh_seconds
+        self._lock = asyncio.Lock()
+        self._loaded_at: Optional[float] = None
+
+        self._titles: List[Set[str]] = []
+        self._skills: List[Dict[str, float]] = []  # Per role: canonical key -> weight
+        self._by_token: Dict[str, List[int]] = defaultdict(list)
+        self._names: Dict[str, str] = {}
+        self._profiles = LRUCache(1024)
+
+    async def ensure_loaded(self, engine: AIOEngine):
+        """Load the roles on first use and reload them when they get older than refresh_seconds."""
+        if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            if self._loaded_at is not None and time.monotonic() - self._loaded_at < self.refresh_seconds:
+                return
+            await self.load(engine)
+
+    async def load(self, engine: AIOEngine):
+        """Rebuild the title index from the active roles."""
+        projection = {"title": 1, "required_skills": 1, "preferred_skills": 1}
+        roles = await engine.get_collection(Role).find({"is_active": True}, projection).to_list(length=None)
+        self.build(roles)
+        self._loaded_at = time.monotonic()
+
+    def build(self, roles: Iterable[dict]):
+        titles, skills, by_token = [], [], defaultdict(list)
+        spellings: Dict[str, Counter] = defaultdict(Counter)
+        for doc in roles:
+            weights: Dict[str, float] = {}
+            for names, weight in ((doc.get("preferred_skills", []), PREFERRED_WEIGHT), (doc.get("required_skills", []), REQUIRED_WEIGHT)):
+                for name in names:
+                    key = canonical_skill_key(name)
+                    if key:
+                        # A skill listed as both counts as required
+                        weights[key] = max(weights.get(key, 0.0), weight)
+                        spellings[key][name.strip()] += 1
+            tokens = title_tokens(doc.get("title", ""))
+            for token in tokens:
+                by_token[token].append(len(titles))
+            titles.append(tokens)
+            skills.append(weights)
+
+        self._titles, self._skills, self._by_token = titles, skills, by_token
+        # Show each skill the way employers most often write it
+        self._names = {key: counts.most_common(1)[0][0] for key, counts in spellings.items()}
+        self._profiles = LRUCache(1024)
+
+    def profile(self, target_role: str) -> Optional[List[Tuple[str, float]]]:
+        """(canonical skill key, frequency) pairs for a role title, most frequent first. None without enough similar roles."""
+        tokens = title_tokens(target_role)
+        cache_key = tuple(sorted(tokens))
+        cached = self._profiles.get(cache_key)
+        if cached is not None:
+            return cached or None
+
+        candidates = {row for token in tokens for row in self._by_token.get(token, [])}
+        similar = []
+        for row in candidates:
+            similarity = len(tokens & self._titles[row]) / len(tokens | self._titles[row])
+            if similarity >= self.min_title_similarity:
+                similar.append((row, similarity))
+
+        profile: List[Tuple[str, float]] = []
+        if len(similar) >= self.min_roles:
+            weights: Dict[str, float] = defaultdict(float)
+            for row, similarity in similar:
+                for key, weight in self._skills[row].items():
+                    weights[key] += weight * similarity
+            total = sum(similarity for _, similarity in similar)
+            profile = sorted(((key, weight / total) for key, weight in weights.items()), key=lambda kv: (-kv[1], kv[0]))
+
+        # An empty list remembers that this title has no profile
+        self._profiles.set(cache_key, profile)
+        return profile or None
+
+    def missing_skills(self, current_skills: Iterable[str], target_role: str) -> Optional[List[str]]:
+        """The most frequent skills for the role that the student lacks, or None when the role has no profile."""
+        profile = self.profile(target_role)
+        if profile is None:
+            return None
+        have = {canonical_skill_key(skill) for skill in current_skills}
+        missing = [key for key, frequency in profile if frequency >= self.min_frequency and key not in have]
+        return [self._names[key] for key in missing[:self.max_missing]]
+
+def local_action_plan(missing_skills: List[str], target_role: str) -> List[str]:
+    """A templated plan for when no LLM should or can write one."""
+    if not missing_skills:
+        return [
+            f"Your skills already cover what most {target_role} roles ask for.",
+            f"Build a portfolio project that shows them together and apply to {target_role} roles.",
+        ]
+    steps = [f"Learn {skill} from its official documentation and use it in a small project." for skill in missing_skills[:3]]
+    steps.append(f"Build a portfolio project for a {target_role} role that combines {', '.join(missing_skills[:3])}.")
+    steps.append(f"Add the new skills to your profile and apply to {target_role} roles.")
+    return steps
+
+# Singleton instance
+skill_gap_engine = SkillGapEngine()
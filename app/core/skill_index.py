@@ -0,0 +1,70 @@
+from typing import Iterable, List, Optional, Set
+from odmantic import AIOEngine
+from pymongo import UpdateOne
+
+from app.models.skill_index import SkillPosting
+from app.models.user import User, UserRole
+
+def _skill_ids(skill_ids: Iterable[Optional[int]]) -> Set[int]:
+    return {skill_id for skill_id in skill_ids if skill_id is not None}
+
+class SkillIndex:
+    """
+    Inverted index from interned skill ID to the IDs of students who list it.
+    The match engine builds its incidence matrix from these postings instead of
+    decoding every student document.
+    """
+
+    async def update_student(self, engine: AIOEngine, student_id: str, skill_ids: Iterable[Optional[int]]) -> None:
+        """Replace a student's postings with the given skills, touching only the difference."""
+        collection = engine.get_collection(SkillPosting)
+        new_skills = _skill_ids(skill_ids)
+
+        cursor = collection.find({"student_id": student_id}, {"skill_id": 1, "_id": 0})
+        current_skills = {doc["skill_id"] async for doc in cursor}
+
+        removed = current_skills - new_skills
+        added = new_skills - current_skills
+
+        if removed:
+            await collection.delete_many({"student_id": student_id, "skill_id": {"$in": list(removed)}})
+        if added:
+            await collection.bulk_write(
+                [
+                    UpdateOne(
+                        {"skill_id": skill_id, "student_id": student_id},
+                        {"$setOnInsert": {"skill_id": skill_id, "student_id": student_id}},
+                        upsert=True,
+                    )
+                    for skill_id in added
+                ],
+                ordered=False,
+            )
+
+    async def rebuild(self, engine: AIOEngine) -> int:
+        """Rebuild every posting from the student documents. Returns the number of students indexed."""
+        postings = engine.get_collection(SkillPosting)
+        # Drop rather than empty the collection so indexes from older layouts go too
+        await postings.drop()
+        await engine.configure_database([SkillPosting])
+
+        users = engine.get_collection(User)
+        cursor = users.find({"role": UserRole.STUDENT.value}, {"skills.skill_id": 1})
+        indexed = 0
+        batch: List[dict] = []
+        async for doc in cursor:
+            student_id = str(doc["_id"])
+            batch.extend(
+                {"skill_id": skill_id, "student_id": student_id}
+                for skill_id in _skill_ids(s.get("skill_id") for s in doc.get("skills", []))
+            )
+            indexed += 1
+            if len(batch) >= 1000:
+                await postings.insert_many(batch, ordered=False)
+                batch = []
+        if batch:
+            await postings.insert_many(batch, ordered=False)
+        return indexed
+
+# Singleton instance
+skill_index = SkillIndex()
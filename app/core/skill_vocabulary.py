@@ -0,0 +1,160 @@
+import re
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from odmantic import AIOEngine
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+
+from app.models.role import Role
+from app.models.skill_vocabulary import SkillTerm
+from app.models.user import User
+
+# Trailing version numbers written as a separate word: "Python 3", "Vue 2.x", "Angular v14"
+_VERSION_SUFFIX = re.compile(r"\s+v?\d+(\.\d+)*(\.x)?$")
+# Everything except letters, digits and the symbols that tell C, C++ and C# apart
+_PUNCTUATION = re.compile(r"[^a-z0-9+#]")
+
+# Normalized spelling -> canonical key
+SKILL_ALIASES = {
+    "reactjs": "react",
+    "node": "nodejs",
+    "vuejs": "vue",
+    "angularjs": "angular",
+    "js": "javascript",
+    "es6": "javascript",
+    "ecmascript": "javascript",
+    "ts": "typescript",
+    "py": "python",
+    "python3": "python",
+    "golang": "go",
+    "postgres": "postgresql",
+    "psql": "postgresql",
+    "mongo": "mongodb",
+    "k8s": "kubernetes",
+    "amazonwebservices": "aws",
+    "gcp": "googlecloud",
+    "googlecloudplatform": "googlecloud",
+    "ml": "machinelearning",
+    "dl": "deeplearning",
+    "tf": "tensorflow",
+    "sklearn": "scikitlearn",
+    "rest": "restapis",
+    "restapi": "restapis",
+    "restful": "restapis",
+    "restfulapis": "restapis",
+    "html5": "html",
+    "css3": "css",
+    "net": "dotnet",
+    "csharp": "c#",
+    "cpp": "c++",
+}
+
+def canonical_skill_key(name: str) -> str:
+    """Fold case, punctuation, version suffixes and known aliases into one key."""
+    key = _VERSION_SUFFIX.sub("", name.strip().lower())
+    key = _PUNCTUATION.sub("", key)
+    return SKILL_ALIASES.get(key, key)
+
+class SkillVocabulary:
+    """
+    Interns free-text skill names as stable integer IDs, so "ReactJS", "React.js"
+    and "react" all become the same skill. IDs are allocated from a counter in
+    Mongo and never change, so every worker can cache them indefinitely.
+    """
+
+    def __init__(self):
+        self._ids: Dict[str, int] = {}
+        self._names: Dict[int, str] = {}
+
+    async def intern(self, engine: AIOEngine, name: str) -> Optional[int]:
+        """ID for a skill name, allocating a new one for unseen skills. None for blank names."""
+        key = canonical_skill_key(name)
+        if not key:
+            return None
+        if key in self._ids:
+            return self._ids[key]
+
+        terms = engine.get_collection(SkillTerm)
+        doc = await terms.find_one({"key": key})
+        if not doc:
+            counter = await engine.database["counters"].find_one_and_update(
+                {"_id": "skill_id"},
+                {"$inc": {"seq": 1}},
+                upsert=True,
+                return_document=ReturnDocument.AFTER,
+            )
+            try:
+                await terms.update_one(
+                    {"key": key},
+                    {"$setOnInsert": {"skill_id": counter["seq"], "key": key, "name": name.strip()}},
+                    upsert=True,
+                )
+            except DuplicateKeyError:
+                pass  # Another worker interned the same key first
+            doc = await terms.find_one({"key": key})
+
+        self._cache(doc)
+        return doc["skill_id"]
+
+    async def intern_many(self, engine: AIOEngine, names: Iterable[str]) -> List[Optional[int]]:
+        return [await self.intern(engine, name) for name in names]
+
+    async def names(self, engine: AIOEngine, skill_ids: Iterable[int]) -> Dict[int, str]:
+        """Display names for the given IDs."""
+        ids = set(skill_ids)
+        missing = [i for i in ids if i not in self._names]
+        if missing:
+            async for doc in engine.get_collection(SkillTerm).find({"skill_id": {"$in": missing}}):
+                self._cache(doc)
+        return {i: self._names[i] for i in ids if i in self._names}
+
+    async def assign_role_skills(self, engine: AIOEngine, role: Role):
+        """Set the ID lists of a role from its skill names, dropping blank names."""
+        role.required_skills, role.required_skill_ids = await self._named_ids(engine, role.required_skills)
+        role.preferred_skills, role.preferred_skill_ids = await self._named_ids(engine, role.preferred_skills)
+
+    async def assign_user_skills(self, engine: AIOEngine, user: User):
+        for skill in user.skills:
+            skill.skill_id = await self.intern(engine, skill.name)
+
+    async def backfill(self, engine: AIOEngine) -> Tuple[int, int]:
+        """Intern the skills of every existing user and role. Returns (users, roles) updated."""
+        users = 0
+        for user in await engine.find(User, {"skills.0": {"$exists": True}}):
+            await self.assign_user_skills(engine, user)
+            await engine.save(user)
+            users += 1
+
+        roles = 0
+        for role in await engine.find(Role):
+            await self.assign_role_skills(engine, role)
+            await engine.save(role)
+            roles += 1
+        return users, roles
+
+    async def needs_backfill(self, engine: AIOEngine) -> bool:
+        """Whether skills were saved before the vocabulary existed, so `manage.py backfill-skill-ids` has not run."""
+        if await engine.get_collection(SkillTerm).find_one({}, {"_id": 1}):
+            return False
+        with_skills = [
+            engine.get_collection(User).find_one({"skills.0": {"$exists": True}}, {"_id": 1}),
+            engine.get_collection(Role).find_one({"required_skills.0": {"$exists": True}}, {"_id": 1}),
+        ]
+        return any([await query for query in with_skills])
+
+    async def _named_ids(self, engine: AIOEngine, names: List[str]) -> Tuple[List[str], List[int]]:
+        pairs = [(name, await self.intern(engine, name)) for name in names]
+        pairs = [(name, skill_id) for name, skill_id in pairs if skill_id is not None]
+        return [name for name, _ in pairs], [skill_id for _, skill_id in pairs]
+
+    def clear(self):
+        """Forget the cached IDs, e.g. when the database behind them is replaced."""
+        self._ids.clear()
+        self._names.clear()
+
+    def _cache(self, doc: dict):
+        self._ids[doc["key"]] = doc["skill_id"]
+        self._names[doc["skill_id"]] = doc["name"]
+
+# Singleton instance
+skill_vocabulary = SkillVocabulary()
@@ -7,3 +7,26 @@ engine = AIOEngine(client=client, database="skillsync")
 
 async def get_engine():
     return engine
+
+async def configure_indexes():
+    """Create the indexes declared on models that are queried through them."""
+    from app.models.skill_index import SkillPosting
+    from app.models.match import Match
+    from app.models.skill_vocabulary import SkillTerm
+    from app.models.skill_demand import SkillDemand
+    from app.models.application import Application
+    from app.models.application_rollup import ApplicationRollup
+    from app.models.user import User
+    from app.models.role import Role
+    from app.models.llm_cache import LLMCacheEntry
+    from app.models.ai_demand import AIDemand
+
+    await engine.configure_database([SkillPosting, Match, SkillTerm, SkillDemand, Application, ApplicationRollup, AIDemand])
+    # Multikey index for matching students by skill inside Mongo (see app.core.match_pipeline)
+    await engine.get_collection(User).create_index([("role", 1), ("skills.skill_id", 1)])
+    # Keyset pages of the student listing
+    await engine.get_collection(User).create_index([("role", 1), ("_id", 1)])
+    # Multikey index for the roles a student's skills can match (see app.core.match_table)
+    await engine.get_collection(Role).create_index([("required_skill_ids", 1), ("is_active", 1)])
+    # odmantic indexes cannot carry options; expire cached LLM results at their expires_at
+    await engine.get_collection(LLMCacheEntry).create_index("expires_at", expireAfterSeconds=0)
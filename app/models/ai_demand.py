@@ -0,0 +1,25 @@
+from datetime import datetime
+from typing import List, Optional
+from odmantic import Model, Field, Index
+from odmantic.query import desc
+
+class AIDemand(Model):
+    # One counter per operation and canonical inputs ("<kind>:<hash>"); the
+    # inputs are kept as first asked so the request can be replayed
+    key: str = Field(primary_field=True)
+    kind: str  # "learning_path" or "skill_gap"
+    skills: List[str]
+    goal: str  # Learning path goal or target role
+    goal_key: str  # Canonical goal, for counting goals across skill sets
+    major: Optional[str] = None
+    major_key: Optional[str] = None
+    count: int = 0
+    last_requested_at: datetime
+
+    model_config = {
+        "collection": "ai_demand",
+        "indexes": lambda: [
+            Index(AIDemand.kind, AIDemand.last_requested_at),
+            Index(AIDemand.last_requested_at, desc(AIDemand.count)),
+        ],
+    }
@@ -1,4 +1,5 @@
-from odmantic import Model, Field
+from odmantic import Model, Field, Index
+from odmantic.query import desc
 from datetime import datetime
 from enum import Enum
 
@@ -16,3 +17,12 @@ class Application(Model):
     applied_at: datetime = Field(default_factory=datetime.utcnow)
     match_score: int 
     cover_letter: str = ""
+
+    model_config = {
+        "indexes": lambda: [
+            Index(desc(Application.applied_at)),
+            # Keyset pages of one role's or one student's applications, newest first
+            Index(Application.role_id, desc(Application.id)),
+            Index(Application.student_id, desc(Application.id)),
+        ],
+    }
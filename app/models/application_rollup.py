@@ -0,0 +1,20 @@
+from datetime import datetime
+from typing import Dict
+from odmantic import Model, Field, Index
+
+class ApplicationRollup(Model):
+    # One document per time bucket: "day:2024-05-01" or "hour:2024-05-01T13"
+    key: str = Field(primary_field=True)
+    granularity: str  # "day" or "hour"
+    bucket_start: datetime  # UTC, like Application.applied_at
+    total: int = 0
+    statuses: Dict[str, int] = {}  # Applications in the bucket by current status
+    match_score_sum: int = 0
+    match_score_count: int = 0
+
+    model_config = {
+        "collection": "application_rollups",
+        "indexes": lambda: [
+            Index(ApplicationRollup.granularity, ApplicationRollup.bucket_start),
+        ],
+    }
@@ -0,0 +1,13 @@
+from datetime import datetime
+from typing import Any, Dict
+from odmantic import Model, Field
+
+class LLMCacheEntry(Model):
+    # Hash of the operation, its prompt version and its canonical inputs (see app.core.llm_cache)
+    key: str = Field(primary_field=True)
+    kind: str  # "learning_path", "skill_gap", ...
+    payload: Dict[str, Any]
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    expires_at: datetime  # Removed by a TTL index once past
+
+    model_config = {"collection": "llm_cache"}
@@ -0,0 +1,23 @@
+from typing import List
+from odmantic import Model, Field, Index
+from odmantic.query import desc
+from datetime import datetime
+
+class Match(Model):
+    # Materialized (student, active role) match, maintained by app.core.match_table
+    student_id: str
+    role_id: str
+    score: int
+    skills_matched: List[str] = []
+    skills_missing: List[str] = []
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+
+    model_config = {
+        "collection": "matches",
+        "indexes": lambda: [
+            Index(Match.student_id, Match.role_id, unique=True),
+            # Range reads for the match endpoints: score desc, ties broken by id
+            Index(Match.role_id, desc(Match.score), Match.student_id),
+            Index(Match.student_id, desc(Match.score), Match.role_id),
+        ],
+    }
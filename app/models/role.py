@@ -23,6 +23,9 @@ class Role(Model):
     # Matching criteria
     required_skills: List[str] = []
     preferred_skills: List[str] = []
+    # Interned IDs of the skills above, aligned by position (set on write)
+    required_skill_ids: List[int] = []
+    preferred_skill_ids: List[int] = []
     min_experience_years: int = 0
     
     # Display fields
@@ -0,0 +1,19 @@
+from typing import Optional
+from odmantic import Model, Field, Index
+from odmantic.query import desc
+
+class SkillDemand(Model):
+    # One counter per skill ("skill:<skill_id or name>"), per category
+    # ("category:<name>") and one for the student total ("students")
+    key: str = Field(primary_field=True)
+    kind: str  # "skill", "category" or "total"
+    label: str  # Skill or category name, as first seen
+    skill_id: Optional[int] = None
+    count: int = 0
+
+    model_config = {
+        "collection": "skill_demand",
+        "indexes": lambda: [
+            Index(SkillDemand.kind, desc(SkillDemand.count)),
+        ],
+    }
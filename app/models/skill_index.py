@@ -0,0 +1,15 @@
+from odmantic import Model, Index
+
+class SkillPosting(Model):
+    # One document per (skill, student) pair, so each skill's posting list
+    # is just a range of the (skill_id, student_id) index.
+    skill_id: int
+    student_id: str
+
+    model_config = {
+        "collection": "skill_postings",
+        "indexes": lambda: [
+            Index(SkillPosting.skill_id, SkillPosting.student_id, unique=True),
+            Index(SkillPosting.student_id),
+        ],
+    }
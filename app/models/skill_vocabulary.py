@@ -0,0 +1,14 @@
+from odmantic import Model, Index
+
+class SkillTerm(Model):
+    skill_id: int
+    key: str  # Canonical normalized form, see app.core.skill_vocabulary
+    name: str  # Display name, as first written
+
+    model_config = {
+        "collection": "skill_vocabulary",
+        "indexes": lambda: [
+            Index(SkillTerm.skill_id, unique=True),
+            Index(SkillTerm.key, unique=True),
+        ],
+    }
@@ -10,6 +10,7 @@ class UserRole(str, Enum):
 
 class Skill(EmbeddedModel):
     name: str
+    skill_id: Optional[int] = None  # Interned by app.core.skill_vocabulary
     level: int  # 1-100
     verified: bool = False
     category: Optional[str] = "General"
@@ -0,0 +1,346 @@
+"""
+Matching benchmarks over a synthetic population.
+
+    python bench_matching.py                                  # 1k students, in-memory engine
+    python bench_matching.py --students 100000 1000000 --roles 10 1000 10000 \
+        --mongo-uri mongodb://localhost:27017
+
+For every (students, roles) size it seeds a fresh database and runs
+calculate_match, both match endpoints in each mode, and dashboard-metrics. It
+reports throughput, p50/p99 latency and the process's peak RSS, and writes
+everything to a JSON file so runs can be compared between commits.
+
+Without --mongo-uri, the database is an in-memory mongomock_motor stand-in.
+It scans collections for every query, so it is only practical for a few
+thousand students and its endpoint timings are not comparable with MongoDB's. The benchmark database named by
+--database is dropped before each size is seeded.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+import httpx
+import numpy as np
+from motor.motor_asyncio import AsyncIOMotorClient
+from odmantic import AIOEngine
+
+import app.db as db
+from app.api.matching import calculate_match
+from app.api.response_cache import response_cache
+from app.core.match_cache import match_cache
+from app.core.match_engine import match_engine
+from app.core.match_table import match_table
+from app.core.semantic_index import semantic_index
+from app.core.skill_demand import skill_demand
+from app.core.skill_index import skill_index
+from app.core.skill_vocabulary import skill_vocabulary
+from app.models.application import Application, ApplicationStatus
+from app.models.role import Role, RoleType
+from app.models.user import Skill, User, UserRole
+
+# (name, category), most in-demand first. Popularity falls off Zipf-like with rank.
+SKILL_CATALOGUE = [
+    ("Python", "Backend"), ("JavaScript", "Frontend"), ("SQL", "Data"), ("React", "Frontend"),
+    ("Git", "Tools"), ("Java", "Backend"), ("TypeScript", "Frontend"), ("Node.js", "Backend"),
+    ("Docker", "DevOps"), ("AWS", "Cloud"), ("HTML", "Frontend"), ("CSS", "Frontend"),
+    ("PostgreSQL", "Data"), ("Linux", "DevOps"), ("C++", "Systems"), ("Machine Learning", "AI"),
+    ("MongoDB", "Data"), ("REST APIs", "Backend"), ("Kubernetes", "DevOps"), ("Django", "Backend"),
+    ("Pandas", "Data"), ("TensorFlow", "AI"), ("Go", "Backend"), ("C#", "Backend"),
+    ("Figma", "Design"), ("Vue", "Frontend"), ("Angular", "Frontend"), ("MySQL", "Data"),
+    ("Flask", "Backend"), ("PyTorch", "AI"), ("Azure", "Cloud"), ("Google Cloud", "Cloud"),
+    ("GraphQL", "Backend"), ("Redis", "Data"), ("Spring Boot", "Backend"), ("Next.js", "Frontend"),
+    ("Terraform", "DevOps"), ("Scikit-learn", "AI"), ("Rust", "Systems"), ("Kotlin", "Mobile"),
+    ("Swift", "Mobile"), ("Flutter", "Mobile"), ("React Native", "Mobile"), ("Tableau", "Data"),
+    ("Power BI", "Data"), ("Excel", "Data"), ("Spark", "Data"), ("Kafka", "Data"),
+    ("CI/CD", "DevOps"), ("Jenkins", "DevOps"), ("Agile", "Process"), ("Scrum", "Process"),
+    ("UI/UX", "Design"), ("Deep Learning", "AI"), ("NLP", "AI"), ("Computer Vision", "AI"),
+    ("Statistics", "Data"), ("R", "Data"), ("MATLAB", "Data"), ("PHP", "Backend"),
+    ("Laravel", "Backend"), ("Ruby", "Backend"), ("Rails", "Backend"), ("Elasticsearch", "Data"),
+    ("Snowflake", "Data"), ("dbt", "Data"), ("Airflow", "Data"), ("Cybersecurity", "Security"),
+    ("Penetration Testing", "Security"), ("Networking", "Systems"), ("Bash", "Tools"), ("Unity", "Games"),
+]
+ROLE_TITLES = [
+    "Backend Engineer", "Frontend Engineer", "Full Stack Developer", "Data Analyst", "Data Scientist",
+    "ML Engineer", "DevOps Engineer", "Mobile Developer", "Security Analyst", "Cloud Engineer",
+]
+UNIVERSITIES = ["Stanford University", "MIT", "UC Berkeley", "University of Lagos", "Carnegie Mellon University"]
+MAJORS = ["Computer Science", "Software Engineering", "Data Science", "Information Systems", "Mathematics"]
+
+INSERT_BATCH = 5000
+
+# --- Synthetic population ---
+
+def skill_weights(exponent: float = 1.1) -> np.ndarray:
+    weights = 1.0 / np.arange(1, len(SKILL_CATALOGUE) + 1) ** exponent
+    return weights / weights.sum()
+
+def synthetic_students(count: int, skill_ids: Dict[str, int], rng: np.random.Generator):
+    """Students with 1-12 skills each, drawn by popularity. Yields User models."""
+    weights = skill_weights()
+    sizes = np.clip(rng.poisson(5, count) + 1, 1, 12)
+    for i, size in enumerate(sizes):
+        picks = rng.choice(len(SKILL_CATALOGUE), size=size, replace=False, p=weights)
+        yield User(
+            email=f"bench.student{i}@example.edu",
+            hashed_password="x",
+            full_name=f"Bench Student {i}",
+            role=UserRole.STUDENT,
+            university=UNIVERSITIES[i % len(UNIVERSITIES)],
+            major=MAJORS[i % len(MAJORS)],
+            skills=[
+                Skill(name=SKILL_CATALOGUE[p][0], skill_id=skill_ids[SKILL_CATALOGUE[p][0]],
+                      category=SKILL_CATALOGUE[p][1], level=int(rng.integers(30, 100)))
+                for p in picks
+            ],
+        )
+
+def synthetic_roles(count: int, skill_ids: Dict[str, int], rng: np.random.Generator):
+    """Active roles with 3-8 required and 0-4 preferred skills. Yields Role models."""
+    weights = skill_weights(0.8)  # Recruiters ask for a flatter mix than students list
+    for i in range(count):
+        picks = rng.choice(len(SKILL_CATALOGUE), size=int(rng.integers(3, 13)), replace=False, p=weights)
+        split = int(rng.integers(3, min(9, len(picks) + 1)))
+        required = [SKILL_CATALOGUE[p][0] for p in picks[:split]]
+        preferred = [SKILL_CATALOGUE[p][0] for p in picks[split:]]
+        title = ROLE_TITLES[i % len(ROLE_TITLES)]
+        yield Role(
+            title=title,
+            company_name=f"Bench Company {i % 50}",
+            recruiter_id="bench",
+            description=f"{title} working with {', '.join(required + preferred)}.",
+            role_type=RoleType.FULL_TIME if i % 3 else RoleType.INTERNSHIP,
+            location="Remote",
+            required_skills=required,
+            preferred_skills=preferred,
+            required_skill_ids=[skill_ids[s] for s in required],
+            preferred_skill_ids=[skill_ids[s] for s in preferred],
+            min_experience_years=int(rng.integers(0, 4)),
+        )
+
+def synthetic_applications(count: int, student_ids: List[str], role_ids: List[str], rng: np.random.Generator):
+    statuses = list(ApplicationStatus)
+    now = datetime.utcnow()
+    for _ in range(count):
+        yield Application(
+            student_id=student_ids[int(rng.integers(len(student_ids)))],
+            role_id=role_ids[int(rng.integers(len(role_ids)))],
+            status=statuses[int(rng.integers(len(statuses)))],
+            applied_at=now - timedelta(minutes=int(rng.integers(0, 60 * 24 * 30))),
+            match_score=int(rng.integers(20, 101)),
+        )
+
+async def insert_models(engine: AIOEngine, model, instances) -> List[str]:
+    """Bulk insert without per-document round trips. Returns the inserted IDs."""
+    collection = engine.get_collection(model)
+    ids, batch = [], []
+    for instance in instances:
+        batch.append(instance.model_dump_doc())
+        ids.append(str(instance.id))
+        if len(batch) >= INSERT_BATCH:
+            await collection.insert_many(batch, ordered=False)
+            batch = []
+    if batch:
+        await collection.insert_many(batch, ordered=False)
+    return ids
+
+async def seed(engine: AIOEngine, students: int, roles: int, seed: int) -> Tuple[List[str], List[str], Dict[str, float]]:
+    """Fill the benchmark database and build every derived structure. Returns (student_ids, role_ids, timings)."""
+    rng = np.random.default_rng(seed)
+    timings = {}
+
+    started = time.perf_counter()
+    names = [name for name, _ in SKILL_CATALOGUE]
+    skill_ids = dict(zip(names, await skill_vocabulary.intern_many(engine, names)))
+    student_ids = await insert_models(engine, User, synthetic_students(students, skill_ids, rng))
+    role_ids = await insert_models(engine, Role, synthetic_roles(roles, skill_ids, rng))
+    await insert_models(engine, Application, synthetic_applications(max(students // 2, 1), student_ids, role_ids, rng))
+    timings["insertSeconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await skill_index.rebuild(engine)
+    timings["skillIndexSeconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await match_engine.load(engine)
+    timings["matchEngineLoadSeconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await match_table.rebuild(engine)
+    timings["matchTableSeconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await skill_demand.rebuild(engine)
+    timings["skillDemandSeconds"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    await semantic_index.load(engine)
+    timings["semanticIndexSeconds"] = time.perf_counter() - started
+    return student_ids, role_ids, timings
+
+# --- Measurement ---
+
+def peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+def summarize(name: str, latencies: List[float], elapsed: float, operations: Optional[int] = None) -> Dict[str, Any]:
+    ordered = sorted(latencies)
+    operations = operations if operations is not None else len(latencies)
+    result = {
+        "name": name,
+        "operations": operations,
+        "seconds": round(elapsed, 4),
+        "throughputPerSecond": round(operations / elapsed, 2) if elapsed else None,
+        "p50Ms": round(ordered[len(ordered) // 2] * 1000, 3),
+        "p99Ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000, 3),
+        "meanMs": round(statistics.fmean(ordered) * 1000, 3),
+        "peakRssMb": round(peak_rss_mb(), 1),
+    }
+    print(f"  {name:<34} {result['throughputPerSecond']:>12} ops/s  p50 {result['p50Ms']:>9} ms  p99 {result['p99Ms']:>9} ms")
+    return result
+
+async def measure(name: str, calls: List[Callable[[], Awaitable[Any]]], cold_cache: bool = True) -> Dict[str, Any]:
+    """Time each call in turn. With cold_cache the match and response caches are emptied first, otherwise they are warmed first."""
+    if not cold_cache:
+        for call in calls:
+            await call()
+    latencies = []
+    started = time.perf_counter()
+    for call in calls:
+        if cold_cache:
+            match_cache.clear()
+            response_cache.invalidate()
+        call_started = time.perf_counter()
+        await call()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(name, latencies, time.perf_counter() - started)
+
+def bench_calculate_match(engine_students: List[User], roles: List[Role]) -> Dict[str, Any]:
+    """Pure scoring of every sampled student against every sampled role."""
+    latencies = []
+    started = time.perf_counter()
+    for role in roles:
+        role_started = time.perf_counter()
+        for student in engine_students:
+            calculate_match(student, role)
+        latencies.append((time.perf_counter() - role_started) / max(len(engine_students), 1))
+    return summarize("calculate_match", latencies, time.perf_counter() - started, len(roles) * len(engine_students))
+
+async def run_size(engine: AIOEngine, client: httpx.AsyncClient, students: int, roles: int, args) -> Dict[str, Any]:
+    print(f"\n{students} students x {roles} roles")
+    await engine.client.drop_database(args.database)
+    if args.mongo_uri:
+        # mongomock checks unique indexes with a full scan per write, and indexes never speed it up
+        await db.configure_indexes()
+    student_ids, role_ids, timings = await seed(engine, students, roles, args.seed)
+    print("  seeded: " + ", ".join(f"{k} {v:.2f}" for k, v in timings.items()))
+
+    rng = random.Random(args.seed)
+    sample_roles = [rng.choice(role_ids) for _ in range(args.requests)]
+    sample_students = [rng.choice(student_ids) for _ in range(args.requests)]
+
+    async def get(path: str, **params):
+        response = await client.get(path, params=params)
+        response.raise_for_status()
+        return response
+
+    results = []
+    sample_users = await engine.find(User, User.role == UserRole.STUDENT, limit=args.calculate_sample)
+    sample_role_docs = await engine.find(Role, limit=min(roles, 20))
+    results.append(bench_calculate_match(sample_users, sample_role_docs))
+
+    for mode in ("table", "pipeline", "semantic"):
+        results.append(await measure(
+            f"GET /matches/roles mode={mode}",
+            [lambda r=r, mode=mode: get(f"/api/matches/roles/{r}", mode=mode) for r in sample_roles],
+        ))
+    results.append(await measure(
+        "GET /matches/roles cached",
+        [lambda r=r: get(f"/api/matches/roles/{r}") for r in sample_roles],
+        cold_cache=False,
+    ))
+    for mode in ("table", "semantic"):
+        results.append(await measure(
+            f"GET /matches/students mode={mode}",
+            [lambda s=s, mode=mode: get(f"/api/matches/students/{s}", mode=mode) for s in sample_students],
+        ))
+
+    async def batch(start: int):
+        response = await client.post("/api/matches/roles/batch", json={"role_ids": sample_roles[start:start + 10]})
+        response.raise_for_status()
+    results.append(await measure("POST /matches/roles/batch x10", [lambda i=i: batch(i) for i in range(0, len(sample_roles), 10)]))
+
+    dashboard = [lambda: get("/api/industry/dashboard-metrics") for _ in range(args.dashboard_requests)]
+    results.append(await measure("GET /industry/dashboard-metrics", dashboard))
+    results.append(await measure("GET /industry/dashboard-metrics cached", dashboard, cold_cache=False))
+    return {"students": students, "roles": roles, "seed": {k: round(v, 4) for k, v in timings.items()}, "benchmarks": results}
+
+def in_memory_client():
+    """The in-memory Mongo client of the test suite (see conftest.py)."""
+    try:
+        from conftest import in_memory_client as client
+        return client()
+    except ImportError:
+        print("The in-memory engine needs pytest and mongomock-motor (pip install pytest mongomock-motor), or pass --mongo-uri")
+        sys.exit(1)
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+async def main(args):
+    client = AsyncIOMotorClient(args.mongo_uri) if args.mongo_uri else in_memory_client()
+    engine = AIOEngine(client=client, database=args.database)
+    db.engine = engine  # configure_indexes and the app share the module-level engine
+
+    from main import app
+
+    async def get_bench_engine():
+        return engine
+    app.dependency_overrides[db.get_engine] = get_bench_engine
+
+    runs = []
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as http:
+        for students in args.students:
+            for roles in args.roles:
+                skill_vocabulary.clear()
+                runs.append(await run_size(engine, http, students, roles, args))
+
+    report = {
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        "commit": git_commit(),
+        "backend": "mongodb" if args.mongo_uri else "in-memory",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "requestsPerEndpoint": args.requests,
+        "runs": runs,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark matching and dashboard endpoints on synthetic data.")
+    parser.add_argument("--students", type=int, nargs="+", default=[1000])
+    parser.add_argument("--roles", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--mongo-uri", help="Benchmark against this MongoDB instead of the in-memory engine")
+    parser.add_argument("--database", default="skillsync_bench", help="Dropped and reseeded for every size")
+    parser.add_argument("--requests", type=int, default=50, help="Requests per endpoint and mode")
+    parser.add_argument("--dashboard-requests", type=int, default=5)
+    parser.add_argument("--calculate-sample", type=int, default=1000, help="Students scored per role by calculate_match")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="bench_results.json")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,71 @@
+import sys
+import os
+
+import pytest
+
+# Add the backend directory to sys.path so we can import app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+def in_memory_client():
+    """mongomock_motor client patched for the few driver features odmantic and the match table rely on."""
+    import mongomock
+    import mongomock.collection
+    from mongomock_motor import AsyncMongoMockClient
+
+    mongomock.ignore_feature("session")
+
+    class _Session:
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *exc):
+            pass
+
+        async def end_session(self):
+            pass
+
+    class Client(AsyncMongoMockClient):
+        async def start_session(self, *args, **kwargs):
+            return _Session()
+
+    # Newer pymongo passes sort= to bulk updates, which mongomock does not accept
+    builder = mongomock.collection.BulkOperationBuilder
+    for name in ("add_update", "add_replace", "add_delete"):
+        original = getattr(builder, name, None)
+        if original and not getattr(original, "_drops_sort", False):
+            def patched(self, *args, _original=original, sort=None, **kwargs):
+                return _original(self, *args, **kwargs)
+            patched._drops_sort = True
+            setattr(builder, name, patched)
+    return Client()
+
+@pytest.fixture
+def engine(monkeypatch):
+    """An empty in-memory database, installed as app.db.engine for the duration of one test."""
+    pytest.importorskip("mongomock_motor")
+    from odmantic import AIOEngine
+    import app.db as db
+    from app.core.skill_vocabulary import skill_vocabulary
+
+    engine = AIOEngine(client=in_memory_client(), database="test")
+    monkeypatch.setattr(db, "engine", engine)
+    # Cached skill IDs belong to the previous test's database
+    skill_vocabulary.clear()
+    return engine
+
+@pytest.fixture
+def client(engine):
+    """A TestClient of the app serving from `engine`, with the worker-local caches emptied."""
+    from fastapi.testclient import TestClient
+    import app.db as db
+    from app.api.response_cache import response_cache
+    from app.core.match_cache import match_cache
+    from main import app
+
+    async def get_test_engine():
+        return engine
+    app.dependency_overrides[db.get_engine] = get_test_engine
+    match_cache.clear()
+    response_cache.invalidate()
+    yield TestClient(app)
+    app.dependency_overrides.pop(db.get_engine, None)
@@ -0,0 +1,230 @@
+"""
+An offline stand-in for the Gemini API, for running RecommendationService without quota.
+
+    from fake_gemini import FakeGemini, lognormal
+    fake = FakeGemini(latency=lognormal(1.2, 0.5), rate_limit_rate=0.05, markdown_rate=0.3)
+    service = RecommendationService(api_keys=["fake-key-1", "fake-key-2"], client_factory=fake.client)
+
+Each call sleeps for a latency drawn from the given distribution and then either
+raises the same google.genai ClientError the real API raises (429 rate limits, 400
+rejections, invalid keys) or returns a canned answer shaped for the prompt it got:
+opportunities, learning paths, action plans, single and packed skill gaps.
+Answers are sometimes wrapped in a ```json block, as the model does when it cannot
+be forced into JSON mode. `stats()` counts what every key saw.
+"""
+import asyncio
+import json
+import math
+import random
+import re
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Optional
+
+from google.genai import errors
+
+Latency = Callable[[random.Random], float]
+
+def fixed(seconds: float) -> Latency:
+    return lambda rng: seconds
+
+def uniform(low: float, high: float) -> Latency:
+    return lambda rng: rng.uniform(low, high)
+
+def lognormal(median: float, sigma: float) -> Latency:
+    """Right-skewed like real model latency: most calls near `median`, a long tail of slow ones."""
+    mu = math.log(median)
+    return lambda rng: rng.lognormvariate(mu, sigma)
+
+_GOAL = re.compile(r"aiming to become an? (.+?)\.\n")
+_ROLE = re.compile(r"targeting an? (.+?) role")
+_PACKED_STUDENT = re.compile(r"^\s*(\d+)\. Major: .*?Target role: (.+?)\. Current Skills", re.MULTILINE)
+
+_SKILLS = ["Docker", "Kubernetes", "TypeScript", "System Design", "SQL", "AWS", "Testing", "Communication"]
+
+def _error(code: int, status: str, message: str) -> errors.ClientError:
+    return errors.ClientError(code, {"error": {"code": code, "message": message, "status": status}})
+
+class _Usage:
+    def __init__(self, total_token_count: int):
+        self.total_token_count = total_token_count
+
+class _Response:
+    def __init__(self, text: str, total_tokens: Optional[int] = None):
+        self.text = text
+        self.usage_metadata = _Usage(total_tokens) if total_tokens is not None else None
+
+class _Models:
+    def __init__(self, backend: "FakeGemini", api_key: str):
+        self._backend = backend
+        self._api_key = api_key
+
+    async def generate_content(self, model: str, contents: str, config: Any = None) -> _Response:
+        text = await self._backend._call(self._api_key, contents)
+        return _Response(text, self._backend._tokens(contents, text))
+
+    async def generate_content_stream(self, model: str, contents: str, config: Any = None) -> AsyncIterator[_Response]:
+        # Like the SDK, errors are raised when the stream is opened, before any chunk
+        text = await self._backend._call(self._api_key, contents, share=self._backend.first_chunk_share)
+        return self._backend._chunks(contents, text)
+
+class _Aio:
+    def __init__(self, models: _Models):
+        self.models = models
+
+class FakeClient:
+    """What RecommendationService uses of a genai.Client: `client.aio.models`."""
+
+    def __init__(self, backend: "FakeGemini", api_key: str):
+        self.api_key = api_key
+        self.aio = _Aio(_Models(backend, api_key))
+
+class FakeGemini:
+    """
+    Shared state of the fake API. `latency` is the whole call time of a generation;
+    errors come back after `error_latency`. `rate_limit_rate` and `bad_request_rate`
+    are the chance of a 429 or a 400 on any call, and `invalid_keys` always answer
+    with the invalid key error. With `requests_per_minute` a key also answers 429
+    once it has served that many calls in the last minute, like a real quota.
+    """
+
+    def __init__(
+        self,
+        latency: Latency = lognormal(1.0, 0.4),
+        error_latency: Latency = fixed(0.05),
+        rate_limit_rate: float = 0.0,
+        bad_request_rate: float = 0.0,
+        invalid_keys: Iterable[str] = (),
+        requests_per_minute: Optional[int] = None,
+        markdown_rate: float = 0.0,
+        chunk_chars: int = 80,
+        first_chunk_share: float = 0.3,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.error_latency = error_latency
+        self.rate_limit_rate = rate_limit_rate
+        self.bad_request_rate = bad_request_rate
+        self.invalid_keys = set(invalid_keys)
+        self.requests_per_minute = requests_per_minute
+        self.markdown_rate = markdown_rate
+        self.chunk_chars = chunk_chars
+        self.first_chunk_share = first_chunk_share
+        self.rng = random.Random(seed)
+
+        self._recent: Dict[str, deque] = defaultdict(deque)
+        self._counts: Dict[str, Counter] = defaultdict(Counter)
+        self._inflight = 0
+        self.peak_inflight = 0
+
+    def client(self, api_key: str) -> FakeClient:
+        """A client for one key; pass this method as a RecommendationService client_factory."""
+        return FakeClient(self, api_key)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": sum(counts["calls"] for counts in self._counts.values()),
+            "peakInflight": self.peak_inflight,
+            "keys": {f"...{key[-4:]}": dict(counts) for key, counts in self._counts.items()},
+        }
+
+    async def _call(self, api_key: str, prompt: str, share: float = 1.0) -> str:
+        """Wait out a call and return its text, or raise the error it ends in."""
+        counts = self._counts[api_key]
+        counts["calls"] += 1
+        error = self._pick_error(api_key)
+        self._inflight += 1
+        self.peak_inflight = max(self.peak_inflight, self._inflight)
+        try:
+            if error is not None:
+                counts[str(error.code)] += 1
+                await asyncio.sleep(self.error_latency(self.rng))
+                raise error
+            await asyncio.sleep(self.latency(self.rng) * share)
+        finally:
+            self._inflight -= 1
+        counts["ok"] += 1
+        return self._answer(prompt)
+
+    def _pick_error(self, api_key: str) -> Optional[errors.ClientError]:
+        if api_key in self.invalid_keys:
+            return _error(400, "INVALID_ARGUMENT", "API key not valid. Please pass a valid API key.")
+        if self.requests_per_minute is not None:
+            now, recent = time.monotonic(), self._recent[api_key]
+            while recent and now - recent[0] >= 60:
+                recent.popleft()
+            if len(recent) >= self.requests_per_minute:
+                return _error(429, "RESOURCE_EXHAUSTED", "Quota exceeded for generate_content requests per minute.")
+            recent.append(now)
+        if self.rng.random() < self.rate_limit_rate:
+            return _error(429, "RESOURCE_EXHAUSTED", "Resource has been exhausted (e.g. check quota).")
+        if self.rng.random() < self.bad_request_rate:
+            return _error(400, "INVALID_ARGUMENT", "Request contains an invalid argument.")
+        return None
+
+    async def _chunks(self, prompt: str, text: str) -> AsyncIterator[_Response]:
+        pieces = [text[i:i + self.chunk_chars] for i in range(0, len(text), self.chunk_chars)] or [""]
+        # A second draw, for the rest of the call, is spread over the remaining chunks
+        pause = self.latency(self.rng) * (1 - self.first_chunk_share) / max(1, len(pieces) - 1)
+        for index, piece in enumerate(pieces):
+            if index:
+                await asyncio.sleep(pause)
+            last = index == len(pieces) - 1
+            yield _Response(piece, self._tokens(prompt, text) if last else None)
+
+    def _tokens(self, prompt: str, text: str) -> int:
+        return (len(prompt) + len(text)) // 4
+
+    def _answer(self, prompt: str) -> str:
+        text = json.dumps(self._document(prompt), indent=2)
+        if self.rng.random() < self.markdown_rate:
+            return f"Here is the result:\n```json\n{text}\n```"
+        return text
+
+    def _document(self, prompt: str) -> Any:
+        if "scholarships and internships" in prompt:
+            return [
+                {
+                    "title": f"Fake Opportunity {number}",
+                    "details": "A canned opportunity from the fake Gemini backend.",
+                    "link": f"https://example.com/opportunities/{number}",
+                    "location": "Remote",
+                    "type": "Internship" if number % 2 else "Scholarship",
+                    "deadline": "Rolling",
+                }
+                for number in range(1, 6)
+            ]
+
+        packed = _PACKED_STUDENT.findall(prompt)
+        if packed:
+            return {"results": [self._skill_gap(role, int(number)) for number, role in packed]}
+
+        goal = _GOAL.search(prompt)
+        if goal:
+            return {
+                "roadmap": f"From where you are to {goal.group(1)} in five phases.",
+                "milestones": [
+                    {
+                        "title": f"Phase {number}",
+                        "description": f"Build **{skill}** into your work as a {goal.group(1)}.",
+                        "resources": [f"{skill} Docs", f"{skill} Course", f"{skill} Project"],
+                        "estimated_time": f"{number + 1} weeks",
+                        "icon": "Code",
+                    }
+                    for number, skill in enumerate(_SKILLS[:5], 1)
+                ],
+            }
+
+        role = _ROLE.search(prompt)
+        role = role.group(1) if role else "target"
+        if "Missing Skills, from live job postings" in prompt:
+            return {"action_plan": self._skill_gap(role)["action_plan"]}
+        return self._skill_gap(role)
+
+    def _skill_gap(self, role: str, number: Optional[int] = None) -> dict:
+        missing = self.rng.sample(_SKILLS, 3)
+        result = {
+            "missing_skills": missing,
+            "action_plan": [f"Learn {skill} for a {role} role." for skill in missing] + [f"Apply to {role} roles."],
+        }
+        return {"id": number, **result} if number is not None else result
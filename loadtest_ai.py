@@ -0,0 +1,226 @@
+"""
+Load test of the Gemini-backed endpoints against the fake Gemini backend.
+
+    python loadtest_ai.py                                   # 200 requests, 16 at a time, 4 keys
+    python loadtest_ai.py --concurrency 64 --keys 5 --key-rpm 10 --quota-rpm 10 \
+        --rate-limit-rate 0.05 --invalid-keys 1 --markdown-rate 0.3
+
+It swaps the recommendation service's key pool for fake keys served by
+fake_gemini.FakeGemini, then sends a shuffled mix of requests to the learning path
+(plain and streamed), gap analysis and scholarship/internship scan endpoints, at most
+--concurrency at a time. Request bodies are drawn from --distinct (skills, goal,
+major) variants with a skewed popularity, so the LLM cache and request coalescing see
+realistic repeats. No real quota is used.
+
+It reports p50/p95/p99 latency and failures per endpoint, how many calls the pool
+retried on another key, what every key answered (key rotation), and the cache and
+coalescing counters, and writes everything to a JSON file for comparing settings.
+
+--key-rpm is the per-key budget the pool plans with; --quota-rpm is the quota the
+fake enforces with 429s. Set the quota below the budget to see cooldowns. Without
+--mongo-uri the database is the in-memory engine of bench_matching.py, which has no
+roles, so every gap analysis goes to the model.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import platform
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Tuple
+
+import httpx
+from motor.motor_asyncio import AsyncIOMotorClient
+from odmantic import AIOEngine
+
+import app.db as db
+from app.core.config import settings
+from app.core.llm_cache import llm_cache
+from app.core.recommendation_service import recommendation_service
+from app.core.single_flight import SingleFlight
+from bench_matching import SKILL_CATALOGUE, git_commit, in_memory_client
+from fake_gemini import FakeGemini, lognormal
+
+GOALS = [
+    "Frontend Engineer", "Backend Engineer", "Data Scientist", "Machine Learning Engineer",
+    "DevOps Engineer", "Mobile Developer", "Product Designer", "Data Analyst",
+    "Full Stack Developer", "Cloud Architect", "Security Engineer", "QA Engineer",
+]
+MAJORS = [
+    "Computer Science", "Software Engineering", "Information Technology", "Mathematics",
+    "Statistics", "Electrical Engineering", "Design", "Business Information Systems",
+]
+
+ENDPOINTS = ["learning-path", "learning-path-stream", "gap-analysis", "scholarships-scan", "internships-scan"]
+
+def variants(rng: random.Random, count: int) -> List[Tuple[List[str], str, str]]:
+    """(skills, goal, major) inputs, most popular first."""
+    skills = [name for name, _ in SKILL_CATALOGUE]
+    return [
+        (rng.sample(skills[:25], rng.randint(2, 6)), rng.choice(GOALS), rng.choice(MAJORS))
+        for _ in range(count)
+    ]
+
+def request_for(endpoint: str, skills: List[str], goal: str, major: str) -> Tuple[str, dict]:
+    if endpoint.startswith("learning-path"):
+        path = "/api/recommendation/learning-path" + ("/stream" if endpoint.endswith("stream") else "")
+        return path, {"skills": skills, "goal": goal}
+    if endpoint == "gap-analysis":
+        return "/api/skills/gap-analysis", {"current_skills": skills, "target_role": goal, "major": major}
+    prefix = "scholarships" if endpoint == "scholarships-scan" else "internships"
+    return f"/api/{prefix}/scan", {"skills": skills, "major": major}
+
+async def send(http: httpx.AsyncClient, endpoint: str, path: str, body: dict) -> Dict[str, Any]:
+    """
+    One request. Failures are non-2xx answers, error documents, streams that end in an
+    error event and scans that found nothing, which is how a scan reports a failed search.
+    """
+    started = time.perf_counter()
+    first_event = None
+    async with http.stream("POST", path, json=body) as response:
+        chunks = []
+        async for chunk in response.aiter_text():
+            if first_event is None:
+                first_event = time.perf_counter() - started
+            chunks.append(chunk)
+    text = "".join(chunks)
+    failed = response.status_code >= 400
+    if endpoint == "learning-path-stream":
+        failed = failed or "event: error" in text
+    elif not failed:
+        document = json.loads(text)
+        failed = document == [] or isinstance(document, dict) and "error" in document
+    return {"seconds": time.perf_counter() - started, "firstEvent": first_event, "failed": failed, "status": response.status_code}
+
+def percentile(ordered: List[float], share: float) -> float:
+    return round(ordered[min(len(ordered) - 1, int(len(ordered) * share))] * 1000, 1)
+
+def summarize(endpoint: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    ordered = sorted(r["seconds"] for r in results)
+    summary = {
+        "endpoint": endpoint,
+        "requests": len(results),
+        "failed": sum(1 for r in results if r["failed"]),
+        "statuses": dict(sorted(Counter(r["status"] for r in results).items())),
+        "p50Ms": percentile(ordered, 0.50),
+        "p95Ms": percentile(ordered, 0.95),
+        "p99Ms": percentile(ordered, 0.99),
+        "meanMs": round(statistics.fmean(ordered) * 1000, 1),
+    }
+    if endpoint == "learning-path-stream":
+        first = sorted(r["firstEvent"] for r in results if r["firstEvent"] is not None)
+        if first:
+            summary["firstEventP50Ms"] = percentile(first, 0.50)
+    print(
+        f"  {endpoint:<22} {summary['requests']:>5} req  {summary['failed']:>4} failed  "
+        f"p50 {summary['p50Ms']:>8} ms  p95 {summary['p95Ms']:>8} ms  p99 {summary['p99Ms']:>8} ms"
+    )
+    return summary
+
+async def main(args):
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    rng = random.Random(args.seed)
+    fake = FakeGemini(
+        latency=lognormal(args.latency_median, args.latency_sigma),
+        rate_limit_rate=args.rate_limit_rate,
+        bad_request_rate=args.bad_request_rate,
+        requests_per_minute=args.quota_rpm,
+        markdown_rate=args.markdown_rate,
+        seed=args.seed,
+    )
+    api_keys = [f"fake-key-{number:04d}" for number in range(1, args.keys + 1)]
+    fake.invalid_keys = set(api_keys[:args.invalid_keys])
+    recommendation_service.configure_keys(
+        api_keys, fake.client,
+        requests_per_minute=args.key_rpm,
+        cooldown_seconds=args.cooldown,
+        max_wait_seconds=args.max_wait,
+    )
+    recommendation_service.flights = SingleFlight()
+    llm_cache.clear()
+
+    client = AsyncIOMotorClient(args.mongo_uri) if args.mongo_uri else in_memory_client()
+    await client.drop_database(args.database)
+    engine = AIOEngine(client=client, database=args.database)
+    db.engine = engine
+
+    from main import app
+
+    async def get_loadtest_engine():
+        return engine
+    app.dependency_overrides[db.get_engine] = get_loadtest_engine
+
+    endpoints = args.endpoints
+    inputs = variants(rng, args.distinct)
+    # Zipf-like popularity: the first variants are asked for far more often
+    weights = [1 / rank for rank in range(1, len(inputs) + 1)]
+    plan = [(rng.choice(endpoints), *rng.choices(inputs, weights)[0]) for _ in range(args.requests)]
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    results: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+
+    async def run(http, endpoint, skills, goal, major):
+        path, body = request_for(endpoint, skills, goal, major)
+        async with semaphore:
+            results[endpoint].append(await send(http, endpoint, path, body))
+
+    print(f"{args.requests} requests, concurrency {args.concurrency}, {args.keys} keys ({args.invalid_keys} invalid)")
+    transport = httpx.ASGITransport(app=app)
+    started = time.perf_counter()
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as http:
+        await asyncio.gather(*(run(http, *request) for request in plan))
+    elapsed = time.perf_counter() - started
+
+    summaries = [summarize(endpoint, results[endpoint]) for endpoint in endpoints if results[endpoint]]
+    pool = recommendation_service.keys.stats()
+    print(f"  {elapsed:.1f}s, {args.requests / elapsed:.1f} req/s, {fake.stats()['calls']} Gemini calls, {pool['retries']} retried on another key")
+    for key in pool["keys"]:
+        outcomes = ", ".join(f"{name} {count}" for name, count in key["outcomes"].items() if count)
+        state = "quarantined" if key["quarantined"] else f"cooling down {key['coolingDownFor']}s" if key["coolingDownFor"] else "ready"
+        print(f"    key {key['key']}: {outcomes or 'unused'} ({state})")
+
+    report = {
+        "createdAt": datetime.utcnow().isoformat() + "Z",
+        "commit": git_commit(),
+        "backend": "mongodb" if args.mongo_uri else "in-memory",
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {name: value for name, value in vars(args).items() if name not in ("mongo_uri", "output")},
+        "seconds": round(elapsed, 2),
+        "throughputPerSecond": round(args.requests / elapsed, 2),
+        "endpoints": summaries,
+        "keyPool": pool,
+        "fakeGemini": fake.stats(),
+        "llmCache": llm_cache.stats(),
+        "coalescing": recommendation_service.flights.stats(),
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved results to {args.output}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the Gemini-backed endpoints against a fake Gemini backend.")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=ENDPOINTS)
+    parser.add_argument("--distinct", type=int, default=40, help="Distinct request bodies to draw from")
+    parser.add_argument("--keys", type=int, default=4)
+    parser.add_argument("--invalid-keys", type=int, default=0, help="How many of the keys the fake rejects as invalid")
+    parser.add_argument("--key-rpm", type=int, default=settings.GEMINI_REQUESTS_PER_MINUTE, help="Per-key request budget of the pool")
+    parser.add_argument("--quota-rpm", type=int, help="Per-key quota the fake enforces with 429s (default: none)")
+    parser.add_argument("--cooldown", type=float, default=settings.GEMINI_COOLDOWN_SECONDS)
+    parser.add_argument("--max-wait", type=float, default=settings.GEMINI_MAX_WAIT_SECONDS)
+    parser.add_argument("--latency-median", type=float, default=1.0, help="Seconds")
+    parser.add_argument("--latency-sigma", type=float, default=0.4, help="Spread of the log-normal latency")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Chance of a random 429 per call")
+    parser.add_argument("--bad-request-rate", type=float, default=0.0, help="Chance of a 400 per call")
+    parser.add_argument("--markdown-rate", type=float, default=0.3, help="Chance of a ```json wrapped answer")
+    parser.add_argument("--mongo-uri", help="Cache results in this MongoDB instead of the in-memory engine")
+    parser.add_argument("--database", default="skillsync_loadtest", help="Dropped before the run")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", default="loadtest_results.json")
+    asyncio.run(main(parser.parse_args()))
@@ -1,10 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from app.db import configure_indexes, get_engine
+from app.core.config import settings
+from app.core.skill_vocabulary import skill_vocabulary
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        await configure_indexes()
+        if await skill_vocabulary.needs_backfill(await get_engine()):
+            # The match table and endpoints work on skill IDs, so they are empty until this runs
+            print("Warning: existing users and roles have no skill IDs; run `python manage.py backfill-skill-ids`")
+    except Exception as e:
+        # Don't block startup on a missing database; queries will surface the error
+        print(f"Warning: could not configure database indexes: {e}")
+
+    warmer = None
+    if settings.LLM_WARMER_ENABLED:
+        from app.core.llm_warmer import llm_warmer
+        warmer = asyncio.create_task(llm_warmer.run_forever(await get_engine()))
+    yield
+    if warmer:
+        warmer.cancel()
 
 app = FastAPI(
     title="SkillSync API",
     description="Backend API for SkillSync with Talent Matching and Scraper capabilities",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS Configuration
@@ -0,0 +1,58 @@
+import asyncio
+import sys
+
+from app.db import engine, configure_indexes
+from app.core.skill_index import skill_index
+from app.core.match_table import match_table
+from app.core.skill_vocabulary import skill_vocabulary
+from app.core.skill_demand import skill_demand
+from app.core.application_rollups import application_rollups
+from app.core.llm_warmer import llm_warmer
+
+async def rebuild_skill_index():
+    indexed = await skill_index.rebuild(engine)
+    print(f"Rebuilt skill index for {indexed} students")
+
+async def rebuild_match_table():
+    refreshed = await match_table.rebuild(engine)
+    print(f"Rebuilt match table for {refreshed} active roles")
+
+async def rebuild_skill_demand():
+    counted = await skill_demand.rebuild(engine)
+    print(f"Rebuilt skill demand counters from {counted} students")
+
+async def backfill_application_rollups():
+    counted = await application_rollups.backfill(engine)
+    print(f"Rebuilt application rollups from {counted} applications")
+
+async def backfill_skill_ids():
+    users, roles = await skill_vocabulary.backfill(engine)
+    print(f"Interned skills for {users} users and {roles} roles")
+    # Postings, matches and demand counters are keyed by skill ID, so rebuild them from the new IDs
+    await rebuild_skill_index()
+    await rebuild_match_table()
+    await rebuild_skill_demand()
+
+async def warm_llm_cache():
+    run = await llm_warmer.run_once(engine)
+    print(f"Warmed {run['warmed']} of {run['candidates']} popular inputs ({run['failed']} failed, {run['geminiCalls']} Gemini calls)")
+
+COMMANDS = {
+    "backfill-application-rollups": backfill_application_rollups,
+    "backfill-skill-ids": backfill_skill_ids,
+    "rebuild-skill-index": rebuild_skill_index,
+    "rebuild-match-table": rebuild_match_table,
+    "rebuild-skill-demand": rebuild_skill_demand,
+    "warm-llm-cache": warm_llm_cache,
+}
+
+async def run(command: str):
+    await configure_indexes()
+    await COMMANDS[command]()
+
+if __name__ == "__main__":
+    if len(sys.argv) != 2 or sys.argv[1] not in COMMANDS:
+        print(f"Usage: python manage.py [{'|'.join(COMMANDS)}]")
+        sys.exit(1)
+
+    asyncio.run(run(sys.argv[1]))
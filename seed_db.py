@@ -3,6 +3,10 @@ from app.db import engine
 from app.models.user import User, UserRole, Skill
 from app.models.role import Role, RoleType
 from app.core.security import get_password_hash
+from app.core.skill_index import skill_index
+from app.core.match_table import match_table
+from app.core.skill_vocabulary import skill_vocabulary
+from app.core.skill_demand import skill_demand
 
 async def seed_data():
     print("Seeding data...")
@@ -100,6 +104,14 @@ async def seed_data():
         await engine.save(role)
         print(f"Created role: {r['title']}")
 
+    await skill_vocabulary.backfill(engine)
+    indexed = await skill_index.rebuild(engine)
+    print(f"Indexed skills for {indexed} students")
+    refreshed = await match_table.rebuild(engine)
+    print(f"Computed matches for {refreshed} roles")
+    counted = await skill_demand.rebuild(engine)
+    print(f"Counted skill demand for {counted} students")
+
     print("Seeding complete.")
 
 if __name__ == "__main__":
@@ -1,18 +1,24 @@
+import asyncio
 import sys
 import os
 
 # Add the backend directory to sys.path so we can import app
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-from app.core.recommendation_service import recommendation_service
+from app.core.recommendation_service import RecommendationService, recommendation_service
+from fake_gemini import FakeGemini, fixed
 
-def test_service():
+def test_service(service=None):
     print("Testing Recommendation Service...")
+    # Offline by default: canned answers, some wrapped in ```json like the real model's
+    if service is None:
+        fake = FakeGemini(latency=fixed(0.01), markdown_rate=0.5, seed=1)
+        service = RecommendationService(api_keys=["fake-key-0001"], client_factory=fake.client)
     try:
-        results = recommendation_service.find_opportunities(
+        results = asyncio.run(service.find_opportunities(
             course="Computer Science",
             skills="React, Node.js"
-        )
+        ))
         print("\nResults:")
         print(results)
         
@@ -31,4 +37,5 @@ def test_service():
         print(f"\n❌ Test failed with error: {e}")
 
 if __name__ == "__main__":
-    test_service()
+    # --live calls Gemini with the configured keys
+    test_service(recommendation_service if "--live" in sys.argv else None)
@@ -0,0 +1,99 @@
+import asyncio
+from collections import Counter
+
+from bson import ObjectId
+
+from app.core.application_rollups import application_rollups
+from app.models.application import Application
+from app.models.application_rollup import ApplicationRollup
+
+def find(engine, model, *queries, **kwargs):
+    async def run():
+        return await engine.find(model, *queries, **kwargs)
+    return asyncio.run(run())
+
+def register_student(client, email):
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": "secret", "confirm_password": "secret", "name": "Ada", "role": "student",
+    })
+    return response.json()["user_id"]
+
+def create_role(client):
+    response = client.post("/api/industry/roles", json={
+        "title": "Data Engineer", "company_name": "Acme", "recruiter_id": "r1", "description": "Data work",
+        "role_type": "full_time", "location": "Remote", "required_skills": ["Python", "SQL"],
+    })
+    return response.json()["id"]
+
+def apply(client, engine, count):
+    """Apply `count` new students to one role. Returns the application IDs, oldest first."""
+    role_id = create_role(client)
+    for number in range(count):
+        student_id = register_student(client, f"student{number}@example.com")
+        response = client.post("/api/communication/apply", json={"role_id": role_id, "student_id": student_id})
+        assert response.status_code == 200
+    applications = find(engine, Application, sort=Application.id)
+    return [str(application.id) for application in applications]
+
+def day_statuses(engine):
+    """Status counts summed over the day buckets."""
+    totals = Counter()
+    for bucket in find(engine, ApplicationRollup, ApplicationRollup.granularity == "day"):
+        totals.update(bucket.statuses)
+    return {status: count for status, count in totals.items() if count}
+
+def rollups(engine):
+    return sorted((b.key, b.total, {s: c for s, c in b.statuses.items() if c}) for b in find(engine, ApplicationRollup))
+
+def test_rollups_follow_applications_and_status_changes(client, engine):
+    app_ids = apply(client, engine, 3)
+    assert day_statuses(engine) == {"pending": 3}
+
+    response = client.put(f"/api/industry/applications/{app_ids[0]}/status?status=interview")
+    assert response.status_code == 200
+    assert day_statuses(engine) == {"pending": 2, "interview": 1}
+
+    # The incremental counters agree with a recount from the applications
+    incremental = rollups(engine)
+    asyncio.run(application_rollups.backfill(engine))
+    assert rollups(engine) == incremental
+
+def test_bulk_status_update_reports_every_item(client, engine):
+    first, second, third = apply(client, engine, 3)
+    response = client.put("/api/industry/applications/status", json={"updates": [
+        {"app_id": first, "status": "interview"},
+        {"app_id": second, "status": "pending"},
+        {"app_id": "not-an-id", "status": "offered"},
+        {"app_id": str(ObjectId()), "status": "offered"},
+        {"app_id": third, "status": "offered"},
+        {"app_id": third, "status": "rejected"},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["updated"] == 2
+    assert [r["result"] for r in body["results"]] == [
+        "updated", "unchanged", "invalid_id", "not_found", "superseded", "updated",
+    ]
+    assert day_statuses(engine) == {"pending": 1, "interview": 1, "rejected": 1}
+
+def test_bulk_status_update_skips_rollups_for_concurrent_changes(client, engine, monkeypatch):
+    first, second = apply(client, engine, 2)
+
+    # Another request moves the first application between the read and the bulk write
+    collection_type = type(engine.get_collection(Application))
+    bulk_write = collection_type.bulk_write
+    async def racing_bulk_write(self, operations, **kwargs):
+        monkeypatch.setattr(collection_type, "bulk_write", bulk_write)
+        await self.update_one({"_id": ObjectId(first)}, {"$set": {"status": "rejected"}})
+        return await bulk_write(self, operations, **kwargs)
+    monkeypatch.setattr(collection_type, "bulk_write", racing_bulk_write)
+
+    response = client.put("/api/industry/applications/status", json={"updates": [
+        {"app_id": first, "status": "interview"},
+        {"app_id": second, "status": "interview"},
+    ]})
+    body = response.json()
+    assert body["updated"] == 1
+    assert [r["result"] for r in body["results"]] == ["conflict", "updated"]
+    # Only the applied write moved a count; the racing writer owns the first application's
+    assert day_statuses(engine) == {"pending": 1, "interview": 1}
@@ -0,0 +1,49 @@
+import asyncio
+
+from app.core.gemini_keys import GeminiKeyPool, INVALID_KEY, OK, RATE_LIMITED
+from app.core.llm_cache import llm_cache
+from app.core.recommendation_service import RecommendationService
+from fake_gemini import FakeGemini, fixed
+
+def pool(keys=2, requests_per_minute=10, max_wait_seconds=0):
+    return GeminiKeyPool(
+        [f"fake-key-{number:04d}" for number in range(1, keys + 1)],
+        requests_per_minute=requests_per_minute,
+        cooldown_seconds=60,
+        max_wait_seconds=max_wait_seconds,
+        client_factory=lambda api_key: object(),
+    )
+
+def test_rate_limited_key_cools_down_and_the_next_call_uses_another():
+    keys = pool()
+    first = asyncio.run(keys.acquire(100))
+    assert keys.release(first, Exception("429 RESOURCE_EXHAUSTED"), 100) == RATE_LIMITED
+
+    second = asyncio.run(keys.acquire(100))
+    assert second is not None and second is not first
+    keys.release(second, None, 100)
+    # The other key is cooling down and the pool does not wait
+    assert asyncio.run(keys.acquire(100, exclude=[second])) is None
+    assert keys.retries == 1
+
+def test_request_budget_limits_calls_per_key():
+    keys = pool(keys=1, requests_per_minute=2)
+    for _ in range(2):
+        key = asyncio.run(keys.acquire(100))
+        assert key is not None
+        keys.release(key, None, 100)
+    assert asyncio.run(keys.acquire(100)) is None
+    assert keys.spare_share() < 0.5
+
+def test_invalid_key_is_quarantined_and_the_call_succeeds_on_another():
+    llm_cache.clear()
+    fake = FakeGemini(latency=fixed(0), invalid_keys=["fake-key-0001"], seed=1)
+    service = RecommendationService(api_keys=["fake-key-0001", "fake-key-0002"], client_factory=fake.client)
+
+    path = asyncio.run(service.generate_learning_path(["Python"], "Data Engineer"))
+    assert "error" not in path and path["milestones"]
+
+    first, second = service.keys.keys
+    assert first.quarantined and first.counts[INVALID_KEY] == 1
+    assert second.counts[OK] == 1
+    assert service.keys.healthy() == 1
@@ -0,0 +1,48 @@
+import asyncio
+
+from app.core.match_cache import match_cache
+
+def register_student(client, email, university):
+    response = client.post("/api/auth/register", json={
+        "email": email, "password": "secret", "confirm_password": "secret", "name": "Ada", "role": "student",
+    })
+    user_id = response.json()["user_id"]
+    response = client.put(f"/api/auth/update-profile?user_id={user_id}", json={
+        "university": university,
+        "skills": [{"name": "Python", "level": 80, "category": "Backend"}, {"name": "SQL", "level": 60, "category": "Data"}],
+    })
+    assert response.status_code == 200
+    return user_id
+
+def create_role(client, title):
+    response = client.post("/api/industry/roles", json={
+        "title": title, "company_name": "Acme", "recruiter_id": "r1", "description": "Data work",
+        "role_type": "full_time", "location": "Remote", "required_skills": ["Python", "SQL"],
+    })
+    return response.json()["id"]
+
+def role_matches(client, role_id):
+    response = client.get(f"/api/matches/roles/{role_id}")
+    assert response.status_code == 200
+    return response.json()["items"]
+
+def test_profile_edit_invalidates_cached_role_matches(client):
+    student_id = register_student(client, "ada@example.com", "MIT")
+    role_id = create_role(client, "Data Engineer")
+    assert [m["location"] for m in role_matches(client, role_id)] == ["MIT"]
+
+    # No skill change, so no match table refresh; the cached page must still go
+    response = client.put(f"/api/auth/update-profile?user_id={student_id}", json={"university": "Stanford"})
+    assert response.status_code == 200
+    assert [m["location"] for m in role_matches(client, role_id)] == ["Stanford"]
+
+def test_role_edit_invalidates_cached_role_matches(client, engine):
+    register_student(client, "ada@example.com", "MIT")
+    role_id = create_role(client, "Data Engineer")
+    role_matches(client, role_id)
+    before = asyncio.run(match_cache.role_key(engine, role_id))
+
+    # A title edit leaves the match table alone but must retire cached pages
+    response = client.put(f"/api/industry/roles/{role_id}", json={"title": "Senior Data Engineer"})
+    assert response.status_code == 200
+    assert asyncio.run(match_cache.role_key(engine, role_id)) != before
@@ -0,0 +1,55 @@
+import sys
+import os
+
+import numpy as np
+
+# Add the backend directory to sys.path so we can import app
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from app.core.semantic_index import SemanticSkillIndex, _WORD
+
+# (title, description, required skill keys) of the roles the index learns contexts from
+ROLES = [
+    ("Backend Engineer", "Build APIs on a relational database", ["python", "django", "postgresql", "sql", "docker"]),
+    ("Data Analyst", "Write reports and dashboards", ["sql", "postgresql", "excel", "tableau"]),
+    ("Database Engineer", "Tune relational databases", ["postgresql", "mysql", "sql"]),
+    ("DevOps Engineer", "Run containers in the cloud", ["kubernetes", "docker", "terraform", "aws"]),
+    ("Platform Engineer", "Container platform and cloud infrastructure", ["docker", "aws", "kubernetes"]),
+    ("Frontend Engineer", "Build web interfaces", ["react", "javascript", "typescript", "figma"]),
+    ("Data Engineer", "Pipelines into the warehouse", ["python", "sql", "postgresql", "aws"]),
+    ("Analytics Engineer", "Model warehouse data", ["sql", "postgresql", "python"]),
+    ("Reporting Developer", "Reports on the relational database", ["postgresql", "sql", "excel"]),
+]
+
+def build_index():
+    """The index over every skill in ROLES, built the way SemanticSkillIndex.load does."""
+    keys = sorted({key for _, _, skills in ROLES for key in skills})
+    ids = {key: skill_id for skill_id, key in enumerate(keys, 1)}
+    contexts = {}
+    for title, description, skills in ROLES:
+        words = _WORD.findall(f"{title} {description}".lower())
+        for key in skills:
+            contexts.setdefault(ids[key], []).extend(w for w in words if w != key)
+            contexts[ids[key]].extend(other for other in skills if other != key)
+
+    index = SemanticSkillIndex()
+    index.build({skill_id: key for key, skill_id in ids.items()}, contexts)
+    return index, ids
+
+def neighbor_keys(index, ids, key):
+    names = {skill_id: name for name, skill_id in ids.items()}
+    return [names[skill_id] for skill_id, _ in index.neighbors(ids[key])]
+
+def test_related_skills_are_neighbors():
+    index, ids = build_index()
+    assert "sql" in neighbor_keys(index, ids, "postgresql")
+    assert "postgresql" in neighbor_keys(index, ids, "sql")
+    assert "docker" in neighbor_keys(index, ids, "kubernetes")
+
+def test_neighbors_find_every_skill_above_min_similarity():
+    index, ids = build_index()
+    vectors = index._vectors
+    for key, skill_id in ids.items():
+        row = index._rows[skill_id]
+        expected = {int(index._skill_ids[r]) for r in np.flatnonzero(vectors @ vectors[row] >= index.min_similarity)}
+        assert {other for other, _ in index.neighbors(skill_id)} == expected | {skill_id}, key